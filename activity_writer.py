@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Activity Log Writer
+Keeps the activity log open for the lifetime of a generator and mirrors its
+content in memory, so a commit costs one small append instead of a stat,
+an open and a close, and the blob can be hashed without re-reading the file.
+Optionally rotates to dated segment files once the log reaches a size limit,
+which keeps the per-commit hashing cost bounded no matter how long it runs.
+The in-memory copy is reloaded whenever another process has appended to the
+file, so writers serialised by the repository lock never drop entries.
+BareActivityLog keeps the same interface for bare repositories, where the
+log exists only as the blob at HEAD.
+"""
+
+import datetime
+import hashlib
+import os
+from pathlib import Path
+
+from catalogue import MessageCatalogue
+
+class ActivityLogWriter:
+    def __init__(self, repo_path, filename, base_content, activities,
+                 max_bytes=0, segment_dir="activity"):
+        self.repo_path = Path(repo_path)
+        self.filename = filename
+        self.base_content = base_content
+        self.activities = activities if isinstance(activities, MessageCatalogue) else MessageCatalogue(activities)
+        self.max_bytes = max_bytes
+        self.segment_dir = segment_dir
+        self.relative_path = None
+        self._segment_month = None
+        self._content = bytearray()
+        self._file = None
+        self._select_file(datetime.date.today())
+
+    @property
+    def content(self):
+        """Current bytes of the active log file."""
+        return bytes(self._content)
+
+    @property
+    def path(self):
+        return self.repo_path / self.relative_path
+
+    def _segment_name(self, month, index):
+        suffix = "" if index == 1 else f"-{index}"
+        return f"{self.segment_dir}/{month}{suffix}.txt"
+
+    def _is_full(self, relative_path):
+        path = self.repo_path / relative_path
+        return bool(self.max_bytes) and path.exists() and path.stat().st_size >= self.max_bytes
+
+    def _select_file(self, today):
+        """Pick the file new entries go to and open it for appending."""
+        if not self._is_full(self.filename):
+            relative_path, header, month = self.filename, self.base_content, None
+        else:
+            month = today.strftime("%Y-%m")
+            index = 1
+            while self._is_full(self._segment_name(month, index)):
+                index += 1
+            relative_path = self._segment_name(month, index)
+            header = f"# Activity Log {month}\n\n"
+
+        self.relative_path = relative_path
+        self._segment_month = month
+        self._open(header)
+
+    def _open(self, header):
+        """Load the active file into memory and open it for appending."""
+        if self._file is not None:
+            self._file.close()
+        path = self.path
+        if path.exists():
+            self._content = bytearray(path.read_bytes())
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._content = bytearray(header.encode())
+            path.write_bytes(self._content)
+        self._file = open(path, 'ab')
+
+    def build_entry(self, now=None):
+        """Build a single timestamped activity log line."""
+        now = now or datetime.datetime.now()
+        activity = self.activities.sample()
+        return f"[{now.strftime('%Y-%m-%d %H:%M:%S')}] {activity}\n"
+
+    def changed_on_disk(self):
+        """Whether another writer appended to (or replaced) the file since we last wrote."""
+        try:
+            return os.stat(self.path).st_size != len(self._content)
+        except FileNotFoundError:
+            return True
+
+    def append(self, line):
+        """Append a line to the active file, rotating first if it is full."""
+        today = datetime.date.today()
+        full = self.max_bytes and len(self._content) >= self.max_bytes
+        new_month = self._segment_month is not None and self._segment_month != today.strftime("%Y-%m")
+        # Callers hold the repository lock, so reloading here cannot race
+        if full or new_month or self.changed_on_disk():
+            self._select_file(today)
+        data = line.encode()
+        self._write(data)
+        self._content += data
+
+    def _write(self, data):
+        self._file.write(data)
+        self._file.flush()
+
+    def append_entry(self):
+        """Append a random activity entry and return the line written."""
+        line = self.build_entry()
+        self.append(line)
+        return line
+
+    def blob_sha(self):
+        """Git blob id of the active file, computed from the in-memory copy."""
+        header = f"blob {len(self._content)}\0".encode()
+        return hashlib.sha1(header + self._content).hexdigest()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+class BareActivityLog(ActivityLogWriter):
+    """Activity log for a bare repository, kept only in git and in memory.
+
+    The active file's content is read once from its blob at HEAD; appends
+    only touch the in-memory copy, and the committer writes the next blob
+    straight from it, so there is no working tree or index I/O at all.
+    Rotation checks blob sizes at HEAD instead of file sizes.
+    """
+
+    def __init__(self, git, filename, base_content, activities, max_bytes=0, segment_dir="activity"):
+        self.git = git
+        self._base_sha = None
+        super().__init__(git.repo_path, filename, base_content, activities, max_bytes, segment_dir)
+
+    def _is_full(self, relative_path):
+        info = self.git.object_info(f"HEAD:{relative_path}")
+        return bool(self.max_bytes) and info is not None and info[2] >= self.max_bytes
+
+    def _open(self, header):
+        _, data = self.git.read_object(f"HEAD:{self.relative_path}")
+        self._content = bytearray(data if data is not None else header.encode())
+        self._base_sha = self.blob_sha() if data is not None else None
+
+    def changed_on_disk(self):
+        """Whether another writer committed the file since we loaded or last built it."""
+        info = self.git.object_info(f"HEAD:{self.relative_path}")
+        head = info[0] if info else None
+        if head == self._base_sha:
+            return False
+        if head == self.blob_sha():
+            # HEAD now holds what we built: our own commit landed
+            self._base_sha = head
+            return False
+        return True
+
+    def _write(self, data):
+        pass
@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+Async Git
+asyncio variant of the commit path for driving many repositories from one
+event loop. Git runs through asyncio.create_subprocess_exec, so while one
+repository waits on git (a commit, a push over the network) the others keep
+going, with a shared semaphore capping how many one-shot git commands run
+at once.
+
+AsyncGitSession runs GitSession's plumbing commit (the step generators in
+git_backend.py) with its persistent helper pipes driven through asyncio
+streams, so a commit still spawns only `git commit-tree` and the index
+update. Within a repository commits stay serialised by the repository
+lock, and blocking work (the activity log, journal and run history) runs
+on the default executor so it never stalls the other repositories. Pushes
+are saved to the same push state file as push_pipeline.py's, so a later
+run on either path knows what is still unpushed.
+
+Usage:
+    python auto_commit.py --repos repos.json --asyncio --concurrency 16
+"""
+
+import asyncio
+import datetime
+import random
+import time
+from pathlib import Path
+
+from auto_commit import AutoCommitGenerator
+from git_backend import (INDEX_LOCK_RETRIES, UPDATE_REF_REPLIES, commit_file_steps, index_info_input,
+                         mktree_input, parse_batch_header, parse_tree, plumbing_check_steps,
+                         update_index_args, update_ref_input)
+from multi_repo import MultiRepoRunner
+from push_pipeline import is_transient
+from scheduler import CommitScheduler
+
+# One-shot git commands allowed to run at once across every repository on the loop
+DEFAULT_CONCURRENCY = 16
+
+class AsyncGitSession:
+    def __init__(self, repo_path=None, metrics=None, limit=None, lock=None):
+        self.repo_path = Path(repo_path) if repo_path else Path.cwd()
+        self.metrics = metrics
+        # Shared asyncio.Semaphore bounding concurrent git processes, or None
+        self.limit = limit
+        # The repository's RepoLock; sync_index() takes it, commit_file() expects it held
+        self.lock = lock
+        self._helpers = {}
+        self._pending_index = {}
+        self._plumbing_ok = None
+        # Set by the generator once it knows; a bare repository has no index
+        self.bare = False
+
+    async def _exec(self, args, input=None):
+        """Run git once; returns (exit code, stdout bytes, stderr text)."""
+        proc = await asyncio.create_subprocess_exec(
+            "git", *args,
+            cwd=self.repo_path,
+            stdin=asyncio.subprocess.PIPE if input is not None else asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await proc.communicate(input)
+        return proc.returncode, stdout, stderr.decode(errors="replace")
+
+    async def call(self, *args, input=None):
+        """Run git under the concurrency limit and record its timing.
+
+        Retries when the command loses a race on .git/index.lock.
+        Returns (exit code, stdout bytes, stderr text).
+        """
+        delay = 0.05
+        for attempt in range(INDEX_LOCK_RETRIES + 1):
+            if self.limit is not None:
+                await self.limit.acquire()
+            try:
+                started = time.perf_counter()
+                code, stdout, stderr = await self._exec(args, input)
+                if self.metrics is not None:
+                    self.metrics.record(f"git.{args[0]}", time.perf_counter() - started,
+                                        exit_code=code, bytes_written=len(input or b""))
+            finally:
+                if self.limit is not None:
+                    self.limit.release()
+            if code == 0 or "index.lock" not in stderr or attempt == INDEX_LOCK_RETRIES:
+                return code, stdout, stderr
+            await asyncio.sleep(delay)
+            delay *= 2
+
+    async def run(self, *args, input=None):
+        """Run a git command and return its stripped stdout, or None on failure."""
+        code, stdout, stderr = await self.call(*args, input=input)
+        if code != 0:
+            print(f"Git command failed: git {' '.join(args)} (exit {code})")
+            print(f"Error output: {stderr}")
+            return None
+        return stdout.decode(errors="replace").strip()
+
+    async def _helper(self, *args):
+        """Return a running persistent helper process, starting it if needed."""
+        proc = self._helpers.get(args)
+        if proc is None or proc.returncode is not None:
+            proc = await asyncio.create_subprocess_exec(
+                "git", *args,
+                cwd=self.repo_path,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL
+            )
+            self._helpers[args] = proc
+        return proc
+
+    async def _request(self, args, payload):
+        """Send payload to a helper and return its next line of output."""
+        started = time.perf_counter()
+        proc = await self._helper(*args)
+        proc.stdin.write(payload)
+        await proc.stdin.drain()
+        line = (await proc.stdout.readline()).decode().rstrip("\n")
+        if self.metrics is not None:
+            self.metrics.record(f"git.pipe.{args[0]}", time.perf_counter() - started,
+                                exit_code=0 if line else 1, bytes_written=len(payload))
+        return line
+
+    async def _drive(self, steps):
+        """Run a step generator from git_backend against this session."""
+        reply = None
+        while True:
+            try:
+                method, *args = steps.send(reply)
+            except StopIteration as done:
+                return done.value
+            reply = await getattr(self, method)(*args)
+
+    async def rev_parse(self, rev):
+        """Resolve a revision to a full object id, or None if it does not exist."""
+        info = parse_batch_header(await self._request(("cat-file", "--batch-check"), f"{rev}\n".encode()))
+        return info[0] if info else None
+
+    async def can_use_plumbing(self):
+        """Same check as GitSession.can_use_plumbing."""
+        if self._plumbing_ok is None:
+            self._plumbing_ok = await self._drive(plumbing_check_steps(self.repo_path))
+        return self._plumbing_ok
+
+    async def read_tree(self, rev):
+        """Return the entries of a tree as a list of (mode, name, sha), or None if it is not a tree."""
+        started = time.perf_counter()
+        proc = await self._helper("cat-file", "--batch")
+        proc.stdin.write(f"{rev}\n".encode())
+        await proc.stdin.drain()
+        header = parse_batch_header((await proc.stdout.readline()).decode().rstrip("\n"))
+        if header is None:
+            return None
+        _, obj_type, size = header
+        data = await proc.stdout.readexactly(size + 1)
+        if self.metrics is not None:
+            self.metrics.record("git.pipe.cat-file", time.perf_counter() - started)
+        return parse_tree(data[:-1]) if obj_type == "tree" else None
+
+    async def hash_file(self, path):
+        """Write a working tree file into the object store and return its blob id."""
+        return await self._request(("hash-object", "-w", "--stdin-paths"), f"{path}\n".encode()) or None
+
+    async def hash_content(self, content):
+        """Write content into the object store as a blob and return its id."""
+        return await self.run("hash-object", "-w", "--stdin", input=content)
+
+    async def mktree(self, entries):
+        """Write a tree object from (mode, name, sha) entries and return its id."""
+        return await self._request(("mktree", "--batch"), mktree_input(entries)) or None
+
+    async def update_ref(self, ref, new, old=None):
+        """Atomically move ref from old to new; returns True on success."""
+        proc = await self._helper("update-ref", "-m", "commit", "--stdin")
+        proc.stdin.write(update_ref_input(ref, new, old))
+        await proc.stdin.drain()
+        for expected in UPDATE_REF_REPLIES:
+            if (await proc.stdout.readline()).rstrip(b"\n") != expected:
+                # A failed transaction kills the helper; it is restarted on next use
+                await proc.wait()
+                return False
+        return True
+
+    async def update_index_entry(self, path, blob):
+        """See GitSession.update_index_entry."""
+        if self.bare:
+            return
+        self._pending_index[path] = blob
+        if await self.run(*update_index_args(path, blob)) is not None:
+            del self._pending_index[path]
+
+    async def commit_file(self, path, message, content=None):
+        """Commit a single file; returns the new commit id, or None on failure.
+
+        Builds the same commands as GitSession.commit_file, with the helper
+        pipes driven through asyncio streams. The caller holds the
+        repository lock (through hold_async, which is not re-entrant).
+        """
+        plumbing = self.bare or await self.can_use_plumbing()
+        return await self._drive(commit_file_steps(path, message, content, self.bare, plumbing))
+
+    async def sync_index(self):
+        """Retry index updates that failed after a plumbing commit."""
+        if not self._pending_index:
+            return
+        info = index_info_input(self._pending_index)
+        async with self.lock.hold_async():
+            if await self.run("update-index", "--add", "--index-info", input=info) is None:
+                return
+        self._pending_index.clear()
+
+    async def close(self):
+        """Sync the index and shut down all helper processes."""
+        await self.sync_index()
+        for proc in self._helpers.values():
+            if proc.returncode is None:
+                proc.stdin.close()
+                await proc.wait()
+        self._helpers.clear()
+
+class AsyncCommitScheduler(CommitScheduler):
+    """CommitScheduler that awaits the generator's coroutines on the loop."""
+
+    async def run_blocking(self, func, *args):
+        if asyncio.iscoroutinefunction(func):
+            return await func(*args)
+        return await super().run_blocking(func, *args)
+
+class AsyncAutoCommitGenerator(AutoCommitGenerator):
+    """AutoCommitGenerator whose commit, push and daily run are coroutines.
+
+    Commits go through AsyncGitSession, or through NativeCommitter when the
+    native engine is configured, since it normally spawns no git process at
+    all. Pushes run at the end of the day or batch rather than
+    from the background push thread.
+    """
+
+    def __init__(self, repo_path=None, config_file="commit_config.json", limit=None, bare=False):
+        super().__init__(repo_path, config_file, bare)
+        self.agit = AsyncGitSession(self.repo_path, metrics=self.metrics, limit=limit)
+        self.last_push_seconds = None
+
+    def ensure_git_repo(self):
+        ok = super().ensure_git_repo()
+        self.agit.bare = self.bare
+        # Resolved here, once the repository exists: finding its path spawns git
+        self.agit.lock = self.git.lock
+        return ok
+
+    async def blocking(self, func, *args):
+        """Run synchronous work (file writes, fsync, SQLite, setup that spawns git) off the loop."""
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    async def make_commit(self, message=None, plan=None, index=None):
+        """Make a single commit; see AutoCommitGenerator.make_commit."""
+        await self.governor.acquire_async("commit", metrics=self.metrics)
+        async with self.agit.lock.hold_async():
+            with self.metrics.timer("commit") as measurement:
+                started = time.time()
+                # A bare repository's log reads its blob from git on first use
+                await self.blocking(self.modify_activity_file)
+                if not message:
+                    message = self.messages.sample()
+
+                log = self.activity_log
+                if self.committer is self.git:
+                    result = await self.agit.commit_file(log.relative_path, message, content=log.content)
+                else:
+                    result = await self.blocking(self.committer.commit_file, log.relative_path, message,
+                                                 log.content)
+                await self.blocking(self.record_commit, started, result, message, plan, index)
+
+                timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+                if result is None:
+                    measurement["exit_code"] = 1
+                    print(f"[{timestamp}] Failed to commit: {message}")
+                    self.report_progress(type="commit", ok=False, message=message)
+                    return False
+                if plan is not None:
+                    day = datetime.date.fromisoformat(plan["date"])
+                    await self.blocking(self.journal.record, day, plan["id"], index, result, message)
+                print(f"[{timestamp}] Committed: {message}")
+                self.report_progress(type="commit", ok=True, message=message)
+                return True
+
+    async def push_to_remote(self):
+        """Push to the configured remote, retrying network errors with backoff; returns True on success.
+
+        Each attempt is saved to the push pipeline's state file, as a push
+        from the background thread would be.
+        """
+        print(f"Pushing {self.repo_path.name} to remote repository...")
+        # Created off the loop: it reads its state file and resolves HEAD
+        pipeline = await self.blocking(lambda: self.push_pipeline)
+        args = pipeline.push_args()
+        attempts = pipeline.max_attempts
+        delay = pipeline.retry_delay
+        pushed = False
+        pushed_at = time.time()
+        head = await self.agit.rev_parse("HEAD")
+        for attempt in range(1, attempts + 1):
+            await self.governor.acquire_async("push", metrics=self.metrics)
+            started = time.perf_counter()
+            code, _, stderr = await self.agit.call(*args)
+            seconds = time.perf_counter() - started
+            self.metrics.record("push", seconds, exit_code=code, attempt=attempt)
+            reason = await self.blocking(pipeline.note_attempt, pushed_at, attempt, code == 0, seconds, head, stderr)
+            if code == 0:
+                pushed = True
+                self.last_push_seconds = seconds
+                break
+            # Rejections, a missing upstream or bad credentials fail the same way every time
+            if not is_transient(stderr) or attempt == attempts:
+                break
+            print(f"Push of {self.repo_path.name} failed ({reason}); retrying in {delay:g}s")
+            await asyncio.sleep(delay)
+            delay *= pipeline.backoff
+        await self.blocking(pipeline.record_history, pushed_at, seconds, pushed, head, attempt)
+        if pushed:
+            print(f"Successfully pushed {self.repo_path.name} to remote!")
+        else:
+            print(f"Failed to push {self.repo_path.name}: {stderr.strip()}")
+        self.report_progress(type="push", ok=pushed)
+        return pushed
+
+    async def finish_day(self, successful_commits, num_commits):
+        """Print the daily summary and push the day's commits."""
+        await self.agit.sync_index()
+        print(f"\nDaily Summary ({self.repo_path.name}):")
+        print(f"Completed: {successful_commits}/{num_commits} commits")
+        print(f"Finished at: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        pushed = await self.push_to_remote() if successful_commits > 0 else False
+        await self.blocking(self.run_maintenance, self.last_push_seconds)
+        self.metrics.print_summary()
+        self.metrics.flush()
+        self.metrics.reset()
+        return pushed
+
+    async def run_daily(self, resume=False, forever=False, schedule=None, test=False):
+        """Run today's planned commits at their scheduled times, then push.
+
+        resume, forever, schedule and test are as for run_daily_commits.
+        """
+        if not await self.blocking(self.ensure_git_repo):
+            print(f"❌ No remote repository configured for {self.repo_path}")
+            return False
+        # Resolving state paths spawns git; do it once, off the loop
+        scheduler = await self.blocking(lambda: AsyncCommitScheduler(self, schedule_path=schedule, test=test))
+        await self.blocking(lambda: self.journal)
+        await self.blocking(lambda: self.history)
+        try:
+            if forever:
+                return await scheduler.run_forever()
+            return await scheduler.run_day(datetime.date.today(), resume)
+        finally:
+            # Helper processes belong to this event loop
+            await self.agit.close()
+
+    async def run_batch(self, count):
+        """Make count commits back to back; returns the number made."""
+        committed = 0
+        for _ in range(count):
+            if self.cancel_event.is_set():
+                break
+            if await self.make_commit():
+                committed += 1
+        await self.agit.sync_index()
+        return committed
+
+    async def aclose(self):
+        """close() for use on the event loop, including the async helpers."""
+        await self.agit.close()
+        await self.blocking(self.close)
+
+class AsyncRepoRunner:
+    """MultiRepoRunner on one event loop: commits and pushes overlap across repositories."""
+
+    def __init__(self, manifest_path, concurrency=None):
+        manifest = MultiRepoRunner(manifest_path)
+        self.repos = manifest.repos
+        self.concurrency = concurrency or DEFAULT_CONCURRENCY
+        self.limit = None
+
+    async def run_repo(self, entry, started):
+        """Commit to and push one repository; returns its result record."""
+        result = {"repo": str(entry["path"]), "planned": 0, "committed": 0,
+                  "pushed": None, "commit_seconds": 0.0, "push_seconds": 0.0, "error": None,
+                  "committed_at": 0.0}
+        loop = asyncio.get_running_loop()
+        generator = None
+        try:
+            generator = await loop.run_in_executor(
+                None, lambda: AsyncAutoCommitGenerator(entry["path"], entry.get("config", "commit_config.json"),
+                                                       limit=self.limit))
+            if not await generator.blocking(generator.ensure_git_repo):
+                result["error"] = "no remote configured"
+                return result
+            config = generator.config
+            count = entry.get("commits") or random.randint(config["min_commits"], config["max_commits"])
+            result["planned"] = count
+            repo_started = time.perf_counter()
+            result["committed"] = await generator.run_batch(count)
+            result["commit_seconds"] = time.perf_counter() - repo_started
+            result["committed_at"] = time.perf_counter() - started
+            if result["committed"]:
+                push_started = time.perf_counter()
+                result["pushed"] = await generator.push_to_remote()
+                result["push_seconds"] = time.perf_counter() - push_started
+                await generator.blocking(generator.run_maintenance, generator.last_push_seconds)
+        except Exception as e:
+            result["error"] = str(e) or type(e).__name__
+        finally:
+            if generator is not None:
+                await generator.aclose()
+        return result
+
+    async def run_async(self):
+        self.limit = asyncio.Semaphore(self.concurrency)
+        started = time.perf_counter()
+        results = await asyncio.gather(*(self.run_repo(entry, started) for entry in self.repos))
+        return list(results), time.perf_counter() - started
+
+    def run(self):
+        """Commit to and push every repository; returns result records."""
+        print(f"Running {len(self.repos)} repositories on one event loop "
+              f"with up to {self.concurrency} concurrent git processes...")
+        results, elapsed = asyncio.run(self.run_async())
+        # Pushes start as soon as a repository's commits are done, so the
+        # phases overlap; report commits up to the last one, pushes after
+        commit_phase = max((r.pop("committed_at") for r in results), default=0.0)
+        MultiRepoRunner.print_summary(results, commit_phase, max(0.0, elapsed - commit_phase))
+        return results
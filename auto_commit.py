@@ -4,306 +4,531 @@ Automated Daily Commit Generator
 Runs daily to generate 15-25 commits with realistic messages and timing distribution.
 """
 
-import os
 import sys
-import subprocess
-import random
 import datetime
+import copy
+import argparse
+import threading
 import time
-import json
 from pathlib import Path
 
+from activity_writer import ActivityLogWriter, BareActivityLog
+from catalogue import compile_catalogue
+from config_loader import ConfigWatcher, load_config, save_config
+from git_backend import GitSession
+import governor
+from journal import CommitJournal
+from maintenance import RepoMaintenance
+from metrics import Metrics
+from object_store import NativeCommitter
+from planner import CommitPlanner
+from push_pipeline import PushPipeline
+
+DEFAULT_MESSAGES = [
+    "Fix typo in documentation",
+    "Update README formatting", 
+    "Refactor code structure",
+    "Add error handling",
+    "Improve performance optimization",
+    "Update dependencies to latest versions",
+    "Fix bug in main function",
+    "Add new feature implementation",
+    "Remove unused code and imports",
+    "Update configuration settings",
+    "Enhance user experience",
+    "Fix security vulnerability",
+    "Optimize algorithm efficiency",
+    "Add comprehensive unit tests",
+    "Update inline comments",
+    "Clean up code formatting",
+    "Fix linting issues",
+    "Add robust logging functionality",
+    "Bump version number",
+    "Merge feature branch updates",
+    "Implement code review feedback",
+    "Add input validation",
+    "Fix memory leak issue",
+    "Update API documentation",
+    "Improve error messages",
+    "Add configuration validation",
+    "Fix race condition bug",
+    "Optimize database queries",
+    "Add retry mechanism",
+    "Update test coverage",
+    "Fix edge case handling",
+    "Improve code readability",
+    "Add progress indicators",
+    "Fix timezone handling",
+    "Update logging levels",
+    "Add cache invalidation",
+    "Fix string formatting",
+    "Improve exception handling",
+    "Add health check endpoint",
+    "Update build configuration",
+    "Fix null pointer exception",
+    "Add request timeout handling",
+    "Improve data validation",
+    "Fix concurrent access issue",
+    "Update environment variables",
+    "Add monitoring metrics",
+    "Fix resource cleanup",
+    "Improve startup performance",
+    "Add graceful shutdown",
+    "Fix character encoding issue"
+]
+
+ACTIVITIES = [
+    "Code optimization performed",
+    "Documentation updated", 
+    "Bug fix implemented",
+    "Feature enhancement added",
+    "Security improvement made",
+    "Performance tuning completed",
+    "Code refactoring done",
+    "Unit tests updated",
+    "Configuration adjusted",
+    "Dependencies reviewed",
+    "Error handling improved",
+    "Logging functionality enhanced",
+    "Code cleanup performed",
+    "Algorithm optimization",
+    "User interface improved",
+    "Database query optimized",
+    "API endpoint updated",
+    "Memory usage optimized",
+    "Code coverage increased",
+    "Build process improved"
+]
+
 class AutoCommitGenerator:
-    def __init__(self, repo_path=None, config_file="commit_config.json"):
+    def __init__(self, repo_path=None, config_file="commit_config.json", bare=False):
         self.repo_path = Path(repo_path) if repo_path else Path.cwd()
         self.config_file = self.repo_path / config_file
+        self.metrics = Metrics()
+        self.git = GitSession(self.repo_path, metrics=self.metrics)
         self.load_config()
+        self.init_state(bare)
+
+    def init_state(self, bare=False):
+        """Set up the state every generator shares, once repo_path, config_file, config and git are set.
+
+        SimulatedGenerator calls this directly instead of __init__, which
+        reads and creates the config file.
+        """
+        # Commit into a bare repository, building the log in memory from HEAD
+        self.bare = bare
+        self.committer = self.git
+        # Commit and push rate limits, shared with anything else driving this repository
+        self.governor = governor.for_repo(self.repo_path, self.config["max_commits_per_second"],
+                                          self.config["max_pushes_per_minute"])
         
-        # Default commit messages
-        default_messages = [
-            "Fix typo in documentation",
-            "Update README formatting", 
-            "Refactor code structure",
-            "Add error handling",
-            "Improve performance optimization",
-            "Update dependencies to latest versions",
-            "Fix bug in main function",
-            "Add new feature implementation",
-            "Remove unused code and imports",
-            "Update configuration settings",
-            "Enhance user experience",
-            "Fix security vulnerability",
-            "Optimize algorithm efficiency",
-            "Add comprehensive unit tests",
-            "Update inline comments",
-            "Clean up code formatting",
-            "Fix linting issues",
-            "Add robust logging functionality",
-            "Bump version number",
-            "Merge feature branch updates",
-            "Implement code review feedback",
-            "Add input validation",
-            "Fix memory leak issue",
-            "Update API documentation",
-            "Improve error messages",
-            "Add configuration validation",
-            "Fix race condition bug",
-            "Optimize database queries",
-            "Add retry mechanism",
-            "Update test coverage",
-            "Fix edge case handling",
-            "Improve code readability",
-            "Add progress indicators",
-            "Fix timezone handling",
-            "Update logging levels",
-            "Add cache invalidation",
-            "Fix string formatting",
-            "Improve exception handling",
-            "Add health check endpoint",
-            "Update build configuration",
-            "Fix null pointer exception",
-            "Add request timeout handling",
-            "Improve data validation",
-            "Fix concurrent access issue",
-            "Update environment variables",
-            "Add monitoring metrics",
-            "Fix resource cleanup",
-            "Improve startup performance",
-            "Add graceful shutdown",
-            "Fix character encoding issue"
-        ]
-        
-        # Use custom messages if available, otherwise use defaults
-        if "custom_messages" in self.config and self.config["custom_messages"]:
-            self.commit_messages = self.config["custom_messages"] + default_messages
-        else:
-            self.commit_messages = default_messages
+        self.build_message_table()
         
         self.target_file = "activity_log.txt"
         self.base_content = "# Daily Activity Log\n\nThis file tracks automated daily development activity.\n\n"
+        self._activity_log = None
+        self._push_pipeline = None
+        self._journal = None
+        self._maintenance = None
+        self._history = None
+        # Optional callable receiving progress event dicts, e.g. from the GUI
+        self.progress = None
+        self.cancel_event = threading.Event()
+
+    @property
+    def push_pipeline(self):
+        """Background push stage, created on first use."""
+        if self._push_pipeline is None:
+            self._push_pipeline = PushPipeline(
+                self.repo_path,
+                interval=self.config["push_interval_minutes"] * 60,
+                max_attempts=self.config["push_max_attempts"],
+                remote=self.config["push_remote"],
+                metrics=self.metrics,
+                governor=self.governor,
+                history=self.history
+            )
+        return self._push_pipeline
+
+    @property
+    def journal(self):
+        """Crash-safe record of planned commits, opened on first use."""
+        if self._journal is None:
+            self._journal = CommitJournal(self.git.state_path("journal"))
+        return self._journal
+
+    @property
+    def maintenance(self):
+        """Repacking and commit-graph stage, created on first use."""
+        if self._maintenance is None:
+            self._maintenance = RepoMaintenance(
+                self.git,
+                loose_threshold=self.config["maintenance_loose_objects"],
+                max_packs=self.config["maintenance_max_packs"]
+            )
+        return self._maintenance
+
+    @property
+    def history(self):
+        """Run-history index shared with the push stage, or None if disabled."""
+        if self._history is None:
+            if self.config["run_history"]:
+                # sqlite3 is only imported by runs that record
+                from history import open_history
+                self._history = open_history() or False
+            else:
+                self._history = False
+        return self._history or None
+
+    @property
+    def activity_log(self):
+        """Writer for the activity log, opened on first use."""
+        if self._activity_log is None:
+            if self.bare:
+                self._activity_log = BareActivityLog(
+                    self.git, self.target_file, self.base_content, ACTIVITIES,
+                    max_bytes=self.config["activity_log_max_bytes"]
+                )
+            else:
+                self._activity_log = ActivityLogWriter(
+                    self.repo_path, self.target_file, self.base_content, ACTIVITIES,
+                    max_bytes=self.config["activity_log_max_bytes"]
+                )
+        return self._activity_log
 
     def load_config(self):
         """Load configuration from JSON file or create default."""
-        default_config = {
-            "min_commits": 15,
-            "max_commits": 25,
-            "min_delay_minutes": 5,
-            "max_delay_minutes": 45,
-            "work_hours_start": 9,
-            "work_hours_end": 18,
-            "enable_random_timing": True
-        }
-        
-        if self.config_file.exists():
-            try:
-                with open(self.config_file, 'r') as f:
-                    self.config = json.load(f)
-                # Merge with defaults for any missing keys
-                for key, value in default_config.items():
-                    if key not in self.config:
-                        self.config[key] = value
-            except:
-                self.config = default_config
-        else:
-            self.config = default_config
-            self.save_config()
+        self.config = load_config(self.config_file, create=True)
+        self.config_watcher = ConfigWatcher(self.config_file)
+
+    def refresh_config(self):
+        """Pick up edits to the config file; returns True if it changed."""
+        version = self.config_watcher.version
+        config = self.config_watcher.current()
+        if self.config_watcher.version == version:
+            return False
+        self.config = copy.deepcopy(config)
+        self.build_message_table()
+        self.governor.set_limits(self.config["max_commits_per_second"], self.config["max_pushes_per_minute"])
+        # Rebuilt with the new thresholds on next use
+        self._maintenance = None
+        return True
+
+    def build_message_table(self):
+        """Compile the weighted message catalogue: custom messages, catalogue file, defaults."""
+        path = self.config["message_catalogue"]
+        cache_path = None
+        if path:
+            # Relative to the config file that names it
+            path = self.config_file.parent / path
+            # Large catalogues are compiled once and cached until the file changes
+            if self.bare or (self.repo_path / ".git").exists():
+                cache_path = self.git.state_path("messages-cache.json")
+        variables = {"repo": self.repo_path.resolve().name, **self.config["message_variables"]}
+        self.messages = compile_catalogue(self.config["custom_messages"], path, DEFAULT_MESSAGES,
+                                          cache_path=cache_path, variables=variables)
 
     def save_config(self):
         """Save current configuration to JSON file."""
-        with open(self.config_file, 'w') as f:
-            json.dump(self.config, f, indent=2)
+        save_config(self.config_file, self.config)
 
-    def run_git_command(self, command):
+    def report_progress(self, **event):
+        """Forward a progress event to the registered callback, if any."""
+        if self.progress is not None:
+            self.progress(event)
+
+    def run_git_command(self, *args, input=None):
         """Execute a git command and return the result."""
-        try:
-            result = subprocess.run(
-                command,
-                cwd=self.repo_path,
-                shell=True,
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            return result.stdout.strip()
-        except subprocess.CalledProcessError as e:
-            print(f"Git command failed: {e}")
-            print(f"Error output: {e.stderr}")
-            return None
+        return self.git.run(*args, input=input)
 
     def ensure_git_repo(self):
         """Ensure we're in a git repository."""
-        if not (self.repo_path / ".git").exists():
+        if (self.repo_path / ".git").exists():
+            if self.bare:
+                print("Note: repository has a working tree; ignoring --bare")
+                self.bare = False
+        elif (self.repo_path / "HEAD").exists() and self.git.is_bare():
+            if not self.bare:
+                print("Note: bare repository; committing without a working tree")
+                self.bare = True
+        elif self.bare:
+            print("Not a git repository. Initializing a bare repository...")
+            self.repo_path.mkdir(parents=True, exist_ok=True)
+            self.run_git_command("init", "--bare")
+        else:
             print("Not a git repository. Initializing...")
-            self.run_git_command("git init")
+            self.run_git_command("init")
+        
+        if self.config["engine"] == "native":
+            if NativeCommitter.supported(self.git):
+                self.committer = NativeCommitter(self.git)
+            else:
+                print("Note: repository uses hooks, signing, unusual config or has no identity; using the git engine")
             
         # Check if we have a remote origin
-        result = self.run_git_command("git remote -v")
+        result = self.run_git_command("remote", "-v")
         if not result:
             print("Warning: No remote repository configured.")
             return False
         return True
 
     def modify_activity_file(self):
-        """Modify the single activity log file."""
-        filepath = self.repo_path / self.target_file
-        
-        if not filepath.exists():
-            with open(filepath, 'w') as f:
-                f.write(self.base_content)
-        
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        activities = [
-            "Code optimization performed",
-            "Documentation updated", 
-            "Bug fix implemented",
-            "Feature enhancement added",
-            "Security improvement made",
-            "Performance tuning completed",
-            "Code refactoring done",
-            "Unit tests updated",
-            "Configuration adjusted",
-            "Dependencies reviewed",
-            "Error handling improved",
-            "Logging functionality enhanced",
-            "Code cleanup performed",
-            "Algorithm optimization",
-            "User interface improved",
-            "Database query optimized",
-            "API endpoint updated",
-            "Memory usage optimized",
-            "Code coverage increased",
-            "Build process improved"
-        ]
-        
-        activity = random.choice(activities)
-        new_entry = f"[{timestamp}] {activity}\n"
-        
-        with open(filepath, 'a') as f:
-            f.write(new_entry)
+        """Append a new entry to the activity log."""
+        with self.metrics.timer("activity_write") as measurement:
+            line = self.activity_log.append_entry()
+            measurement["bytes_written"] = len(line.encode())
+        return line
 
-    def make_commit(self, message=None):
-        """Make a single commit."""
-        self.modify_activity_file()
+    def make_commit(self, message=None, plan=None, index=None):
+        """Make a single commit.
         
-        self.run_git_command(f"git add {self.target_file}")
-        
-        if not message:
-            message = random.choice(self.commit_messages)
-        
-        commit_msg = f'"{message}"'
-        result = self.run_git_command(f"git commit -m {commit_msg}")
-        
-        if result is not None:
-            timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-            print(f"[{timestamp}] Committed: {message}")
-            return True
-        else:
-            timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-            print(f"[{timestamp}] Failed to commit: {message}")
+        With a plan, a successful commit is journaled as that plan's index
+        so --resume can skip it after a crash. Waits first for the
+        governor's commit rate limit, outside the repository lock.
+        """
+        if not self.governor.acquire("commit", cancel_event=self.cancel_event, metrics=self.metrics):
             return False
-
-    def generate_commit_times(self, num_commits):
-        """Generate realistic commit times throughout the day."""
-        if not self.config["enable_random_timing"]:
-            # Simple even distribution
-            return [i * (self.config["max_delay_minutes"] // num_commits) for i in range(num_commits)]
-        
-        times = []
-        work_start = self.config["work_hours_start"] * 60  # Convert to minutes
-        work_end = self.config["work_hours_end"] * 60
-        work_duration = work_end - work_start
-        
-        # Generate more commits during work hours
-        work_commits = int(num_commits * 0.7)  # 70% during work hours
-        off_commits = num_commits - work_commits
-        
-        # Work hour commits
-        for _ in range(work_commits):
-            time_offset = random.randint(0, work_duration)
-            times.append(work_start + time_offset)
-        
-        # Off-hour commits (early morning, evening)
-        for _ in range(off_commits):
-            if random.choice([True, False]):
-                # Early morning (6 AM - 9 AM)
-                time_offset = random.randint(6 * 60, work_start)
+        # Serialised with any other process committing to this repository
+        with self.git.lock.hold(), self.metrics.timer("commit") as measurement:
+            started = time.time()
+            self.modify_activity_file()
+            
+            if not message:
+                message = self.messages.sample()
+            
+            log = self.activity_log
+            result = self.committer.commit_file(log.relative_path, message, content=log.content)
+            self.record_commit(started, result, message, plan, index)
+            
+            if result is not None:
+                if plan is not None:
+                    day = datetime.date.fromisoformat(plan["date"])
+                    self.journal.record(day, plan["id"], index, result, message)
+                self.push_pipeline.notify()
+                timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+                print(f"[{timestamp}] Committed: {message}")
+                self.report_progress(type="commit", ok=True, message=message)
+                return True
             else:
-                # Evening (6 PM - 11 PM)
-                time_offset = random.randint(work_end, 23 * 60)
-            times.append(time_offset)
-        
-        return sorted(times)
+                measurement["exit_code"] = 1
+                timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+                print(f"[{timestamp}] Failed to commit: {message}")
+                self.report_progress(type="commit", ok=False, message=message)
+                return False
 
-    def run_daily_commits(self):
-        """Run the daily commit generation process."""
-        if not self.ensure_git_repo():
-            print("❌ No remote repository configured. Please set up your remote first:")
-            print("git remote add origin https://github.com/yourusername/your-repo.git")
-            return False
+    def record_commit(self, started, sha, message, plan=None, index=None):
+        """Add a commit (sha None if it failed) to the run history, with its planned time."""
+        history = self.history
+        if history is not None:
+            planned = plan["fire_at"][index] if plan is not None else None
+            history.record(self.repo_path, "commit", started, time.time() - started, sha is not None,
+                           sha=sha, planned=planned, detail=message)
 
-        # Generate random number of commits for today
-        num_commits = random.randint(self.config["min_commits"], self.config["max_commits"])
-        
+    def generate_commit_times(self, num_commits):
+        """Generate realistic commit times (minutes since midnight) for one day."""
+        return CommitPlanner(self.config).draw_minutes([num_commits])[0]
+
+    def start_day(self, num_commits):
+        """Announce the start of a day's commit run."""
         print(f"Starting daily commit generation...")
         print(f"Target commits for today: {num_commits}")
         print(f"Started at: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        
-        successful_commits = 0
-        commit_times = self.generate_commit_times(num_commits)
-        
-        for i, _ in enumerate(commit_times):
-            if self.make_commit():
-                successful_commits += 1
-            
-            # Add realistic delay between commits (except for the last one)
-            if i < len(commit_times) - 1:
-                min_delay = self.config["min_delay_minutes"] * 60  # Convert to seconds
-                max_delay = self.config["max_delay_minutes"] * 60
-                
-                # Check if no delay is set (both min and max are 0)
-                if min_delay == 0 and max_delay == 0:
-                    delay = 0
-                else:
-                    delay = random.randint(min_delay, max_delay) if max_delay > 0 else 0
-                
-                if delay > 0:
-                    next_commit_time = datetime.datetime.now() + datetime.timedelta(seconds=delay)
-                    print(f"Next commit in {delay//60} minutes at {next_commit_time.strftime('%H:%M:%S')}")
-                    time.sleep(delay)
-                else:
-                    print("No delay - continuing immediately...")
-        
+        self.report_progress(type="start", total=num_commits)
+
+    def finish_day(self, successful_commits, num_commits):
+        """Print the daily summary and push the day's commits."""
+        self.git.sync_index()
         print(f"\nDaily Summary:")
         print(f"Completed: {successful_commits}/{num_commits} commits")
         print(f"Finished at: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         
         # Auto push to remote
-        if successful_commits > 0:
-            print("Pushing to remote repository...")
-            result = self.run_git_command("git push")
-            if result is not None:
-                print("Successfully pushed to remote!")
-                return True
-            else:
-                print("Failed to push. Check your remote configuration.")
-                return False
+        pushed = self.push_to_remote() if successful_commits > 0 else False
+        self.run_maintenance()
         
-        return successful_commits > 0
+        self.metrics.print_summary()
+        self.metrics.flush()
+        self.metrics.reset()
+        
+        return pushed
+
+    def push_to_remote(self):
+        """Push committed work to the configured remote, retrying on failure."""
+        print("Pushing to remote repository...")
+        pushed = self.push_pipeline.flush()
+        if pushed:
+            print("Successfully pushed to remote!")
+        else:
+            print("Failed to push. Check your remote configuration.")
+        self.report_progress(type="push", ok=pushed)
+        return pushed
+
+    def run_maintenance(self, push_seconds=None):
+        """Repack and write commit-graph/bitmaps if loose objects have piled up.
+
+        Runs after the day's push, so it never delays a commit. push_seconds
+        defaults to the push pipeline's latest push.
+        """
+        if not self.config["maintenance_loose_objects"]:
+            return None
+        if push_seconds is None and self._push_pipeline is not None:
+            push_seconds = self._push_pipeline.last_push_seconds()
+        self.maintenance.note_push(push_seconds)
+        return self.maintenance.run(push_seconds=push_seconds)
+
+    def run_daily_commits(self, resume=False, forever=False, schedule=None, test=False):
+        """Run the daily commit generation process.
+
+        Commits fire at the times in the multi-day schedule (see planner.py)
+        from an asyncio event loop instead of sleeping between commits. With
+        resume, today's persisted plan is continued after a crash; with
+        forever, the process stays up and serves one day after another.
+        schedule names a plan file from planner.py to use instead of the one
+        kept in the repository's state directory. A test run starts its
+        commits now and leaves the saved plan and schedule alone.
+        """
+        if not self.ensure_git_repo():
+            print("❌ No remote repository configured. Please set up your remote first:")
+            print("git remote add origin https://github.com/yourusername/your-repo.git")
+            return False
+
+        # asyncio is the slowest import on the startup path; only the runner needs it
+        import asyncio
+        from scheduler import CommitScheduler
+        
+        scheduler = CommitScheduler(self, schedule_path=schedule, test=test)
+        self.push_pipeline.start()
+        if forever:
+            asyncio.run(scheduler.run_forever())
+        return asyncio.run(scheduler.run_day(datetime.date.today(), resume))
+
+    def close(self):
+        """Release the activity log and git helper processes."""
+        if self._activity_log is not None:
+            self._activity_log.close()
+        if self._push_pipeline is not None:
+            self._push_pipeline.stop()
+        if self._journal is not None:
+            self._journal.close()
+        if self._history:
+            self._history.close()
+        self.git.close()
+        self.metrics.close()
 
 def main():
-    if len(sys.argv) > 1 and sys.argv[1] == "--test":
+    parser = argparse.ArgumentParser(description="Generate a day's worth of realistic commits")
+    parser.add_argument("--test", action="store_true", help="Generate a few commits quickly for testing")
+    parser.add_argument("--resume", action="store_true", help="Continue today's saved plan instead of starting a new one")
+    parser.add_argument("--forever", action="store_true", help="Keep running and serve one day after another")
+    parser.add_argument("--repos", type=str, help="JSON manifest of repositories to commit to and push from one process")
+    parser.add_argument("--workers", type=int, help="Worker threads for --repos (default: from manifest or CPU count)")
+    parser.add_argument("--asyncio", action="store_true",
+                        help="Drive git from one asyncio event loop instead of threads (see async_git.py)")
+    parser.add_argument("--concurrency", type=int, help="One-shot git commands run at once with --asyncio (default: 16)")
+    parser.add_argument("--metrics-out", type=str,
+                        help="Write per-phase metrics as JSON lines, or a Prometheus text file if it ends in .prom")
+    parser.add_argument("--plan", type=str, help="Use a schedule written by planner.py --out")
+    parser.add_argument("--bare", action="store_true",
+                        help="The repository is bare: commit without a working tree or index")
+    parser.add_argument("--log-file", type=str,
+                        help="Also write output to this log, rotated by size and day with old segments gzipped")
+    parser.add_argument("--log-max-bytes", type=int, default=1024 * 1024, help="Rotate the log at this size")
+    parser.add_argument("--log-backups", type=int, default=30, help="Rotated log segments to keep")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Stay resident and schedule this repository (or every --repos entry) in the foreground")
+    parser.add_argument("--control", type=str, help="Control socket path for --daemon and --status")
+    parser.add_argument("--status", action="store_true", help="Show the status of a running daemon")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile the run and print where the time went (Python vs git vs lock waits)")
+    parser.add_argument("--profile-out", type=str,
+                        help="Also write the profile as JSON for profiling.py --compare, plus raw .pstats")
+    parser.add_argument("--profile-memory", action="store_true", help="Include tracemalloc allocation sites")
+    
+    args = parser.parse_args()
+    
+    if args.repos and not args.daemon:
+        # A --repos run commits each repository back to back, without a daily plan or journal
+        unsupported = [flag for flag, value in (("--test", args.test), ("--resume", args.resume),
+                                                ("--forever", args.forever), ("--plan", args.plan),
+                                                ("--bare", args.bare), ("--metrics-out", args.metrics_out))
+                       if value]
+        if unsupported:
+            parser.error(f"{', '.join(unsupported)} cannot be used with --repos")
+    
+    if args.status:
+        from daemon import print_status, query
+        status = query(args.control)
+        if status is None:
+            print("No daemon is running")
+            sys.exit(1)
+        print_status(status)
+        return
+    
+    if args.log_file:
+        from run_log import attach
+        attach(args.log_file, args.log_max_bytes, args.log_backups)
+    
+    if args.profile or args.profile_out or args.profile_memory:
+        from profiling import run_profiled
+        run_profiled(lambda: run(args), out=args.profile_out, memory=args.profile_memory)
+    else:
+        run(args)
+
+def run(args):
+    """Run what main()'s arguments ask for."""
+    if args.daemon:
+        import asyncio
+        from daemon import CommitDaemon
+        if args.repos:
+            from multi_repo import MultiRepoRunner
+            repos = MultiRepoRunner(args.repos).repos
+        else:
+            repos = [{"path": Path.cwd()}]
+        daemon = CommitDaemon(repos, control_path=args.control, workers=args.workers)
+        try:
+            asyncio.run(daemon.run())
+        finally:
+            daemon.close()
+        return
+    
+    if args.repos and args.asyncio:
+        from async_git import AsyncRepoRunner
+        results = AsyncRepoRunner(args.repos, concurrency=args.concurrency).run()
+        sys.exit(0 if all(r["error"] is None and r["pushed"] is not False for r in results) else 1)
+    
+    if args.repos:
+        from multi_repo import MultiRepoRunner
+        results = MultiRepoRunner(args.repos, workers=args.workers).run()
+        sys.exit(0 if all(r["error"] is None and r["pushed"] is not False for r in results) else 1)
+    
+    if args.asyncio:
+        import asyncio
+        from async_git import AsyncAutoCommitGenerator
+        generator = AsyncAutoCommitGenerator(bare=args.bare)
+    else:
+        generator = AutoCommitGenerator(bare=args.bare)
+    if args.metrics_out:
+        generator.metrics.configure_output(args.metrics_out)
+    if args.test:
         # Test mode - generate a few commits quickly
-        generator = AutoCommitGenerator()
         generator.config["min_commits"] = 3
         generator.config["max_commits"] = 5
         generator.config["min_delay_minutes"] = 0
         generator.config["max_delay_minutes"] = 1
+        generator.config["enable_random_timing"] = False
         print("Running in test mode...")
-        generator.run_daily_commits()
-    else:
-        # Normal daily mode
-        generator = AutoCommitGenerator()
-        generator.run_daily_commits()
+    
+    try:
+        if args.asyncio:
+            asyncio.run(generator.run_daily(resume=args.resume, forever=args.forever, schedule=args.plan,
+                                            test=args.test))
+        else:
+            generator.run_daily_commits(resume=args.resume, forever=args.forever, schedule=args.plan,
+                                        test=args.test)
+    except KeyboardInterrupt:
+        print("\nInterrupted. Commits made so far are journaled; continue with --resume")
+    finally:
+        generator.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Commit Hot Path Benchmarks
+Measures make_commit for each commit engine against throwaway repositories of
+varying history depth and activity log size, plus the planning and log
+writing helpers it depends on. Each case runs in its own interpreter so peak
+RSS is attributable to that case alone. RSS is the benchmark interpreter's
+own; git's memory is not measured, and on Windows RSS is not reported.
+
+Usage:
+    python benchmarks/bench_commit.py
+    python benchmarks/bench_commit.py --commits 500 --json results.json
+    python benchmarks/bench_commit.py --compare results.json --tolerance 0.2
+
+Compare runs should use the same --commits as the baseline; small runs are
+dominated by warm-up noise.
+"""
+
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+ENGINES = ("porcelain", "sequential", "native", "fast-import")
+HISTORY_DEPTHS = (0, 2000)
+LOG_LINES = (0, 5000)
+
+# Counted by wrapping Popen._execute_child, which every subprocess call goes through
+_spawns = 0
+_execute_child = subprocess.Popen._execute_child
+
+def _counting_execute_child(self, *args, **kwargs):
+    global _spawns
+    _spawns += 1
+    return _execute_child(self, *args, **kwargs)
+
+subprocess.Popen._execute_child = _counting_execute_child
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+def make_repo(path, history, log_lines):
+    """Create a repository with the requested history depth and log size."""
+    from commit_generator import CommitGenerator
+
+    env_git = ["git", "-C", str(path)]
+    subprocess.run(["git", "init", "-q", str(path)], check=True)
+    subprocess.run(env_git + ["config", "user.name", "Benchmark"], check=True)
+    subprocess.run(env_git + ["config", "user.email", "bench@example.com"], check=True)
+
+    generator = CommitGenerator(path)
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        # History first, while the log is small, so building it stays cheap
+        if history:
+            generator.fast_import_commits(history)
+        for _ in range(log_lines):
+            generator.activity_log.append(generator.activity_log.build_entry())
+        generator.make_commit("Seed activity log")
+    generator.close()
+
+def run_case(engine, template, commits):
+    """Benchmark one engine on a copy of a template repository."""
+    from commit_generator import CommitGenerator
+
+    with tempfile.TemporaryDirectory(prefix="commit-bench-") as tmp:
+        repo = Path(tmp) / "repo"
+        shutil.copytree(template, repo)
+
+        generator = CommitGenerator(repo)
+        if engine == "porcelain":
+            generator.git._plumbing_ok = False
+        elif engine == "native":
+            generator.use_native_engine()
+
+        latencies = []
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            # Warm-up commit starts helper processes and lazy state
+            generator.make_commit()
+            spawns_before = _spawns
+            started = time.perf_counter()
+            if engine == "fast-import":
+                generator.fast_import_commits(commits)
+                latencies = [(time.perf_counter() - started) / commits] * commits
+            else:
+                for _ in range(commits):
+                    commit_started = time.perf_counter()
+                    generator.make_commit()
+                    latencies.append(time.perf_counter() - commit_started)
+            elapsed = time.perf_counter() - started
+            spawns = _spawns - spawns_before
+        generator.close()
+
+    return {
+        "engine": engine,
+        "commits": commits,
+        "commits_per_sec": commits / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "spawns_per_commit": spawns / commits,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+def peak_rss_mb():
+    """Peak RSS of this interpreter in MiB, or None where getrusage is unavailable."""
+    try:
+        import resource
+    except ImportError:
+        # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and KiB elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def run_helpers(iterations):
+    """Micro-benchmarks for the pure-Python helpers on the commit path."""
+    from auto_commit import AutoCommitGenerator
+    from planner import CommitPlanner
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="commit-bench-") as tmp:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            generator = AutoCommitGenerator(tmp)
+            planner = CommitPlanner(dict(generator.config, enable_random_timing=True))
+            for name, func in (("generate_commit_times", lambda: generator.generate_commit_times(25)),
+                               (f"plan_30_days[{planner.backend}]", lambda: planner.plan(datetime.date.today(), 30)),
+                               ("modify_activity_file", generator.modify_activity_file)):
+                samples = []
+                for _ in range(iterations):
+                    started = time.perf_counter()
+                    func()
+                    samples.append(time.perf_counter() - started)
+                results.append({
+                    "case": name,
+                    "calls_per_sec": iterations / sum(samples),
+                    "p50_us": percentile(samples, 50) * 1e6,
+                    "p99_us": percentile(samples, 99) * 1e6,
+                })
+            generator.close()
+    return results
+
+def print_table(cases, helpers):
+    print(f"{'Case':<38} {'commits/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'spawns':>7} {'RSS MB':>7}")
+    for c in cases:
+        rss = f"{c['peak_rss_mb']:>7.1f}" if c["peak_rss_mb"] is not None else f"{'-':>7}"
+        print(f"{c['case']:<38} {c['commits_per_sec']:>10.1f} {c['p50_ms']:>8.2f} {c['p99_ms']:>8.2f} "
+              f"{c['spawns_per_commit']:>7.2f} {rss}")
+    print()
+    print(f"{'Helper':<38} {'calls/s':>10} {'p50 us':>8} {'p99 us':>8}")
+    for h in helpers:
+        print(f"{h['case']:<38} {h['calls_per_sec']:>10.0f} {h['p50_us']:>8.1f} {h['p99_us']:>8.1f}")
+
+def compare(results, baseline_path, tolerance):
+    """Return the cases whose throughput dropped by more than tolerance."""
+    with open(baseline_path, 'r') as f:
+        baseline = {c["case"]: c for c in json.load(f)["cases"]}
+    regressions = []
+    for case in results["cases"]:
+        old = baseline.get(case["case"])
+        if old and case["commits_per_sec"] < old["commits_per_sec"] * (1 - tolerance):
+            regressions.append((case["case"], old["commits_per_sec"], case["commits_per_sec"]))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the commit hot path")
+    parser.add_argument("--commits", type=int, default=200, help="Commits per case")
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=list(ENGINES))
+    parser.add_argument("--history", nargs="+", type=int, default=list(HISTORY_DEPTHS),
+                        help="History depths of the generated repositories")
+    parser.add_argument("--log-lines", nargs="+", type=int, default=list(LOG_LINES),
+                        help="Activity log sizes (lines) of the generated repositories")
+    parser.add_argument("--json", type=str, help="Write results to this file")
+    parser.add_argument("--compare", type=str, help="Fail if commits/s regressed against this results file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed fractional slowdown for --compare")
+    parser.add_argument("--single", nargs=2, metavar=("ENGINE", "TEMPLATE"), help=argparse.SUPPRESS)
+    parser.add_argument("--setup", nargs=3, metavar=("TEMPLATE", "HISTORY", "LOG_LINES"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.setup:
+        template, history, log_lines = args.setup
+        make_repo(Path(template), int(history), int(log_lines))
+        return
+
+    if args.single:
+        engine, template = args.single
+        print(json.dumps(run_case(engine, template, args.commits)))
+        return
+
+    cases = []
+    with tempfile.TemporaryDirectory(prefix="commit-bench-") as tmp:
+        # Record into a throwaway run history (still timed) rather than the user's
+        os.environ["COMMITMENT_ISSUES_HISTORY"] = str(Path(tmp) / "history.sqlite3")
+        for history in args.history:
+            for log_lines in args.log_lines:
+                # Built in a separate interpreter: Linux carries ru_maxrss across
+                # exec, so a large setup here would inflate every case's RSS
+                template = Path(tmp) / f"template-{history}-{log_lines}"
+                subprocess.run([sys.executable, __file__, "--setup", str(template), str(history), str(log_lines)],
+                               check=True)
+                for engine in args.engines:
+                    output = subprocess.run(
+                        [sys.executable, __file__, "--commits", str(args.commits),
+                         "--single", engine, str(template)],
+                        capture_output=True, text=True, check=True
+                    ).stdout
+                    case = json.loads(output.strip().splitlines()[-1])
+                    case.update({"case": f"{engine}/history={history}/log={log_lines}",
+                                 "history": history, "log_lines": log_lines})
+                    cases.append(case)
+
+    results = {"cases": cases, "helpers": run_helpers(1000)}
+    print_table(results["cases"], results["helpers"])
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        for case, old, new in regressions:
+            print(f"REGRESSION {case}: {old:.1f} -> {new:.1f} commits/s")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Startup Budget Check
+Imports each entry point in a fresh interpreter under `python -X importtime`
+and fails if its cumulative import time exceeds its budget, or if it pulls in
+a module that is meant to be imported lazily. Run it in CI or before a
+release; it exits non-zero on any violation.
+
+Usage:
+    python benchmarks/check_startup.py
+    python benchmarks/check_startup.py --runs 10 --scale 2.0
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# module -> (budget in ms, modules it must not import eagerly)
+BUDGETS = {
+    "commitment_issues.cli": (15, ("argparse", "asyncio", "json", "random", "subprocess", "tkinter")),
+    "auto_commit": (60, ("asyncio", "numpy", "tkinter")),
+    "commit_generator": (60, ("asyncio", "numpy", "tkinter")),
+    "planner": (40, ("numpy", "subprocess")),
+}
+
+def import_profile(module):
+    """Return ({module: cumulative microseconds}, total microseconds) for one import."""
+    # Bytecode may be written, so stale .pyc files cost one compile rather than every run
+    env = {k: v for k, v in os.environ.items() if k != "PYTHONDONTWRITEBYTECODE"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=REPO_ROOT, env=env, check=True
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            modules[name.strip()] = int(cumulative)
+    return modules, modules.get(module, 0)
+
+def check(module, budget_ms, forbidden, runs):
+    """Return a list of violations for one entry point."""
+    # Best of several runs after a warm-up: the budget is about our imports,
+    # not bytecode compilation or machine noise
+    import_profile(module)
+    profiles = [import_profile(module) for _ in range(runs)]
+    modules, best = min(profiles, key=lambda p: p[1])
+    problems = []
+    eager = sorted(name for name in forbidden if name in modules)
+    if eager:
+        problems.append(f"imports {', '.join(eager)} at startup")
+    if best / 1000 > budget_ms:
+        problems.append(f"took {best / 1000:.1f} ms (budget {budget_ms:.0f} ms)")
+    status = "FAIL" if problems else "ok"
+    print(f"{module:<24} {best / 1000:>8.1f} ms  budget {budget_ms:>5.0f} ms  {status}")
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail if entry-point import time exceeds its budget")
+    parser.add_argument("--runs", type=int, default=5, help="Imports per module; the fastest counts")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every budget, e.g. on slow CI machines")
+    args = parser.parse_args()
+
+    failures = {}
+    for module, (budget_ms, forbidden) in BUDGETS.items():
+        problems = check(module, budget_ms * args.scale, forbidden, args.runs)
+        if problems:
+            failures[module] = problems
+
+    for module, problems in failures.items():
+        for problem in problems:
+            print(f"REGRESSION {module}: {problem}")
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Message Catalogue
+Weighted, deduplicated tables of commit messages and activity entries.
+Tables are built once and sampled with Vose's alias method, so a draw costs
+the same for ten entries or fifty thousand. Entries may be templates using
+per-repository variables such as {repo}.
+
+Catalogue entries are plain strings (weight 1) or {"text": ..., "weight": ...}
+objects. They come from the config's custom_messages, an optional
+message_catalogue file (JSON list, or text with one message per line), and
+the built-in defaults, in that order; the first occurrence of a text wins.
+A catalogue file that is missing or malformed is reported and skipped.
+Compiled tables are cached as JSON in the repository's state directory and
+reused while their sources are unchanged, so large catalogues do not slow
+startup.
+"""
+
+import hashlib
+import json
+import os
+import random
+import string
+
+CACHE_VERSION = 2
+
+class _Variables(dict):
+    # Unknown placeholders are left as written rather than failing the commit
+    def __missing__(self, key):
+        return "{" + key + "}"
+
+def _is_template(text):
+    try:
+        return any(field is not None for _, field, _, _ in string.Formatter().parse(text))
+    except ValueError:
+        # Stray braces: treat the text literally
+        return False
+
+def parse_entries(items):
+    """Normalise catalogue items to (text, weight) pairs."""
+    entries = []
+    for item in items:
+        if isinstance(item, str):
+            entries.append((item, 1.0))
+        elif isinstance(item, dict):
+            entries.append((item["text"], float(item.get("weight", 1.0))))
+        else:
+            text, weight = item
+            entries.append((text, float(weight)))
+    return entries
+
+def load_catalogue_file(path):
+    """Read entries from a JSON list or a text file with one message per line."""
+    with open(path, 'r', encoding="utf-8") as f:
+        if str(path).endswith(".json"):
+            return parse_entries(json.load(f))
+        return [(line.strip(), 1.0) for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+class MessageCatalogue:
+    def __init__(self, entries, variables=None):
+        seen = {}
+        for text, weight in parse_entries(entries):
+            text = text.strip()
+            if text and weight > 0 and text not in seen:
+                seen[text] = weight
+        if not seen:
+            raise ValueError("a message catalogue needs at least one entry with a positive weight")
+        self.texts = list(seen)
+        self.weights = list(seen.values())
+        self._prob, self._alias = self._build_alias(self.weights)
+        self._templates = frozenset(i for i, text in enumerate(self.texts) if _is_template(text))
+        self.variables = _Variables(variables or {})
+
+    @staticmethod
+    def _build_alias(weights):
+        """Vose's alias tables: O(n) to build, O(1) per draw."""
+        n = len(weights)
+        total = sum(weights)
+        scaled = [w * n / total for w in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        prob = [1.0] * n
+        alias = list(range(n))
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] = scaled[l] + scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+        # Whatever is left is 1.0 up to rounding error
+        return prob, alias
+
+    def __len__(self):
+        return len(self.texts)
+
+    def sample(self, rng=random):
+        """Draw one entry, with template variables filled in."""
+        i = int(rng.random() * len(self.texts))
+        if rng.random() >= self._prob[i]:
+            i = self._alias[i]
+        if i in self._templates:
+            return self.texts[i].format_map(self.variables)
+        return self.texts[i]
+
+    def to_tables(self):
+        return {"texts": self.texts, "weights": self.weights, "prob": self._prob,
+                "alias": self._alias, "templates": sorted(self._templates)}
+
+    @classmethod
+    def from_tables(cls, tables, variables=None):
+        """Rebuild a catalogue from compiled tables without redoing the work."""
+        catalogue = cls.__new__(cls)
+        catalogue.texts = tables["texts"]
+        catalogue.weights = tables["weights"]
+        catalogue._prob = tables["prob"]
+        catalogue._alias = tables["alias"]
+        catalogue._templates = frozenset(tables["templates"])
+        catalogue.variables = _Variables(variables or {})
+        return catalogue
+
+def _source_key(custom, path, defaults):
+    digest = hashlib.sha1(json.dumps([CACHE_VERSION, custom, list(defaults)]).encode())
+    if path is not None:
+        stat = os.stat(path)
+        digest.update(f"{os.path.abspath(path)}:{stat.st_mtime_ns}:{stat.st_size}".encode())
+    return digest.hexdigest()
+
+def _skip_file(path, error):
+    print(f"Warning: cannot use message catalogue {path} ({error}); using the configured and default messages")
+
+def compile_catalogue(custom=(), path=None, defaults=(), cache_path=None, variables=None):
+    """Build (or load from cache) the catalogue for custom entries, a file and defaults."""
+    custom = list(custom)
+    try:
+        key = _source_key(custom, path, defaults)
+    except OSError as e:
+        _skip_file(path, e)
+        path = cache_path = None
+        key = _source_key(custom, path, defaults)
+    if cache_path is not None:
+        try:
+            with open(cache_path, 'r', encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("key") == key:
+                return MessageCatalogue.from_tables(cached["tables"], variables)
+        except (OSError, ValueError, AttributeError, KeyError):
+            pass
+
+    entries = parse_entries(custom)
+    if path is not None:
+        try:
+            entries += load_catalogue_file(path)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            _skip_file(path, e)
+            # Not cached, so the problem is reported again until the file is fixed
+            cache_path = None
+    entries += parse_entries(defaults)
+    catalogue = MessageCatalogue(entries, variables)
+
+    if cache_path is not None:
+        tmp = f"{cache_path}.tmp"
+        with open(tmp, 'w', encoding="utf-8") as f:
+            json.dump({"key": key, "tables": catalogue.to_tables()}, f)
+        os.replace(tmp, cache_path)
+    return catalogue
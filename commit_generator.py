@@ -4,161 +4,395 @@ GitHub Commit Generator
 A script to generate multiple commits for demonstration purposes.
 """
 
-import os
 import sys
-import subprocess
-import random
-import datetime
 import argparse
+import threading
+import time
 from pathlib import Path
 
+from activity_writer import ActivityLogWriter, BareActivityLog
+from catalogue import MessageCatalogue
+from config_loader import load_config
+from git_backend import GitSession
+import governor
+from maintenance import RepoMaintenance
+from metrics import Metrics
+from object_store import NativeCommitter
+from push_pipeline import PushPipeline
+
+ACTIVITIES = [
+    "Code optimization performed",
+    "Documentation updated", 
+    "Bug fix implemented",
+    "Feature enhancement added",
+    "Security improvement made",
+    "Performance tuning completed",
+    "Code refactoring done",
+    "Unit tests updated",
+    "Configuration adjusted",
+    "Dependencies reviewed",
+    "Error handling improved",
+    "Logging functionality enhanced",
+    "Code cleanup performed",
+    "Algorithm optimization",
+    "User interface improved"
+]
+
+COMMIT_MESSAGES = [
+    "Fix typo in documentation",
+    "Update README formatting",
+    "Refactor code structure",
+    "Add error handling",
+    "Improve performance",
+    "Update dependencies",
+    "Fix bug in main function",
+    "Add new feature",
+    "Remove unused code",
+    "Update configuration",
+    "Enhance user experience",
+    "Fix security vulnerability",
+    "Optimize algorithm",
+    "Add unit tests",
+    "Update comments",
+    "Clean up code",
+    "Fix formatting issues",
+    "Add logging functionality",
+    "Update version number",
+    "Merge branch updates"
+]
+
+ENGINES = ("sequential", "fast-import", "native")
+
 class CommitGenerator:
-    def __init__(self, repo_path=None):
+    def __init__(self, repo_path=None, max_log_bytes=0, push_interval=300, bare=False,
+                 config_file="commit_config.json"):
         self.repo_path = Path(repo_path) if repo_path else Path.cwd()
-        self.commit_messages = [
-            "Fix typo in documentation",
-            "Update README formatting",
-            "Refactor code structure",
-            "Add error handling",
-            "Improve performance",
-            "Update dependencies",
-            "Fix bug in main function",
-            "Add new feature",
-            "Remove unused code",
-            "Update configuration",
-            "Enhance user experience",
-            "Fix security vulnerability",
-            "Optimize algorithm",
-            "Add unit tests",
-            "Update comments",
-            "Clean up code",
-            "Fix formatting issues",
-            "Add logging functionality",
-            "Update version number",
-            "Merge branch updates"
-        ]
+        # Commit into a bare repository, building the log in memory from HEAD
+        self.bare = bare
+        # Only read for its limits; a missing file means no limits
+        self.config_file = self.repo_path / config_file
+        self.config = load_config(self.config_file)
+        self.governor = governor.for_repo(self.repo_path, self.config["max_commits_per_second"],
+                                          self.config["max_pushes_per_minute"])
+        self.metrics = Metrics()
+        self.git = GitSession(self.repo_path, metrics=self.metrics)
+        self.committer = self.git
+        self.messages = MessageCatalogue(COMMIT_MESSAGES)
         
         self.target_file = "activity_log.txt"
         self.base_content = "# Activity Log\n\nThis file tracks project activity and changes.\n\n"
+        self.max_log_bytes = max_log_bytes
+        self.push_interval = push_interval
+        self._activity_log = None
+        self._push_pipeline = None
+        self._history = None
+        # Optional callable receiving progress event dicts, e.g. from the GUI
+        self.progress = None
+        self.cancel_event = threading.Event()
+
+    @property
+    def push_pipeline(self):
+        """Background push stage, created on first use."""
+        if self._push_pipeline is None:
+            self._push_pipeline = PushPipeline(self.repo_path, interval=self.push_interval, metrics=self.metrics,
+                                               governor=self.governor, history=self.history)
+        return self._push_pipeline
+
+    @property
+    def history(self):
+        """Run-history index shared with the push stage, or None if disabled."""
+        if self._history is None:
+            if self.config["run_history"]:
+                # sqlite3 is only imported by runs that record
+                from history import open_history
+                self._history = open_history() or False
+            else:
+                self._history = False
+        return self._history or None
+
+    @property
+    def activity_log(self):
+        """Writer for the activity log, opened on first use."""
+        if self._activity_log is None:
+            if self.bare:
+                self._activity_log = BareActivityLog(
+                    self.git, self.target_file, self.base_content, ACTIVITIES,
+                    max_bytes=self.max_log_bytes
+                )
+            else:
+                self._activity_log = ActivityLogWriter(
+                    self.repo_path, self.target_file, self.base_content, ACTIVITIES,
+                    max_bytes=self.max_log_bytes
+                )
+        return self._activity_log
 
-    def run_git_command(self, command):
+    def run_git_command(self, *args, input=None):
         """Execute a git command and return the result."""
-        try:
-            result = subprocess.run(
-                command,
-                cwd=self.repo_path,
-                shell=True,
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            return result.stdout.strip()
-        except subprocess.CalledProcessError as e:
-            print(f"Git command failed: {e}")
-            print(f"Error output: {e.stderr}")
-            return None
+        return self.git.run(*args, input=input)
 
     def ensure_git_repo(self):
         """Ensure we're in a git repository."""
-        if not (self.repo_path / ".git").exists():
+        if (self.repo_path / ".git").exists():
+            if self.bare:
+                print("Note: repository has a working tree; ignoring --bare")
+                self.bare = False
+        elif (self.repo_path / "HEAD").exists() and self.git.is_bare():
+            if not self.bare:
+                print("Note: bare repository; committing without a working tree")
+                self.bare = True
+        elif self.bare:
+            print("Not a git repository. Initializing a bare repository...")
+            self.repo_path.mkdir(parents=True, exist_ok=True)
+            self.run_git_command("init", "--bare")
+        else:
             print("Not a git repository. Initializing...")
-            self.run_git_command("git init")
+            self.run_git_command("init")
             
         # Check if we have a remote origin
-        result = self.run_git_command("git remote -v")
+        result = self.run_git_command("remote", "-v")
         if not result:
             print("Warning: No remote repository configured.")
             print("Add a remote with: git remote add origin <your-repo-url>")
 
+    def report_progress(self, **event):
+        """Forward a progress event to the registered callback, if any."""
+        if self.progress is not None:
+            self.progress(event)
+
     def modify_activity_file(self):
-        """Modify the single activity log file."""
-        filepath = self.repo_path / self.target_file
-        
-        if not filepath.exists():
-            # Create the file for the first time
-            with open(filepath, 'w') as f:
-                f.write(self.base_content)
+        """Append a new entry to the activity log."""
+        with self.metrics.timer("activity_write") as measurement:
+            line = self.activity_log.append_entry()
+            measurement["bytes_written"] = len(line.encode())
+        return line
+
+    def make_commit(self, message=None):
+        """Make a single commit, once the governor's commit rate limit allows."""
+        if not self.governor.acquire("commit", cancel_event=self.cancel_event, metrics=self.metrics):
+            return False
+        # Serialised with any other process committing to this repository
+        with self.git.lock.hold(), self.metrics.timer("commit") as measurement:
+            started = time.time()
+            # Modify the single activity file
+            self.modify_activity_file()
+            
+            # Commit with message
+            if not message:
+                message = self.messages.sample()
+            
+            log = self.activity_log
+            result = self.committer.commit_file(log.relative_path, message, content=log.content)
+            if self.history is not None:
+                self.history.record(self.repo_path, "commit", started, time.time() - started, result is not None,
+                                    sha=result, detail=message)
+            
+            if result is not None:
+                self.push_pipeline.notify()
+                print(f"✓ Committed: {message}")
+                self.report_progress(type="commit", ok=True, message=message)
+                return True
+            else:
+                measurement["exit_code"] = 1
+                print(f"✗ Failed to commit: {message}")
+                self.report_progress(type="commit", ok=False, message=message)
+                return False
+
+    def fast_import_commits(self, count):
+        """Build a chain of commits in a single git fast-import stream.
+
+        Produces the same file content and commit messages as calling
+        make_commit() repeatedly, but spawns one git process for the whole
+        batch and moves the branch ref once at the end. Returns the number
+        of commits written, or None if the batch could not be imported.
+        """
+        with self.git.lock.hold():
+            return self._fast_import_commits(count)
+
+    def _fast_import_commits(self, count):
+        branch = self.run_git_command("symbolic-ref", "-q", "HEAD")
+        if not branch:
+            print("✗ fast-import needs a checked-out branch (HEAD is detached)")
+            return None
         
-        # Add a new entry with timestamp and random activity
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        activities = [
-            "Code optimization performed",
-            "Documentation updated", 
-            "Bug fix implemented",
-            "Feature enhancement added",
-            "Security improvement made",
-            "Performance tuning completed",
-            "Code refactoring done",
-            "Unit tests updated",
-            "Configuration adjusted",
-            "Dependencies reviewed",
-            "Error handling improved",
-            "Logging functionality enhanced",
-            "Code cleanup performed",
-            "Algorithm optimization",
-            "User interface improved"
-        ]
+        ident = self.run_git_command("var", "GIT_COMMITTER_IDENT")
+        author = self.run_git_command("var", "GIT_AUTHOR_IDENT")
+        if not ident or not author:
+            return None
+        # Strip the "<epoch> <tz>" suffix, timestamps are filled in per commit
+        committer_name = ident.rsplit(" ", 2)[0]
+        author_name = author.rsplit(" ", 2)[0]
+        tz = time.strftime("%z")
+        started = time.time()
         
-        activity = random.choice(activities)
-        new_entry = f"[{timestamp}] {activity}\n"
+        parent = self.git.rev_parse("HEAD")
         
-        with open(filepath, 'a') as f:
-            f.write(new_entry)
-
-    def make_commit(self, message=None):
-        """Make a single commit."""
-        # Modify the single activity file
-        self.modify_activity_file()
+        stream = []
+        messages = []
+        touched = set()
+        for i in range(count):
+            self.modify_activity_file()
+            log = self.activity_log
+            touched.add(log.relative_path)
+            content = log.content
+            message = self.messages.sample()
+            messages.append(message)
+            encoded_msg = message.encode()
+            when = f"{int(time.time())} {tz}"
+            
+            stream.append(f"commit {branch}\n".encode())
+            stream.append(f"mark :{i + 1}\n".encode())
+            stream.append(f"author {author_name} {when}\n".encode())
+            stream.append(f"committer {committer_name} {when}\n".encode())
+            # git commit -m always terminates the message with a newline
+            stream.append(f"data {len(encoded_msg) + 1}\n".encode() + encoded_msg + b"\n")
+            if i == 0 and parent:
+                stream.append(f"from {parent}\n".encode())
+            stream.append(f"M 100644 inline {log.relative_path}\n".encode())
+            stream.append(f"data {len(content)}\n".encode() + content + b"\n")
+        stream.append(b"done\n")
         
-        # Add to git
-        self.run_git_command(f"git add {self.target_file}")
+        if self.run_git_command("fast-import", "--quiet", "--done", input=b"".join(stream)) is None:
+            return None
         
-        # Commit with message
-        if not message:
-            message = random.choice(self.commit_messages)
+        if self.history is not None:
+            # One stream for the batch: each commit gets an equal share of its time
+            shas = (self.run_git_command("rev-list", f"--max-count={count}", "--reverse", "HEAD") or "").split()
+            each = (time.time() - started) / count
+            self.history.record_many(self.repo_path, "commit",
+                                     [(started + i * each, each, True, sha, None, message)
+                                      for i, (sha, message) in enumerate(zip(shas, messages))])
         
-        commit_msg = f'"{message}"'
-        result = self.run_git_command(f"git commit -m {commit_msg}")
+        # The working tree already has the new content; bring the index in line
+        if not self.bare:
+            self.run_git_command("add", "--", *sorted(touched))
         
-        if result is not None:
+        self.push_pipeline.notify()
+        for message in messages:
             print(f"✓ Committed: {message}")
-            return True
+            self.report_progress(type="commit", ok=True, message=message)
+        return count
+
+    def use_native_engine(self):
+        """Switch make_commit() to in-process object writes when the repo allows it."""
+        if NativeCommitter.supported(self.git):
+            self.committer = NativeCommitter(self.git)
         else:
-            print(f"✗ Failed to commit: {message}")
-            return False
+            print("Note: repository uses hooks, signing, unusual config or has no identity; using the git engine")
+
+    def generate_commits(self, count, delay=0, engine="sequential"):
+        """Generate multiple commits; returns the number made.
+
+        Commits and pushes are paced by the governor; a delay also spaces
+        this run's commits at least delay seconds apart. Stops early, before
+        pushing what was made, once cancel_event is set.
+        """
+        repo_governor = self.governor
+        if delay > 0:
+            # Run-local: the repository's governor is shared by the whole process
+            self.governor = repo_governor.paced(delay)
+        try:
+            return self._generate_commits(count, engine)
+        finally:
+            self.governor = repo_governor
 
-    def generate_commits(self, count, delay=0):
-        """Generate multiple commits."""
+    def _generate_commits(self, count, engine):
         print(f"Generating {count} commits...")
+        limits = governor.describe(self.governor)
+        if limits != "none":
+            print(f"Throughput limits: {limits}")
+        self.report_progress(type="start", total=count)
         
         successful_commits = 0
         
-        for i in range(count):
-            if self.make_commit():
-                successful_commits += 1
-            
-            # Add delay between commits if specified
-            if delay > 0 and i < count - 1:
-                import time
-                time.sleep(delay)
+        if engine == "native":
+            self.use_native_engine()
+        
+        self.push_pipeline.start()
+        
+        if engine == "fast-import":
+            # One stream per burst the commit limit allows, or one for everything
+            remaining = count
+            while remaining > 0 and not self.cancel_event.is_set():
+                batch = min(remaining, self.governor.burst("commit") or remaining)
+                if not self.governor.acquire("commit", batch, self.cancel_event, self.metrics):
+                    break
+                made = self.fast_import_commits(batch)
+                if not made:
+                    break
+                successful_commits += made
+                remaining -= made
+            if self.cancel_event.is_set():
+                print("Cancelled.")
+        else:
+            for i in range(count):
+                if self.cancel_event.is_set():
+                    print("Cancelled.")
+                    break
+                if self.make_commit():
+                    successful_commits += 1
         
+        self.git.sync_index()
         print(f"\nCompleted: {successful_commits}/{count} commits generated")
         
         # Automatically push to remote
         if successful_commits > 0:
             print("Automatically pushing to remote...")
-            result = self.run_git_command("git push")
-            if result is not None:
+            pushed = self.push_pipeline.flush()
+            if pushed:
                 print("✓ Successfully pushed to remote!")
             else:
                 print("✗ Failed to push. Make sure you have a remote configured.")
                 print("You can manually push later with: git push")
+            self.report_progress(type="push", ok=pushed)
+            
+            # Bulk runs leave the most loose objects behind; pack them once they pile up
+            push_seconds = self.push_pipeline.last_push_seconds()
+            maintenance = RepoMaintenance(self.git)
+            maintenance.note_push(push_seconds)
+            maintenance.run(push_seconds=push_seconds)
+        
+        self.metrics.print_summary()
+        return successful_commits
+
+    def close(self):
+        """Release the activity log and git helper processes."""
+        if self._activity_log is not None:
+            self._activity_log.close()
+        if self._push_pipeline is not None:
+            self._push_pipeline.stop()
+        if self._history:
+            self._history.close()
+        self.git.close()
+        self.metrics.close()
 
 def main():
     parser = argparse.ArgumentParser(description="Generate GitHub commits for profile activity")
     parser.add_argument("count", type=int, help="Number of commits to generate")
-    parser.add_argument("--delay", type=float, default=0, help="Delay between commits in seconds")
+    parser.add_argument("--rate", type=float,
+                        help="Most commits per second (default: max_commits_per_second from --config, 0 = unlimited)")
+    parser.add_argument("--delay", type=float, default=0,
+                        help="Seconds between commits, one at a time; --rate and max_commits_per_second "
+                             "still apply, so the slower limit wins")
+    parser.add_argument("--yes", action="store_true",
+                        help="Skip the confirmation for runs above max_batch_commits (default 100)")
+    parser.add_argument("--config", type=str, default="commit_config.json",
+                        help="Config file in the repository with throughput limits (default: commit_config.json)")
     parser.add_argument("--path", type=str, help="Repository path (default: current directory)")
+    parser.add_argument("--max-log-bytes", type=int, default=0,
+                        help="Rotate the activity log into activity/YYYY-MM.txt segments at this size (0 = never)")
+    parser.add_argument("--push-interval", type=float, default=300,
+                        help="Seconds between background pushes while commits are generated")
+    parser.add_argument("--metrics-out", type=str,
+                        help="Write per-phase metrics as JSON lines, or a Prometheus text file if it ends in .prom")
+    parser.add_argument("--bare", action="store_true",
+                        help="Commit into a bare repository (--path), without a working tree or index")
+    parser.add_argument("--engine", choices=ENGINES, default="sequential",
+                        help="Commit engine: git plumbing per commit, one batched fast-import stream, or in-process object writes")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile the run and print where the time went (Python vs git vs lock waits)")
+    parser.add_argument("--profile-out", type=str,
+                        help="Also write the profile as JSON for profiling.py --compare, plus raw .pstats")
+    parser.add_argument("--profile-memory", action="store_true", help="Include tracemalloc allocation sites")
     
     args = parser.parse_args()
     
@@ -166,15 +400,36 @@ def main():
         print("Error: Commit count must be positive")
         sys.exit(1)
     
-    if args.count > 100:
+    if args.profile or args.profile_out or args.profile_memory:
+        from profiling import run_profiled
+        run_profiled(lambda: run(args), out=args.profile_out, memory=args.profile_memory)
+    else:
+        run(args)
+
+def run(args):
+    """Generate the commits main()'s arguments ask for."""
+    generator = CommitGenerator(args.path, args.max_log_bytes, args.push_interval, bare=args.bare,
+                                config_file=args.config)
+    limit = generator.config["max_batch_commits"]
+    if limit and args.count > limit and not args.yes:
+        if not sys.stdin.isatty():
+            print(f"Error: {args.count} commits exceeds max_batch_commits ({limit}); pass --yes to go ahead")
+            generator.close()
+            sys.exit(1)
         confirm = input(f"You're about to generate {args.count} commits. Continue? (y/n): ")
         if confirm.lower() != 'y':
             print("Cancelled.")
+            generator.close()
             sys.exit(0)
-    
-    generator = CommitGenerator(args.path)
+    if args.rate is not None:
+        generator.governor.set_limits(args.rate, generator.governor.limits[1])
+    if args.metrics_out:
+        generator.metrics.configure_output(args.metrics_out)
     generator.ensure_git_repo()
-    generator.generate_commits(args.count, args.delay)
+    try:
+        generator.generate_commits(args.count, args.delay, args.engine)
+    finally:
+        generator.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
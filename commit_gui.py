@@ -6,60 +6,48 @@ A simple GUI to configure and control automated commit generation.
 
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
-import json
-import os
+import argparse
+import datetime
+import queue
 import subprocess
 import threading
+import time
 from pathlib import Path
 
+from config_loader import ConfigError, load_config, save_config, validate
+
+# How often the Tk thread drains progress events from the worker
+POLL_INTERVAL_MS = 100
+
+# Days listed in the run history panel
+HISTORY_DAYS = 30
+
 class CommitGeneratorGUI:
-    def __init__(self, root):
+    def __init__(self, root, repo_path=None):
         self.root = root
         self.root.title("GitHub Commit Generator")
-        self.root.geometry("500x700")
+        self.root.geometry("500x780")
         self.root.resizable(False, False)
         
-        self.config_file = "commit_config.json"
+        self.repo_path = Path(repo_path) if repo_path else Path.cwd()
+        self.config_file = self.repo_path / "commit_config.json"
+        self.events = queue.Queue()
+        self.worker = None
+        self.cancel_event = None
+        self.history_window = None
         self.load_config()
         self.setup_gui()
+        self.root.after(POLL_INTERVAL_MS, self.poll_events)
         
     def load_config(self):
         """Load configuration from JSON file or create default."""
-        default_config = {
-            "min_commits": 15,
-            "max_commits": 25,
-            "min_delay_minutes": 5,
-            "max_delay_minutes": 45,
-            "work_hours_start": 9,
-            "work_hours_end": 18,
-            "enable_random_timing": True,
-            "custom_messages": [
-                "Fix typo in documentation",
-                "Update README formatting",
-                "Refactor code structure",
-                "Add error handling",
-                "Improve performance"
-            ]
-        }
-        
-        if os.path.exists(self.config_file):
-            try:
-                with open(self.config_file, 'r') as f:
-                    self.config = json.load(f)
-                # Merge with defaults for any missing keys
-                for key, value in default_config.items():
-                    if key not in self.config:
-                        self.config[key] = value
-            except:
-                self.config = default_config
-        else:
-            self.config = default_config
+        self.config = load_config(self.config_file)
             
-    def save_config(self):
+    def save_config(self, notify=True):
         """Save current configuration to JSON file."""
-        with open(self.config_file, 'w') as f:
-            json.dump(self.config, f, indent=2)
-        messagebox.showinfo("Success", "Configuration saved!")
+        save_config(self.config_file, self.config)
+        if notify:
+            messagebox.showinfo("Success", "Configuration saved!")
         
     def setup_gui(self):
         """Setup the GUI components."""
@@ -135,7 +123,8 @@ class CommitGeneratorGUI:
         
         # Load custom messages
         if "custom_messages" in self.config:
-            self.messages_text.insert(tk.END, "\n".join(self.config["custom_messages"]))
+            texts = [m if isinstance(m, str) else m["text"] for m in self.config["custom_messages"]]
+            self.messages_text.insert(tk.END, "\n".join(texts))
         
         # Buttons Frame
         buttons_frame = ttk.Frame(main_frame)
@@ -149,6 +138,10 @@ class CommitGeneratorGUI:
         test_btn = ttk.Button(buttons_frame, text="Test Run (3-5 commits)", command=self.test_run)
         test_btn.grid(row=0, column=1, padx=(0, 10))
         
+        # Run History Button
+        history_btn = ttk.Button(buttons_frame, text="Run History", command=self.show_history)
+        history_btn.grid(row=0, column=2)
+        
         # Manual Run Frame
         manual_frame = ttk.Frame(main_frame)
         manual_frame.grid(row=6, column=0, columnspan=2, pady=(10, 0))
@@ -171,12 +164,29 @@ class CommitGeneratorGUI:
         daily_btn = ttk.Button(setup_frame, text="Run Daily Commits Now", command=self.run_daily_now)
         daily_btn.grid(row=0, column=1)
         
+        # Progress Frame
+        progress_frame = ttk.Frame(main_frame)
+        progress_frame.grid(row=8, column=0, columnspan=2, pady=(15, 0), sticky=(tk.W, tk.E))
+        
+        self.progress_bar = ttk.Progressbar(progress_frame, length=360, mode="determinate")
+        self.progress_bar.grid(row=0, column=0, padx=(0, 10))
+        
+        self.cancel_btn = ttk.Button(progress_frame, text="Cancel", command=self.cancel_run, state=tk.DISABLED)
+        self.cancel_btn.grid(row=0, column=1)
+        
+        self.throughput_label = ttk.Label(main_frame, text="", font=("Arial", 8), foreground="gray")
+        self.throughput_label.grid(row=9, column=0, columnspan=2, pady=(5, 0))
+        
         # Status Label
         self.status_label = ttk.Label(main_frame, text="Ready", foreground="green")
-        self.status_label.grid(row=8, column=0, columnspan=2, pady=(10, 0))
+        self.status_label.grid(row=10, column=0, columnspan=2, pady=(10, 0))
+        
+    def save_configuration(self, notify=True):
+        """Save current GUI settings to config file.
         
-    def save_configuration(self):
-        """Save current GUI settings to config file."""
+        Returns False, after showing why, if the settings are invalid. With
+        notify=False (before a run) a valid save is not confirmed in a dialog.
+        """
         try:
             # Update config with GUI values
             self.config["min_commits"] = int(self.min_commits_var.get())
@@ -190,78 +200,246 @@ class CommitGeneratorGUI:
             # Get custom messages
             messages_content = self.messages_text.get(1.0, tk.END).strip()
             if messages_content:
-                self.config["custom_messages"] = [msg.strip() for msg in messages_content.split("\n") if msg.strip()]
+                # Keep weights set in the config file for messages that are still listed
+                weighted = {m["text"]: m for m in self.config["custom_messages"] if isinstance(m, dict)}
+                self.config["custom_messages"] = [weighted.get(msg.strip(), msg.strip())
+                                                  for msg in messages_content.split("\n") if msg.strip()]
             
-            # Validate settings
-            if self.config["min_commits"] > self.config["max_commits"]:
-                messagebox.showerror("Error", "Minimum commits cannot be greater than maximum commits")
-                return
-                
-            if self.config["min_delay_minutes"] > self.config["max_delay_minutes"]:
-                messagebox.showerror("Error", "Minimum delay cannot be greater than maximum delay")
-                return
+            # Validate settings with the same rules the CLI uses
+            errors = validate(self.config)
+            if errors:
+                messagebox.showerror("Error", "\n".join(errors))
+                return False
             
             # Allow 0 delay for instant commits
-            if self.config["min_delay_minutes"] == 0 and self.config["max_delay_minutes"] == 0:
+            if notify and self.config["min_delay_minutes"] == 0 and self.config["max_delay_minutes"] == 0:
                 messagebox.showinfo("Info", "No delay mode: Commits will be generated instantly")
-                
-            if self.config["work_hours_start"] >= self.config["work_hours_end"]:
-                messagebox.showerror("Error", "Work start hour must be before end hour")
-                return
             
-            self.save_config()
+            self.save_config(notify)
+            return True
             
+        except ConfigError as e:
+            messagebox.showerror("Error", "\n".join(e.errors))
         except ValueError:
             messagebox.showerror("Error", "Please enter valid numbers for all fields")
+        return False
             
     def update_status(self, message, color="black"):
-        """Update status label."""
+        """Update status label. Must be called from the Tk thread."""
         self.status_label.config(text=message, foreground=color)
-        self.root.update()
         
-    def run_command(self, command, success_msg, error_msg):
-        """Run a command in a separate thread."""
+    def run_engine(self, job, success_msg, error_msg):
+        """Run a generator job on a worker thread, streaming progress to the UI.
+        
+        job(progress, cancel_event) runs in the worker and returns a truthy
+        value on success. It must only talk to the UI through progress(),
+        which queues events for poll_events() on the Tk thread.
+        """
+        if self.worker is not None and self.worker.is_alive():
+            messagebox.showwarning("Busy", "A run is already in progress")
+            return
+        
+        self.cancel_event = threading.Event()
+        self.run_messages = (success_msg, error_msg)
+        self.committed = 0
+        self.run_started = time.monotonic()
+        self.progress_bar.config(value=0, maximum=1)
+        self.cancel_btn.config(state=tk.NORMAL)
+        self.update_status("Running...", "orange")
+        
+        def progress(event):
+            self.events.put(event)
+        
         def run():
             try:
-                self.update_status("Running...", "orange")
-                result = subprocess.run(command, shell=True, capture_output=True, text=True)
-                
-                if result.returncode == 0:
-                    self.update_status(success_msg, "green")
-                    messagebox.showinfo("Success", success_msg)
-                else:
-                    self.update_status(error_msg, "red")
-                    messagebox.showerror("Error", f"{error_msg}\n\nDetails: {result.stderr}")
-                    
+                ok = job(progress, self.cancel_event)
+                self.events.put({"type": "done", "ok": bool(ok), "error": None})
             except Exception as e:
-                self.update_status("Error occurred", "red")
-                messagebox.showerror("Error", f"Failed to run command: {str(e)}")
+                self.events.put({"type": "done", "ok": False, "error": str(e)})
                 
-        thread = threading.Thread(target=run)
-        thread.daemon = True
-        thread.start()
+        self.worker = threading.Thread(target=run, daemon=True)
+        self.worker.start()
+        
+    def run_command(self, command, success_msg, error_msg):
+        """Run an external command on a worker thread."""
+        def job(progress, cancel_event):
+            result = subprocess.run(command, shell=True, capture_output=True, text=True)
+            if result.returncode != 0:
+                raise RuntimeError(result.stderr.strip() or f"exit code {result.returncode}")
+            return True
+        self.run_engine(job, success_msg, error_msg)
+        
+    def poll_events(self):
+        """Apply queued worker events to the UI; reschedules itself."""
+        try:
+            while True:
+                self.handle_event(self.events.get_nowait())
+        except queue.Empty:
+            pass
+        self.root.after(POLL_INTERVAL_MS, self.poll_events)
+        
+    def handle_event(self, event):
+        """Update the UI for a single progress event."""
+        if event["type"] == "start":
+            self.progress_bar.config(maximum=max(event["total"], 1), value=0)
+        elif event["type"] == "commit":
+            self.committed += 1 if event["ok"] else 0
+            self.progress_bar.step(1)
+            elapsed = time.monotonic() - self.run_started
+            rate = self.committed / elapsed if elapsed > 0 else 0.0
+            self.throughput_label.config(text=f"{self.committed} commits, {rate:.1f} commits/s")
+            self.update_status(("Committed: " if event["ok"] else "Failed: ") + event["message"], "orange")
+        elif event["type"] == "push":
+            self.update_status("Pushed to remote" if event["ok"] else "Push failed", "orange")
+        elif event["type"] == "done":
+            self.cancel_btn.config(state=tk.DISABLED)
+            if self.history_window is not None and self.history_window.winfo_exists():
+                self.refresh_history()
+            success_msg, error_msg = self.run_messages
+            if self.cancel_event.is_set():
+                self.update_status("Cancelled", "red")
+            elif event["ok"]:
+                self.update_status(success_msg, "green")
+                messagebox.showinfo("Success", success_msg)
+            else:
+                self.update_status(error_msg, "red")
+                details = f"\n\nDetails: {event['error']}" if event["error"] else ""
+                messagebox.showerror("Error", f"{error_msg}{details}")
+                
+    def show_history(self):
+        """Open the run history panel for this repository."""
+        if self.history_window is not None and self.history_window.winfo_exists():
+            self.history_window.lift()
+            self.refresh_history()
+            return
+        
+        window = tk.Toplevel(self.root)
+        window.title("Run History")
+        window.geometry("600x420")
+        frame = ttk.Frame(window, padding="10")
+        frame.pack(fill=tk.BOTH, expand=True)
+        
+        self.history_summary = ttk.Label(frame, text="", justify=tk.LEFT)
+        self.history_summary.pack(anchor=tk.W)
+        
+        columns = ("day", "commits", "failed", "pushes", "push_avg", "push_max", "late_avg")
+        headings = ("Date", "Commits", "Failed", "Pushes", "Push avg", "Push max", "Late avg")
+        self.history_tree = ttk.Treeview(frame, columns=columns, show="headings", height=14)
+        for column, heading in zip(columns, headings):
+            self.history_tree.heading(column, text=heading)
+            self.history_tree.column(column, width=95 if column == "day" else 75,
+                                     anchor=tk.W if column == "day" else tk.E)
+        self.history_tree.pack(fill=tk.BOTH, expand=True, pady=(10, 0))
+        
+        ttk.Button(frame, text="Refresh", command=self.refresh_history).pack(pady=(10, 0))
+        self.history_window = window
+        self.refresh_history()
+        
+    def refresh_history(self):
+        """Fill the history panel from the run history index."""
+        from history import RunHistory, default_path, format_seconds, format_time
+        
+        self.history_tree.delete(*self.history_tree.get_children())
+        path = default_path()
+        if not path.exists():
+            self.history_summary.config(text="No runs recorded yet.")
+            return
+        
+        history = RunHistory(path)
+        try:
+            repos = history.repos(str(self.repo_path))
+            if not repos:
+                self.history_summary.config(text="No runs recorded for this repository yet.")
+                return
+            repo_id, repo_path, _ = repos[0]
+            today = datetime.date.today()
+            days = history.daily(repo_id, today - datetime.timedelta(days=HISTORY_DAYS - 1), today)
+            last_commit = history.latest(repo_id, "commit")
+            last_push = history.latest(repo_id, "push")
+            push_result = "" if last_push is None else " ok" if last_push["ok"] else " failed"
+            self.history_summary.config(text=(
+                f"{repo_path}\n"
+                f"Last commit: {format_time(last_commit)}\n"
+                f"Last push: {format_time(last_push)}{push_result} "
+                f"({format_seconds(last_push['seconds'] if last_push else None)})\n"
+                f"Unpushed commits: {history.unpushed(repo_id)}"
+            ))
+            for day in reversed(days):
+                self.history_tree.insert("", tk.END, values=(
+                    day["day"], day["commits"], day["failed"], day["pushes"],
+                    format_seconds(day["push_avg"]), format_seconds(day["push_max"]),
+                    format_seconds(day["late_avg"])
+                ))
+        finally:
+            history.close()
+        
+    def cancel_run(self):
+        """Ask the running job to stop after its current commit."""
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+            self.update_status("Cancelling...", "orange")
         
     def test_run(self):
         """Run a test with 3-5 commits."""
-        self.save_configuration()
-        self.run_command("python auto_commit.py --test", 
-                        "Test completed successfully!", 
-                        "Test failed")
+        if not self.save_configuration(notify=False):
+            return
+        
+        def job(progress, cancel_event):
+            from auto_commit import AutoCommitGenerator
+            generator = AutoCommitGenerator(self.repo_path)
+            generator.config["min_commits"] = 3
+            generator.config["max_commits"] = 5
+            generator.config["min_delay_minutes"] = 0
+            generator.config["max_delay_minutes"] = 1
+            generator.config["enable_random_timing"] = False
+            generator.progress = progress
+            generator.cancel_event = cancel_event
+            try:
+                return generator.run_daily_commits(test=True)
+            finally:
+                generator.close()
+        
+        self.run_engine(job, "Test completed successfully!", "Test failed")
         
     def manual_run(self):
         """Run manual commit generation."""
         try:
             count = int(self.manual_count_var.get())
-            self.run_command(f"python commit_generator.py {count}",
-                           f"Generated {count} commits successfully!",
-                           f"Failed to generate {count} commits")
         except ValueError:
             messagebox.showerror("Error", "Please enter a valid number for commit count")
+            return
+        
+        def job(progress, cancel_event):
+            from commit_generator import CommitGenerator
+            generator = CommitGenerator(self.repo_path)
+            generator.progress = progress
+            generator.cancel_event = cancel_event
+            try:
+                generator.ensure_git_repo()
+                return generator.generate_commits(count) == count
+            finally:
+                generator.close()
+        
+        self.run_engine(job,
+                        f"Generated {count} commits successfully!",
+                        f"Failed to generate {count} commits")
             
     def run_daily_now(self):
         """Run daily automation now."""
-        self.save_configuration()
-        self.run_command("python auto_commit.py",
+        if not self.save_configuration(notify=False):
+            return
+        
+        def job(progress, cancel_event):
+            from auto_commit import AutoCommitGenerator
+            generator = AutoCommitGenerator(self.repo_path)
+            generator.progress = progress
+            generator.cancel_event = cancel_event
+            try:
+                return generator.run_daily_commits()
+            finally:
+                generator.close()
+        
+        self.run_engine(job,
                         "Daily commits completed successfully!",
                         "Daily commits failed")
         
@@ -279,8 +457,12 @@ class CommitGeneratorGUI:
                            "Failed to setup cron job")
 
 def main():
+    parser = argparse.ArgumentParser(description="GitHub Commit Generator GUI")
+    parser.add_argument("--path", type=str, help="Repository path (default: current directory)")
+    args = parser.parse_args()
+    
     root = tk.Tk()
-    app = CommitGeneratorGUI(root)
+    app = CommitGeneratorGUI(root, args.path)
     root.mainloop()
 
 if __name__ == "__main__":
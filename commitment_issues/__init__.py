@@ -0,0 +1,9 @@
+"""
+Commitment Issues
+Automated, realistic commit generation. The command-line tools live in the
+top-level modules (auto_commit, commit_generator, planner, commit_gui);
+this package only provides the `commitment-issues` entry point, which
+imports the tool a command needs and nothing else.
+"""
+
+__version__ = "0.1.0"
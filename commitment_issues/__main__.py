@@ -0,0 +1,5 @@
+import sys
+
+from commitment_issues.cli import main
+
+sys.exit(main())
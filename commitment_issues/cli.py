@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Command-Line Entry Point
+Dispatches `commitment-issues <command> [options]` to the matching tool.
+Runs on every cron tick and GUI launch, so it imports nothing beyond sys and
+importlib up front; each command's module (and its git, asyncio or tkinter
+dependencies) is imported only once the command is known. Keep it that way:
+benchmarks/check_startup.py fails if the import budget is exceeded.
+"""
+
+import importlib
+import sys
+
+# command -> (module, description)
+COMMANDS = {
+    "daily": ("auto_commit", "Generate a day's worth of realistic commits"),
+    "generate": ("commit_generator", "Generate a number of commits right now"),
+    "plan": ("planner", "Plan commit counts and times for a run of days"),
+    "simulate": ("simulation", "Simulate days of commits without git or sleeping"),
+    "stats": ("run_log", "Summarise commits per day from a --log-file log"),
+    "maintain": ("maintenance", "Pack loose objects and write commit-graph and bitmaps"),
+    "profile": ("profiling", "Show or compare reports written with --profile-out"),
+    "history": ("history", "Query the run history: status per repository, stats per day"),
+    "gui": ("commit_gui", "Open the configuration and control window"),
+}
+
+def usage():
+    lines = ["usage: commitment-issues <command> [options]", "", "commands:"]
+    for name, (_, description) in COMMANDS.items():
+        lines.append(f"  {name:<10} {description}")
+    lines.append("")
+    lines.append("Run 'commitment-issues <command> --help' for a command's options.")
+    return "\n".join(lines)
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return 0
+    if argv[0] == "--version":
+        from commitment_issues import __version__
+        print(__version__)
+        return 0
+    if argv[0] not in COMMANDS:
+        print(f"commitment-issues: unknown command '{argv[0]}'\n\n{usage()}", file=sys.stderr)
+        return 2
+
+    module_name, _ = COMMANDS[argv[0]]
+    module = importlib.import_module(module_name)
+    # The tools parse sys.argv themselves
+    sys.argv = [f"commitment-issues {argv[0]}"] + argv[1:]
+    return module.main()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Configuration Loader
+Single source of truth for commit_config.json. Shared by the CLI scripts,
+the scheduler and the GUI: one set of defaults, schema validation with clear
+error messages, and an mtime-based cache so a long-running process can pick
+up edits without restarting and without re-reading the file on every commit.
+"""
+
+import copy
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_CONFIG = {
+    "min_commits": 15,
+    "max_commits": 25,
+    "min_delay_minutes": 5,
+    "max_delay_minutes": 45,
+    "work_hours_start": 9,
+    "work_hours_end": 18,
+    "enable_random_timing": True,
+    "custom_messages": [],
+    "message_catalogue": None,
+    "message_variables": {},
+    "engine": "sequential",
+    "activity_log_max_bytes": 0,
+    "push_interval_minutes": 30,
+    "push_max_attempts": 5,
+    "push_remote": None,
+    "maintenance_loose_objects": 1000,
+    "maintenance_max_packs": 20,
+    "max_commits_per_second": 0,
+    "max_pushes_per_minute": 0,
+    "max_batch_commits": 100,
+    "run_history": True
+}
+
+ENGINES = ("sequential", "native")
+
+def _non_negative(value):
+    return value >= 0
+
+def _positive(value):
+    return value > 0
+
+def _hour(value):
+    return 0 <= value <= 23
+
+def _message(entry):
+    if isinstance(entry, dict):
+        weight = entry.get("weight", 1)
+        return (isinstance(entry.get("text"), str) and entry["text"].strip()
+                and isinstance(weight, (int, float)) and not isinstance(weight, bool) and weight > 0)
+    return isinstance(entry, str) and entry.strip()
+
+def _messages(value):
+    return all(_message(m) for m in value)
+
+def _variables(value):
+    return all(isinstance(k, str) and isinstance(v, str) for k, v in value.items())
+
+# key -> (accepted types, check, description of a valid value)
+SCHEMA = {
+    "min_commits": (int, _positive, "a positive integer"),
+    "max_commits": (int, _positive, "a positive integer"),
+    "min_delay_minutes": (int, _non_negative, "a non-negative integer"),
+    "max_delay_minutes": (int, _non_negative, "a non-negative integer"),
+    "work_hours_start": (int, _hour, "an hour between 0 and 23"),
+    "work_hours_end": (int, _hour, "an hour between 0 and 23"),
+    "enable_random_timing": (bool, None, "true or false"),
+    "custom_messages": (list, _messages, 'a list of messages or {"text": ..., "weight": ...} objects'),
+    "message_catalogue": ((str, type(None)), None, "a path to a message file or null"),
+    "message_variables": (dict, _variables, "an object mapping names to strings"),
+    "engine": (str, lambda v: v in ENGINES, f"one of {', '.join(ENGINES)}"),
+    "activity_log_max_bytes": (int, _non_negative, "a non-negative integer"),
+    "push_interval_minutes": ((int, float), _positive, "a positive number"),
+    "push_max_attempts": (int, _positive, "a positive integer"),
+    "push_remote": ((str, type(None)), None, "a remote name/URL or null"),
+    "maintenance_loose_objects": (int, _non_negative, "a non-negative integer (0 = never)"),
+    "maintenance_max_packs": (int, _positive, "a positive integer"),
+    "max_commits_per_second": ((int, float), _non_negative, "a non-negative number (0 = unlimited)"),
+    "max_pushes_per_minute": ((int, float), _non_negative, "a non-negative number (0 = unlimited)"),
+    "max_batch_commits": (int, _non_negative, "a non-negative integer (0 = no confirmation)"),
+    "run_history": (bool, None, "true or false"),
+}
+
+class ConfigError(ValueError):
+    """Raised when a configuration cannot be used as given."""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__("; ".join(errors))
+
+def _type_ok(value, types):
+    # bool is a subclass of int, but true/false is never a valid count
+    if isinstance(value, bool) and types is not bool:
+        return False
+    return isinstance(value, types)
+
+def problems(config):
+    """Return (keys, message) for every problem with config; keys are the settings at fault."""
+    found = []
+    for key, (types, check, description) in SCHEMA.items():
+        if key not in config:
+            continue
+        value = config[key]
+        if not _type_ok(value, types) or (check is not None and not check(value)):
+            found.append(((key,), f"{key} must be {description} (got {value!r})"))
+
+    invalid = {key for keys, _ in found for key in keys}
+
+    def valid(*keys):
+        return all(key in config and key not in invalid for key in keys)
+
+    if valid("min_commits", "max_commits") and config["min_commits"] > config["max_commits"]:
+        found.append((("min_commits", "max_commits"), "min_commits cannot be greater than max_commits"))
+    if valid("min_delay_minutes", "max_delay_minutes") and config["min_delay_minutes"] > config["max_delay_minutes"]:
+        found.append((("min_delay_minutes", "max_delay_minutes"),
+                      "min_delay_minutes cannot be greater than max_delay_minutes"))
+    if valid("work_hours_start", "work_hours_end") and config["work_hours_start"] >= config["work_hours_end"]:
+        found.append((("work_hours_start", "work_hours_end"), "work_hours_start must be before work_hours_end"))
+    return found
+
+def validate(config):
+    """Return a list of human-readable problems with config (empty if valid)."""
+    return [message for _, message in problems(config)]
+
+def _apply_defaults(raw, path):
+    """Merge raw settings over the defaults, replacing invalid values with defaults."""
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    config.update(raw)
+    # Fall back key by key so one bad value does not discard the whole file. A
+    # fallback can break a pair (a valid start of 20 next to an end reset to
+    # 18), so check again until what is left is consistent; the defaults are.
+    found = problems(config)
+    while found:
+        for keys, message in found:
+            print(f"Warning: {path}: {message}; using default")
+            for key in keys:
+                config[key] = copy.deepcopy(DEFAULT_CONFIG[key])
+        found = problems(config)
+    return config
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+def load_config(path, create=False):
+    """Load and validate a config file, reusing the parsed copy while it is unchanged.
+
+    Returns a private copy the caller may modify. With create, a missing file is
+    written out with the defaults.
+    """
+    path = Path(path)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        if create:
+            save_config(path, DEFAULT_CONFIG)
+        return copy.deepcopy(DEFAULT_CONFIG)
+
+    key = str(path.resolve())
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _cache_lock:
+        cached = _cache.get(key)
+    if cached is None or cached[0] != signature:
+        try:
+            with open(path, 'r') as f:
+                raw = json.load(f)
+            if not isinstance(raw, dict):
+                raise ValueError("top level must be a JSON object")
+            config = _apply_defaults(raw, path)
+        except ValueError as e:
+            print(f"Warning: could not parse {path} ({e}); using defaults")
+            config = copy.deepcopy(DEFAULT_CONFIG)
+        cached = (signature, config)
+        with _cache_lock:
+            _cache[key] = cached
+    return copy.deepcopy(cached[1])
+
+def save_config(path, config):
+    """Validate and atomically write a config file; raises ConfigError if invalid."""
+    errors = validate(config)
+    if errors:
+        raise ConfigError(errors)
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, 'w') as f:
+        json.dump(config, f, indent=2)
+    os.replace(tmp, path)
+
+class ConfigWatcher:
+    """Hot-reloading view of a config file for long-running processes.
+
+    current() stats the file at most once per check_interval seconds and only
+    re-parses it when its mtime or size changed.
+    """
+
+    def __init__(self, path, check_interval=5.0):
+        self.path = Path(path)
+        self.check_interval = check_interval
+        self._config = load_config(self.path)
+        self._checked = time.monotonic()
+        self.version = 0
+
+    def current(self):
+        now = time.monotonic()
+        if now - self._checked >= self.check_interval:
+            self._checked = now
+            config = load_config(self.path)
+            if config != self._config:
+                self._config = config
+                self.version += 1
+                print(f"Reloaded configuration from {self.path}")
+        return self._config
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Commit Daemon
+One resident process that schedules every configured repository, day after
+day, instead of a cron job starting a cold interpreter per repository per
+day. All planned commits across all repositories sit in a single timer
+wheel; the event loop sleeps until the earliest bucket is due, fires it,
+and rolls over to the next day's plans at midnight.
+
+Runs in the foreground and logs to stdout, so it can be supervised directly
+by systemd (Type=notify is supported through NOTIFY_SOCKET), launchd or a
+terminal. A Unix control socket answers status queries and accepts reload
+and stop commands:
+
+    python auto_commit.py --daemon [--repos repos.json]
+    python auto_commit.py --status
+"""
+
+import asyncio
+import datetime
+import heapq
+import json
+import os
+import signal
+import socket
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from auto_commit import AutoCommitGenerator
+from scheduler import CommitScheduler
+
+# The scheduler plans to the minute, so one-minute buckets never split a batch
+WHEEL_RESOLUTION = 60
+
+# Upper bound on one sleep, so suspend/resume and clock changes are noticed
+MAX_IDLE_SECONDS = 30
+
+def default_control_path():
+    """Per-user control socket path, short enough for the sun_path limit."""
+    base = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    user = os.getuid() if hasattr(os, "getuid") else os.environ.get("USERNAME", "user")
+    return os.path.join(base, f"commitment-issues-{user}.sock")
+
+def sd_notify(state):
+    """Send a readiness/status update to systemd when running under Type=notify."""
+    address = os.environ.get("NOTIFY_SOCKET")
+    if not address or not hasattr(socket, "AF_UNIX"):
+        return
+    if address.startswith("@"):
+        address = "\0" + address[1:]
+    with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+        try:
+            sock.sendto(state.encode(), address)
+        except OSError:
+            pass
+
+class TimerWheel:
+    """Hashed timer wheel: timers grouped into fixed-width time buckets.
+
+    Scheduling is O(1) into a bucket plus a heap push only for a new bucket,
+    and the loop wakes once per due bucket rather than once per timer.
+    """
+
+    def __init__(self, resolution=WHEEL_RESOLUTION):
+        self.resolution = resolution
+        self._buckets = {}
+        self._heap = []
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def schedule(self, when, item):
+        bucket = int(when // self.resolution)
+        if bucket not in self._buckets:
+            self._buckets[bucket] = []
+            heapq.heappush(self._heap, bucket)
+        self._buckets[bucket].append((when, item))
+        self._count += 1
+
+    def next_deadline(self):
+        """Earliest time a timer is due, or None if the wheel is empty."""
+        if not self._heap:
+            return None
+        return min(when for when, _ in self._buckets[self._heap[0]])
+
+    def pop_due(self, now):
+        """Remove and return every (when, item) due by now, in time order."""
+        due = []
+        while self._heap and self._heap[0] <= int(now // self.resolution):
+            bucket = self._heap[0]
+            entries = self._buckets[bucket]
+            ready = [e for e in entries if e[0] <= now]
+            if len(ready) < len(entries):
+                # Partly due: leave the rest of the bucket in place
+                self._buckets[bucket] = [e for e in entries if e[0] > now]
+                due += ready
+                break
+            heapq.heappop(self._heap)
+            del self._buckets[bucket]
+            due += entries
+        self._count -= len(due)
+        return sorted(due, key=lambda e: e[0])
+
+    def entries(self):
+        # Keyed on the time alone: items that share a time are not comparable
+        return sorted((e for entries in self._buckets.values() for e in entries), key=lambda e: e[0])
+
+class RepoService:
+    """One repository's generator, scheduler and progress for the current day."""
+
+    def __init__(self, path, config_file="commit_config.json"):
+        self.path = path
+        self.generator = AutoCommitGenerator(path, config_file)
+        self.scheduler = CommitScheduler(self.generator)
+        self.lock = None
+        self.plan = None
+        self.committed = 0
+        self.error = None
+
+    def name(self):
+        return str(self.path)
+
+class CommitDaemon:
+    def __init__(self, repos, control_path=None, workers=None):
+        self.services = []
+        # Repositories that could not be set up; reported by status, never scheduled
+        self.failed = []
+        for entry in repos:
+            try:
+                self.services.append(RepoService(entry["path"], entry.get("config", "commit_config.json")))
+            except Exception as e:
+                error = str(e) or type(e).__name__
+                print(f"Skipping {entry['path']}: {error}")
+                self.failed.append({"repo": str(entry["path"]), "committed": 0, "planned": 0, "error": error})
+        self.control_path = control_path or default_control_path()
+        self.executor = ThreadPoolExecutor(max_workers=workers or min(len(self.services), 8) or 1)
+        self.wheel = TimerWheel()
+        self.started = None
+        self.day = None
+        self._stop = None
+        self._wake = None
+        self._tasks = set()
+
+    async def blocking(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def plan_day(self, day):
+        """Queue every repository's outstanding commits for a day."""
+        self.day = day
+        for service in self.services:
+            if service.error == "no remote configured":
+                continue
+            await self.blocking(service.generator.refresh_config)
+            plan = await self.blocking(service.scheduler.prepare_day, day, True)
+            done = await self.blocking(service.generator.journal.replay, day, plan["id"])
+            service.plan = plan
+            service.committed = len(done)
+            outstanding = [i for i in range(len(plan["fire_at"])) if i not in done]
+            service.generator.start_day(len(plan["fire_at"]))
+            for index in outstanding:
+                self.wheel.schedule(plan["fire_at"][index], ("commit", service, plan, index))
+            last = plan["fire_at"][outstanding[-1]] if outstanding else self.now()
+            self.wheel.schedule(last + 1, ("finish", service, plan, None))
+        tomorrow = datetime.datetime.combine(day + datetime.timedelta(days=1), datetime.time())
+        self.wheel.schedule(tomorrow.timestamp(), ("day", None, None, None))
+        sd_notify(f"STATUS=Planned {day.isoformat()}: {self.planned_today()} commits")
+
+    def now(self):
+        return datetime.datetime.now().timestamp()
+
+    def planned_today(self):
+        return sum(len(s.plan["fire_at"]) for s in self.services if s.plan)
+
+    async def fire(self, kind, service, plan, index):
+        if kind == "day":
+            await self.plan_day(datetime.date.today())
+            return
+        async with service.lock:
+            if kind == "commit":
+                if await self.blocking(service.generator.make_commit, None, plan, index):
+                    service.committed += 1
+            else:
+                await self.blocking(service.generator.finish_day, service.committed, len(plan["fire_at"]))
+
+    def spawn(self, coro):
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def status(self):
+        """Snapshot of the daemon's state for the control socket."""
+        upcoming = [{"time": datetime.datetime.fromtimestamp(when).isoformat(timespec="seconds"),
+                     "action": item[0], "repo": item[1].name() if item[1] else None}
+                    for when, item in self.wheel.entries()[:10]]
+        return {
+            "pid": os.getpid(),
+            "started": self.started,
+            "day": self.day.isoformat() if self.day else None,
+            "timers": len(self.wheel),
+            "next": upcoming,
+            "repos": [{"repo": s.name(), "committed": s.committed,
+                       "planned": len(s.plan["fire_at"]) if s.plan else 0, "error": s.error}
+                      for s in self.services] + self.failed,
+        }
+
+    def stop(self):
+        if self._stop is not None:
+            self._stop.set()
+            self._wake.set()
+
+    async def reload(self):
+        """Re-read configs; today's plan is kept, new settings apply from tomorrow."""
+        for service in self.services:
+            service.generator.refresh_config()
+
+    async def handle_control(self, reader, writer):
+        try:
+            command = (await reader.readline()).decode().strip() or "status"
+            if command == "status":
+                reply = self.status()
+            elif command == "reload":
+                await self.reload()
+                reply = {"ok": True}
+            elif command == "stop":
+                self.stop()
+                reply = {"ok": True}
+            else:
+                reply = {"error": f"unknown command {command!r}"}
+            writer.write((json.dumps(reply) + "\n").encode())
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def start_control(self):
+        if not hasattr(asyncio, "start_unix_server"):
+            print("Control socket not available on this platform; status queries are disabled")
+            return None
+        if os.path.exists(self.control_path):
+            if query(self.control_path, "status") is not None:
+                raise RuntimeError(f"another daemon is already listening on {self.control_path}")
+            # Left behind by a daemon that did not shut down cleanly
+            os.unlink(self.control_path)
+        server = await asyncio.start_unix_server(self.handle_control, path=self.control_path)
+        os.chmod(self.control_path, 0o600)
+        return server
+
+    async def run(self):
+        self._stop = asyncio.Event()
+        self._wake = asyncio.Event()
+        self.started = datetime.datetime.now().isoformat(timespec="seconds")
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except (NotImplementedError, RuntimeError):
+                pass
+
+        for service in self.services:
+            service.lock = asyncio.Lock()
+            if not await self.blocking(service.generator.ensure_git_repo):
+                service.error = "no remote configured"
+                print(f"Skipping {service.name()}: no remote configured")
+                continue
+            service.generator.push_pipeline.start()
+
+        server = await self.start_control()
+        try:
+            await self.plan_day(datetime.date.today())
+            print(f"Daemon running for {len(self.services)} repositories "
+                  f"(control socket: {self.control_path if server else 'disabled'})")
+            sys.stdout.flush()
+            sd_notify("READY=1")
+
+            while not self._stop.is_set():
+                for _, (kind, service, plan, index) in self.wheel.pop_due(self.now()):
+                    self.spawn(self.fire(kind, service, plan, index))
+                deadline = self.wheel.next_deadline()
+                timeout = MAX_IDLE_SECONDS if deadline is None else max(0, min(deadline - self.now(), MAX_IDLE_SECONDS))
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            sd_notify("STOPPING=1")
+            print("Daemon stopping...")
+            if server is not None:
+                server.close()
+                await server.wait_closed()
+                if os.path.exists(self.control_path):
+                    os.unlink(self.control_path)
+            # Let commits already in flight finish; unpushed work is pushed next start
+            if self._tasks:
+                await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        for service in self.services:
+            service.generator.close()
+
+def query(control_path=None, command="status", timeout=5):
+    """Send a command to a running daemon; returns its reply, or None if none is running."""
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(control_path or default_control_path())
+            sock.sendall((command + "\n").encode())
+            data = b""
+            while not data.endswith(b"\n"):
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                data += chunk
+    except OSError:
+        return None
+    return json.loads(data) if data else None
+
+def print_status(status):
+    print(f"Daemon pid {status['pid']}, running since {status['started']}, planning {status['day']}")
+    for repo in status["repos"]:
+        error = f"  ({repo['error']})" if repo["error"] else ""
+        print(f"  {repo['repo']}: {repo['committed']}/{repo['planned']} commits{error}")
+    print(f"{status['timers']} timers queued; next:")
+    for entry in status["next"]:
+        print(f"  {entry['time']} {entry['action']:<7} {entry['repo'] or ''}")
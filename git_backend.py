@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Git Backend
+Shared git access for the commit generators. Keeps long-lived plumbing
+helpers open and drives them over pipes so a commit does not cost a fresh
+shell plus git process for every step.
+"""
+
+import subprocess
+import time
+from pathlib import Path
+
+from metrics import Metrics
+from repo_lock import RepoLock
+
+# Hooks that `git commit` would run; if any are installed we must go through
+# porcelain so they still fire.
+COMMIT_HOOKS = ("pre-commit", "prepare-commit-msg", "commit-msg", "post-commit")
+
+# Retries for commands that lose a race on .git/index.lock to a process
+# outside our lock (an editor, an IDE, a person running git by hand)
+INDEX_LOCK_RETRIES = 5
+
+ZERO_SHA = "0" * 40
+
+def parse_tree(data):
+    """Parse git's binary tree format into (mode, name, sha) entries."""
+    entries = []
+    pos = 0
+    while pos < len(data):
+        space = data.index(b" ", pos)
+        nul = data.index(b"\0", space)
+        mode = data[pos:space].decode()
+        name = data[space + 1:nul].decode()
+        sha = data[nul + 1:nul + 21].hex()
+        entries.append((mode, name, sha))
+        pos = nul + 21
+    return entries
+
+def parse_batch_header(line):
+    """Parse a cat-file --batch(-check) line into (sha, type, size), or None if missing."""
+    if not line or line.endswith(" missing") or line.endswith(" ambiguous"):
+        return None
+    sha, obj_type, size = line.split(" ")
+    return sha, obj_type, int(size)
+
+def mktree_input(entries):
+    """mktree --batch input for one tree of (mode, name, sha) entries."""
+    lines = []
+    for mode, name, sha in entries:
+        obj_type = "tree" if mode == "40000" else "commit" if mode == "160000" else "blob"
+        lines.append(f"{mode} {obj_type} {sha}\t{name}\n")
+    return ("".join(lines) + "\n").encode()
+
+# update-ref --stdin replies to a transaction that went through
+UPDATE_REF_REPLIES = (b"start: ok", b"prepare: ok", b"commit: ok")
+
+def update_ref_input(ref, new, old=None):
+    """update-ref --stdin transaction moving ref from old to new."""
+    # An all-zero old value asserts that the ref does not exist yet
+    return f"start\nupdate {ref} {new} {old or ZERO_SHA}\nprepare\ncommit\n".encode()
+
+def update_index_args(path, blob):
+    """git arguments pointing the index entry for path at blob."""
+    return ("update-index", "--add", "--cacheinfo", f"100644,{blob},{path}")
+
+def index_info_input(entries):
+    """update-index --index-info input for {path: blob} entries."""
+    return "".join(f"100644 {blob}\t{path}\n" for path, blob in entries.items()).encode()
+
+# The plumbing commit is written once, as generators of session requests:
+# each yields a (method, *args) tuple and is sent back the result of calling
+# that method on the session. GitSession runs them with plain calls and
+# AsyncGitSession (async_git.py) awaits the same methods, so both sessions
+# build exactly the same commands.
+
+def plumbing_check_steps(repo_path):
+    """Whether commits may bypass `git commit` without changing behavior."""
+    hooks_dir = yield ("run", "rev-parse", "--git-path", "hooks")
+    hooks = Path(repo_path, hooks_dir) if hooks_dir else None
+    has_hooks = hooks is not None and any((hooks / name).exists() for name in COMMIT_HOOKS)
+    signing = ((yield ("run", "config", "--type=bool", "--default=false", "commit.gpgsign")) or "false") == "true"
+    code, _, _ = yield ("call", "symbolic-ref", "-q", "HEAD")
+    return code == 0 and not has_hooks and not signing
+
+def tree_with_file_steps(tree, path, blob):
+    """Id of a copy of tree with path set to blob, or None if a tree cannot be read."""
+    name, _, rest = path.partition("/")
+    entries = (yield ("read_tree", tree)) if tree else []
+    if entries is None:
+        # Never write a tree that silently drops the entries we could not read
+        return None
+    current = next((e for e in entries if e[1] == name), None)
+    entries = [e for e in entries if e[1] != name]
+    if rest:
+        subtree = current[2] if current and current[0] == "40000" else None
+        sha = yield from tree_with_file_steps(subtree, rest, blob)
+        if sha is None:
+            return None
+        entries.append(("40000", name, sha))
+    else:
+        entries.append(("100644", name, blob))
+    return (yield ("mktree", entries))
+
+def commit_file_steps(path, message, content, bare, plumbing):
+    """Commit a single file; see GitSession.commit_file."""
+    if not bare and not plumbing:
+        if (yield ("run", "add", "--", path)) is None:
+            return None
+        if (yield ("run", "commit", "-m", message)) is None:
+            return None
+        return (yield ("rev_parse", "HEAD"))
+
+    if bare:
+        blob = yield ("hash_content", content)
+    else:
+        blob = yield ("hash_file", path)
+    if not blob:
+        return None
+
+    parent = yield ("rev_parse", "HEAD")
+    base_tree = (yield ("rev_parse", f"{parent}^{{tree}}")) if parent else None
+    tree = yield from tree_with_file_steps(base_tree, path, blob)
+    if not tree:
+        return None
+
+    args = ["commit-tree", tree, "-m", message]
+    if parent:
+        args += ["-p", parent]
+    commit = yield ("run", *args)
+    if not commit or not (yield ("update_ref", "HEAD", commit, parent)):
+        return None
+
+    if not bare:
+        yield ("update_index_entry", path, blob)
+    return commit
+
+class GitSession:
+    def __init__(self, repo_path=None, metrics=None):
+        self.repo_path = Path(repo_path) if repo_path else Path.cwd()
+        self.metrics = metrics or Metrics()
+        self._helpers = {}
+        self._pending_index = {}
+        self._plumbing_ok = None
+        self._bare = None
+        self._lock = None
+
+    def call(self, *args, input=None):
+        """Run a one-shot git command; returns (exit code, stdout bytes, stderr text).
+
+        Retries when the command loses a race on .git/index.lock.
+        """
+        delay = 0.05
+        for attempt in range(INDEX_LOCK_RETRIES + 1):
+            with self.metrics.timer(f"git.{args[0]}") as measurement:
+                measurement["bytes_written"] = len(input or b"")
+                result = subprocess.run(
+                    ["git", *args],
+                    cwd=self.repo_path,
+                    input=input,
+                    capture_output=True
+                )
+                measurement["exit_code"] = result.returncode
+            stderr = result.stderr.decode(errors="replace")
+            if result.returncode == 0 or "index.lock" not in stderr or attempt == INDEX_LOCK_RETRIES:
+                return result.returncode, result.stdout, stderr
+            # Lost a race on .git/index.lock; back off and try again
+            time.sleep(delay)
+            delay *= 2
+
+    def run(self, *args, input=None):
+        """Run a one-shot git command and return its stripped stdout, or None on failure."""
+        code, stdout, stderr = self.call(*args, input=input)
+        if code != 0:
+            print(f"Git command failed: git {' '.join(args)} (exit {code})")
+            print(f"Error output: {stderr}")
+            return None
+        return stdout.decode(errors="replace").strip()
+
+    @property
+    def lock(self):
+        """Inter-process lock serialising writers of this repository."""
+        if self._lock is None:
+            self._lock = RepoLock(self.state_path("repo.lock"), metrics=self.metrics)
+        return self._lock
+
+    def state_path(self, name):
+        """Path for tool state kept inside the git directory, out of the working tree."""
+        git_path = self.run("rev-parse", "--git-path", f"commitment_issues/{name}")
+        path = self.repo_path / git_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def _helper(self, *args):
+        """Return a running persistent helper process, starting it if needed."""
+        proc = self._helpers.get(args)
+        if proc is None or proc.poll() is not None:
+            proc = subprocess.Popen(
+                ["git", *args],
+                cwd=self.repo_path,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL
+            )
+            self._helpers[args] = proc
+        return proc
+
+    def _request(self, args, payload):
+        """Send payload to a helper and return its next line of output."""
+        started = time.perf_counter()
+        proc = self._helper(*args)
+        proc.stdin.write(payload)
+        proc.stdin.flush()
+        line = proc.stdout.readline().decode().rstrip("\n")
+        self.metrics.record(f"git.pipe.{args[0]}", time.perf_counter() - started,
+                            exit_code=0 if line else 1, bytes_written=len(payload))
+        return line
+
+    def _drive(self, steps):
+        """Run a step generator (see commit_file_steps) against this session."""
+        reply = None
+        while True:
+            try:
+                method, *args = steps.send(reply)
+            except StopIteration as done:
+                return done.value
+            reply = getattr(self, method)(*args)
+
+    def rev_parse(self, rev):
+        """Resolve a revision to a full object id, or None if it does not exist."""
+        info = self.object_info(rev)
+        return info[0] if info else None
+
+    def object_info(self, rev):
+        """Return (sha, type, size) for an object, or None if it does not exist."""
+        return parse_batch_header(self._request(("cat-file", "--batch-check"), f"{rev}\n".encode()))
+
+    def read_object(self, rev):
+        """Return (type, raw bytes) for an object, or (None, None) if missing."""
+        with self.metrics.timer("git.pipe.cat-file") as measurement:
+            proc = self._helper("cat-file", "--batch")
+            proc.stdin.write(f"{rev}\n".encode())
+            proc.stdin.flush()
+            header = parse_batch_header(proc.stdout.readline().decode().rstrip("\n"))
+            if header is None:
+                measurement["exit_code"] = 1
+                return None, None
+            _, obj_type, size = header
+            data = proc.stdout.read(size)
+            proc.stdout.read(1)  # trailing newline
+            return obj_type, data
+
+    def read_tree(self, rev):
+        """Return the entries of a tree as a list of (mode, name, sha), or None if it is not a tree."""
+        obj_type, data = self.read_object(rev)
+        if obj_type != "tree":
+            return None
+        return parse_tree(data)
+
+    def hash_file(self, path):
+        """Write a working tree file into the object store and return its blob id."""
+        return self._request(("hash-object", "-w", "--stdin-paths"), f"{path}\n".encode()) or None
+
+    def hash_content(self, content):
+        """Write content into the object store as a blob and return its id."""
+        return self.run("hash-object", "-w", "--stdin", input=content)
+
+    def mktree(self, entries):
+        """Write a tree object from (mode, name, sha) entries and return its id."""
+        return self._request(("mktree", "--batch"), mktree_input(entries)) or None
+
+    def update_ref(self, ref, new, old=None):
+        """Atomically move ref from old to new; returns True on success."""
+        with self.metrics.timer("git.pipe.update-ref") as measurement:
+            proc = self._helper("update-ref", "-m", "commit", "--stdin")
+            proc.stdin.write(update_ref_input(ref, new, old))
+            proc.stdin.flush()
+            for expected in UPDATE_REF_REPLIES:
+                if proc.stdout.readline().rstrip(b"\n") != expected:
+                    # A failed transaction kills the helper; it is restarted on next use
+                    proc.wait()
+                    measurement["exit_code"] = 1
+                    return False
+            return True
+
+    def is_bare(self):
+        """Whether the repository has no working tree (and no index)."""
+        if self._bare is None:
+            self._bare = self.run("rev-parse", "--is-bare-repository") == "true"
+        return self._bare
+
+    def can_use_plumbing(self):
+        """Check whether commits may bypass `git commit` without changing behavior."""
+        if self._plumbing_ok is None:
+            self._plumbing_ok = self._drive(plumbing_check_steps(self.repo_path))
+        return self._plumbing_ok
+
+    def write_tree_with_file(self, tree, path, blob):
+        """Return the id of a copy of tree with path set to blob."""
+        return self._drive(tree_with_file_steps(tree, path, blob))
+
+    def commit_file(self, path, message, content=None):
+        """Commit the current contents of a single file.
+
+        Uses the persistent plumbing helpers when the repository allows it,
+        so the processes spawned per commit are `git commit-tree` and the
+        `git update-index` that keeps the index in step with HEAD. Falls back to
+        `git add` + `git commit` when hooks or signing are configured.
+        In a bare repository there is no file to read or index to update:
+        the blob is written from content and the commit goes straight to
+        the branch ref. Elsewhere content is accepted for parity with
+        NativeCommitter and git hashes the file from the working tree.
+        Returns the new commit id, or None on failure.
+        """
+        bare = self.is_bare()
+        plumbing = bare or self.can_use_plumbing()
+        # Re-entrant, so callers that already hold it (make_commit) are not blocked
+        with self.lock.hold():
+            return self._drive(commit_file_steps(path, message, content, bare, plumbing))
+
+    def update_index_entry(self, path, blob):
+        """Point the index entry of a file committed through plumbing at its new blob.
+
+        Called as soon as the ref has moved, with the repository lock still
+        held by the committer, so `git status` and a person's own `git
+        commit` never see the file as deleted from the index. An update that
+        fails is retried by sync_index().
+        """
+        if self.is_bare():
+            return
+        self._pending_index[path] = blob
+        if self.run(*update_index_args(path, blob)) is not None:
+            del self._pending_index[path]
+
+    def index_entry_written(self, path):
+        """Forget a failed update for path once the index entry was written another way."""
+        self._pending_index.pop(path, None)
+
+    def sync_index(self):
+        """Retry index updates that failed after a plumbing commit."""
+        if not self._pending_index:
+            return
+        info = index_info_input(self._pending_index)
+        with self.lock.hold():
+            if self.run("update-index", "--add", "--index-info", input=info) is None:
+                return
+        self._pending_index.clear()
+
+    def close(self):
+        """Sync the index and shut down all helper processes."""
+        self.sync_index()
+        for proc in self._helpers.values():
+            if proc.poll() is None:
+                proc.stdin.close()
+                proc.wait()
+        self._helpers.clear()
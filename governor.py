@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Throughput Governor
+Token-bucket limits on commits per second and pushes per minute, so bulk
+runs go as fast as local I/O allows without hammering the remote or the
+disk. Each repository gets a governor whose buckets are chained to one
+process-wide governor, so a limit holds per repository and across every
+repository a process drives (worker pools, the asyncio runner, the daemon).
+
+Callers reserve tokens rather than poll for them: a reservation always
+succeeds and says how long to wait before using it, so waiting callers are
+served in arrival order and nothing spins. A rate of 0 means unlimited.
+
+Per-repository limits come from commit_config.json (max_commits_per_second,
+max_pushes_per_minute); global limits from the same keys at the top of a
+--repos manifest.
+"""
+
+import os
+import threading
+import time
+
+class TokenBucket:
+    def __init__(self, rate=0, capacity=None, clock=time.monotonic):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.set_rate(rate, capacity)
+
+    def set_rate(self, rate, capacity=None):
+        """Change the refill rate (tokens per second); the default burst is one second's worth."""
+        with self._lock:
+            self.rate = rate or 0
+            self.capacity = capacity or max(1.0, self.rate)
+            self._tokens = self.capacity
+            self._updated = self.clock()
+
+    def reserve(self, tokens=1):
+        """Take tokens now; returns the seconds to wait before using them."""
+        if not self.rate:
+            return 0.0
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+class Governor:
+    def __init__(self, commits_per_second=0, pushes_per_minute=0, parent=None):
+        self.parent = parent
+        self.buckets = {"commit": TokenBucket(), "push": TokenBucket()}
+        self.limits = None
+        self.set_limits(commits_per_second, pushes_per_minute)
+
+    def set_limits(self, commits_per_second=0, pushes_per_minute=0):
+        """Apply new limits; buckets whose limit is unchanged keep their state."""
+        limits = (commits_per_second or 0, pushes_per_minute or 0)
+        if limits == self.limits:
+            return
+        old = self.limits or (None, None)
+        if limits[0] != old[0]:
+            self.buckets["commit"].set_rate(limits[0])
+        if limits[1] != old[1]:
+            self.buckets["push"].set_rate(limits[1] / 60)
+        self.limits = limits
+
+    def paced(self, interval):
+        """A child governor allowing one commit every interval seconds, never in bursts.
+
+        For one run's own pacing (commit_generator.py --delay): this
+        governor, shared by the process, is left as it is, and its limits
+        still apply on top.
+        """
+        child = Governor(commits_per_second=1 / interval, parent=self)
+        child.buckets["commit"].set_rate(1 / interval, capacity=1)
+        return child
+
+    def reserve(self, kind, tokens=1):
+        """Reserve from this governor and every governor above it; returns the longest wait."""
+        wait = self.buckets[kind].reserve(tokens)
+        if self.parent is not None:
+            wait = max(wait, self.parent.reserve(kind, tokens))
+        return wait
+
+    def burst(self, kind):
+        """Most tokens worth taking at once without waiting, or None if unlimited."""
+        sizes = []
+        governor = self
+        while governor is not None:
+            bucket = governor.buckets[kind]
+            if bucket.rate:
+                sizes.append(int(bucket.capacity))
+            governor = governor.parent
+        return min(sizes) if sizes else None
+
+    def acquire(self, kind, tokens=1, cancel_event=None, metrics=None):
+        """Wait for tokens ("commit" or "push"); returns False if cancel_event was set meanwhile."""
+        wait = self.reserve(kind, tokens)
+        if wait <= 0:
+            return True
+        if metrics is not None:
+            metrics.record("throttle", wait, kind=kind)
+        if cancel_event is not None:
+            return not cancel_event.wait(wait)
+        time.sleep(wait)
+        return True
+
+    async def acquire_async(self, kind, tokens=1, metrics=None):
+        """acquire() for coroutines: sleeps on the event loop instead of blocking it."""
+        wait = self.reserve(kind, tokens)
+        if wait <= 0:
+            return True
+        if metrics is not None:
+            metrics.record("throttle", wait, kind=kind)
+        import asyncio
+        await asyncio.sleep(wait)
+        return True
+
+# Shared by every repository governor in the process
+GLOBAL = Governor()
+
+_repos = {}
+_repos_guard = threading.Lock()
+
+def configure_global(commits_per_second=0, pushes_per_minute=0):
+    """Set the process-wide limits (0 = unlimited)."""
+    GLOBAL.set_limits(commits_per_second, pushes_per_minute)
+
+def for_repo(path, commits_per_second=0, pushes_per_minute=0):
+    """Return the governor for a repository, shared by every generator using it."""
+    key = os.path.realpath(path)
+    with _repos_guard:
+        governor = _repos.get(key)
+        if governor is None:
+            governor = _repos[key] = Governor(parent=GLOBAL)
+    governor.set_limits(commits_per_second, pushes_per_minute)
+    return governor
+
+def describe(governor):
+    """Human-readable summary of the limits in force for a governor."""
+    chain = [governor]
+    while chain[-1].parent is not None:
+        chain.append(chain[-1].parent)
+    # The last governor is the process-wide one; the others all apply to this repository
+    local, shared_governor = (chain[:-1], chain[-1]) if len(chain) > 1 else (chain, None)
+    parts = []
+    for label, index, unit in (("commits", 0, "/s"), ("pushes", 1, "/min")):
+        repo = min((g.limits[index] for g in local if g.limits[index]), default=0)
+        shared = shared_governor.limits[index] if shared_governor is not None else 0
+        if repo:
+            parts.append(f"{repo:g} {label}{unit} per repository")
+        if shared:
+            parts.append(f"{shared:g} {label}{unit} overall")
+    return ", ".join(parts) or "none"
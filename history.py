@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Run History
+Local SQLite index of every commit and push the tools make, across all
+repositories on this machine. make_commit and the push step each add one
+row (repository, planned time, actual time, SHA, duration, outcome), so
+questions like "how many commits did a repository get each day last month,
+and how long did its pushes take" are answered from an index instead of by
+grepping run logs or walking git log in every repository.
+
+Rows are indexed by repository and day and by repository and time, so
+status and stats queries read only the rows they report on and stay fast
+however long the history grows. The database runs in WAL mode, so the GUI
+and CLI can query it while a run is writing, and writers in separate
+processes queue on SQLite's own lock. It lives in the per-user state
+directory; set COMMITMENT_ISSUES_HISTORY to use another file, or
+"run_history": false in commit_config.json to stop recording.
+
+Usage:
+    python history.py status
+    python history.py stats --repo my-project --days 30
+"""
+
+import argparse
+import datetime
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS repos (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    repo_id INTEGER NOT NULL REFERENCES repos (id),
+    kind TEXT NOT NULL,
+    day TEXT NOT NULL,
+    planned REAL,
+    actual REAL NOT NULL,
+    seconds REAL NOT NULL,
+    ok INTEGER NOT NULL,
+    sha TEXT,
+    detail TEXT
+);
+CREATE INDEX IF NOT EXISTS events_by_day ON events (repo_id, day, kind);
+CREATE INDEX IF NOT EXISTS events_by_time ON events (repo_id, kind, actual);
+"""
+
+DAILY_QUERY = """
+SELECT day,
+       SUM(kind = 'commit' AND ok), SUM(kind = 'commit' AND NOT ok),
+       SUM(kind = 'push' AND ok), SUM(kind = 'push' AND NOT ok),
+       AVG(CASE WHEN kind = 'push' AND ok THEN seconds END),
+       MAX(CASE WHEN kind = 'push' THEN seconds END),
+       AVG(CASE WHEN kind = 'commit' AND planned IS NOT NULL THEN actual - planned END)
+FROM events WHERE repo_id = ? AND day >= ? AND day <= ?
+GROUP BY day ORDER BY day
+"""
+
+# Days shown by the stats command when --days is not given
+DEFAULT_DAYS = 30
+
+def default_path():
+    """Per-user database path; COMMITMENT_ISSUES_HISTORY overrides it."""
+    path = os.environ.get("COMMITMENT_ISSUES_HISTORY")
+    if path:
+        return Path(path)
+    base = os.environ.get("XDG_STATE_HOME") or os.environ.get("LOCALAPPDATA")
+    base = Path(base) if base else Path.home() / ".local" / "state"
+    return base / "commitment-issues" / "history.sqlite3"
+
+def open_history(path=None):
+    """Open the run history, or warn and return None if it cannot be used."""
+    try:
+        return RunHistory(path)
+    except (OSError, sqlite3.Error) as e:
+        print(f"Warning: run history disabled ({e})")
+        return None
+
+class RunHistory:
+    def __init__(self, path=None, timeout=5.0):
+        self.path = Path(path) if path else default_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # One connection shared by the committing thread and the push thread
+        self._lock = threading.Lock()
+        self._repo_ids = {}
+        self.db = sqlite3.connect(str(self.path), timeout=timeout, check_same_thread=False,
+                                  isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        # No fsync per row: a power cut may lose the latest rows, never the file
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        if self.db.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            self.db.executescript(SCHEMA + f"PRAGMA user_version = {SCHEMA_VERSION};")
+
+    def repo_id(self, repo_path):
+        """Id of a repository's row, added on first use."""
+        path = os.path.realpath(repo_path)
+        repo_id = self._repo_ids.get(path)
+        if repo_id is None:
+            self.db.execute("INSERT OR IGNORE INTO repos (path, name) VALUES (?, ?)",
+                            (path, os.path.basename(path)))
+            repo_id = self.db.execute("SELECT id FROM repos WHERE path = ?", (path,)).fetchone()[0]
+            self._repo_ids[path] = repo_id
+        return repo_id
+
+    def record(self, repo_path, kind, started, seconds, ok, sha=None, planned=None, detail=None):
+        """Add one commit or push; started and planned are Unix times."""
+        self.record_many(repo_path, kind, [(started, seconds, ok, sha, planned, detail)])
+
+    def record_many(self, repo_path, kind, events):
+        """Add (started, seconds, ok, sha, planned, detail) events in one transaction.
+
+        A failed write is reported and dropped; it never fails the run.
+        """
+        try:
+            with self._lock:
+                repo_id = self.repo_id(repo_path)
+                rows = [(repo_id, kind, datetime.date.fromtimestamp(started).isoformat(), planned, started,
+                         seconds, int(bool(ok)), sha, detail)
+                        for started, seconds, ok, sha, planned, detail in events]
+                self.db.execute("BEGIN")
+                try:
+                    self.db.executemany(
+                        "INSERT INTO events (repo_id, kind, day, planned, actual, seconds, ok, sha, detail) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                    self.db.execute("COMMIT")
+                except sqlite3.Error:
+                    self.db.execute("ROLLBACK")
+                    raise
+        except sqlite3.Error as e:
+            print(f"Warning: could not record {kind} in run history ({e})")
+
+    def repos(self, query=None):
+        """(id, path, name) of known repositories, optionally matching a path or name."""
+        with self._lock:
+            if query is None:
+                return self.db.execute("SELECT id, path, name FROM repos ORDER BY name, path").fetchall()
+            return self.db.execute("SELECT id, path, name FROM repos WHERE path = ? OR name = ? ORDER BY path",
+                                   (os.path.realpath(query), query)).fetchall()
+
+    def daily(self, repo_id, first_day, last_day):
+        """Per-day totals for a repository, oldest first, as dicts."""
+        with self._lock:
+            rows = self.db.execute(DAILY_QUERY, (repo_id, first_day.isoformat(), last_day.isoformat())).fetchall()
+        keys = ("day", "commits", "failed", "pushes", "failed_pushes", "push_avg", "push_max", "late_avg")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def latest(self, repo_id, kind, ok_only=False):
+        """Most recent event of a kind as a dict, or None."""
+        condition = " AND ok = 1" if ok_only else ""
+        with self._lock:
+            row = self.db.execute(
+                "SELECT actual, seconds, ok, sha, detail FROM events "
+                f"WHERE repo_id = ? AND kind = ?{condition} ORDER BY actual DESC LIMIT 1",
+                (repo_id, kind)).fetchone()
+        return dict(zip(("actual", "seconds", "ok", "sha", "detail"), row)) if row else None
+
+    def unpushed(self, repo_id):
+        """Commits recorded since the start of the latest successful push."""
+        pushed = self.latest(repo_id, "push", ok_only=True)
+        with self._lock:
+            return self.db.execute(
+                "SELECT COUNT(*) FROM events WHERE repo_id = ? AND kind = 'commit' AND ok = 1 AND actual > ?",
+                (repo_id, pushed["actual"] if pushed else 0)).fetchone()[0]
+
+    def status(self, today=None):
+        """One summary dict per repository: today's commits, last commit and push, unpushed count."""
+        today = today or datetime.date.today()
+        summary = []
+        for repo_id, path, name in self.repos():
+            days = self.daily(repo_id, today, today)
+            summary.append({
+                "repo": path,
+                "name": name,
+                "today": days[0]["commits"] if days else 0,
+                "failed_today": days[0]["failed"] if days else 0,
+                "last_commit": self.latest(repo_id, "commit"),
+                "last_push": self.latest(repo_id, "push"),
+                "unpushed": self.unpushed(repo_id),
+            })
+        return summary
+
+    def close(self):
+        with self._lock:
+            self.db.close()
+
+def format_time(event):
+    if event is None:
+        return "-"
+    return datetime.datetime.fromtimestamp(event["actual"]).strftime("%Y-%m-%d %H:%M:%S")
+
+def format_seconds(value):
+    return "-" if value is None else f"{value:.2f}s"
+
+def print_status(summary):
+    if not summary:
+        print("No runs recorded yet.")
+        return
+    print(f"{'Repository':<24} {'Today':>5} {'Failed':>6}  {'Last commit':<19}  {'Last push':<19} "
+          f"{'Took':>7} {'':<4} {'Unpushed':>8}")
+    for repo in summary:
+        push = repo["last_push"]
+        outcome = "" if push is None else "ok" if push["ok"] else "fail"
+        print(f"{repo['name'][:24]:<24} {repo['today']:>5} {repo['failed_today']:>6}  "
+              f"{format_time(repo['last_commit']):<19}  {format_time(push):<19} "
+              f"{format_seconds(push['seconds'] if push else None):>7} {outcome:<4} {repo['unpushed']:>8}")
+
+def print_stats(name, path, days):
+    print(f"\n{name} ({path})")
+    if not days:
+        print("  No runs in this period.")
+        return
+    print(f"  {'Date':<10} {'Commits':>8} {'Failed':>7} {'Pushes':>7} {'Failed':>7} "
+          f"{'Push avg':>9} {'Push max':>9} {'Late avg':>9}")
+    for day in days:
+        print(f"  {day['day']:<10} {day['commits']:>8} {day['failed']:>7} {day['pushes']:>7} "
+              f"{day['failed_pushes']:>7} {format_seconds(day['push_avg']):>9} "
+              f"{format_seconds(day['push_max']):>9} {format_seconds(day['late_avg']):>9}")
+    commits = sum(day["commits"] for day in days)
+    print(f"  {commits} commits over {len(days)} active days ({commits / len(days):.1f} per day)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the run history of commits and pushes")
+    parser.add_argument("--db", type=str, help="History database (default: per-user state directory)")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("status", help="Today's commits, last commit and push, unpushed commits per repository")
+    stats = commands.add_parser("stats", help="Commits and push times per day")
+    stats.add_argument("--repo", type=str, help="Repository path or directory name (default: all)")
+    stats.add_argument("--days", type=int, default=DEFAULT_DAYS, help="Days to show, ending today")
+    args = parser.parse_args()
+
+    path = Path(args.db) if args.db else default_path()
+    if not path.exists():
+        print(f"No run history at {path} yet.")
+        return
+    history = RunHistory(path)
+    try:
+        started = time.perf_counter()
+        if args.command == "stats":
+            repos = history.repos(args.repo)
+            if not repos:
+                print(f"No runs recorded for {args.repo}.")
+                return
+            today = datetime.date.today()
+            first = today - datetime.timedelta(days=max(args.days, 1) - 1)
+            for repo_id, repo_path, name in repos:
+                print_stats(name, repo_path, history.daily(repo_id, first, today))
+        else:
+            print_status(history.status())
+        print(f"\n(queried {history.path} in {(time.perf_counter() - started) * 1000:.1f} ms)")
+    finally:
+        history.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Commit Journal
+Append-only record of the commits made for each day's plan. make_commit
+writes one JSON line per successful planned commit (plan id, plan index,
+commit SHA, time) and fsyncs it before moving on, so after a crash, reboot
+or Ctrl-C the next --resume run knows exactly which planned commits exist by
+reading that day's journal, without walking git log.
+
+A crash between the commit and its journal line can repeat at most that one
+commit on resume. A torn last line from a crash mid-write is cut off when the
+journal is next opened for writing, so the records after it start on a line
+of their own; replay skips anything it cannot parse.
+"""
+
+import datetime
+import json
+import os
+from pathlib import Path
+
+# Journals older than this many days are removed when a new day starts
+KEEP_DAYS = 30
+
+class CommitJournal:
+    """One journal file per day under directory, named YYYY-MM-DD.jsonl."""
+
+    def __init__(self, directory, keep_days=KEEP_DAYS):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.keep_days = keep_days
+        self._file = None
+        self._file_day = None
+
+    def path_for(self, day):
+        return self.directory / f"{day.isoformat()}.jsonl"
+
+    def _open(self, day):
+        if self._file_day != day:
+            self.close()
+            path = self.path_for(day)
+            created = not path.exists()
+            if not created:
+                self._truncate_torn_line(path)
+            self._file = open(path, 'a')
+            self._file_day = day
+            if created:
+                # Make the new directory entry itself durable
+                self._fsync_directory()
+                self.prune(day)
+        return self._file
+
+    @staticmethod
+    def _truncate_torn_line(path):
+        """Cut the file back to its last complete line."""
+        with open(path, 'rb+') as f:
+            end = f.seek(0, os.SEEK_END)
+            if end == 0:
+                return
+            f.seek(end - 1)
+            if f.read(1) == b"\n":
+                return
+            keep = 0
+            pos = end
+            while pos > 0:
+                start = max(0, pos - 4096)
+                f.seek(start)
+                newline = f.read(pos - start).rfind(b"\n")
+                if newline != -1:
+                    keep = start + newline + 1
+                    break
+                pos = start
+            f.truncate(keep)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _fsync_directory(self):
+        if not hasattr(os, "O_DIRECTORY"):
+            return
+        fd = os.open(self.directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def record(self, day, plan_id, index, sha, message=None):
+        """Durably append one committed plan entry."""
+        entry = {"plan": plan_id, "index": index, "sha": sha,
+                 "time": round(datetime.datetime.now().timestamp(), 3), "message": message}
+        f = self._open(day)
+        f.write(json.dumps(entry) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+        return entry
+
+    def replay(self, day, plan_id):
+        """Return {plan index: record} for the commits already made for a plan."""
+        done = {}
+        try:
+            with open(self.path_for(day), 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if entry.get("plan") == plan_id:
+                        done[entry["index"]] = entry
+        except FileNotFoundError:
+            pass
+        return done
+
+    def prune(self, today):
+        """Delete journals that fell out of the retention window."""
+        cutoff = today - datetime.timedelta(days=self.keep_days)
+        for path in self.directory.glob("*.jsonl"):
+            try:
+                day = datetime.date.fromisoformat(path.stem)
+            except ValueError:
+                continue
+            if day < cutoff:
+                path.unlink()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._file_day = None
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Repository Maintenance
+Keeps the per-commit cost flat as history grows. Every commit adds a loose
+blob, tree and commit object, and nothing else in the tools ever packs them,
+so after a year of daily runs every commit, push negotiation and object
+lookup walks tens of thousands of loose files.
+
+Once a day, after the push and off the commit path, the loose object count
+is checked. Past a threshold the loose objects are packed incrementally,
+with a multi-pack-index bitmap and a split commit-graph written alongside.
+Once too many packs accumulate they are consolidated into one. Each run
+records object counts before and after, plus the push time before the run
+and at the next push, in the tool's state directory.
+
+Usage:
+    python maintenance.py [--path REPO] [--force] [--report]
+"""
+
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+
+from git_backend import GitSession
+
+# Loose objects that trigger a repack (git gc --auto uses 6700; a commit here adds three)
+DEFAULT_LOOSE_THRESHOLD = 1000
+
+# Packs tolerated before they are consolidated into one
+DEFAULT_MAX_PACKS = 20
+
+# Number of maintenance records kept in the state file
+HISTORY_LIMIT = 50
+
+def parse_count_objects(output):
+    """Parse `git count-objects -v` into a dict of integers."""
+    fields = {}
+    for line in (output or "").splitlines():
+        key, _, value = line.partition(": ")
+        if value.strip().isdigit():
+            fields[key] = int(value)
+    return {
+        "loose": fields.get("count", 0),
+        "loose_kib": fields.get("size", 0),
+        "packed": fields.get("in-pack", 0),
+        "packs": fields.get("packs", 0),
+        "pack_kib": fields.get("size-pack", 0),
+    }
+
+class RepoMaintenance:
+    def __init__(self, git, loose_threshold=DEFAULT_LOOSE_THRESHOLD, max_packs=DEFAULT_MAX_PACKS,
+                 state_path=None):
+        self.git = git
+        self.metrics = git.metrics
+        self.loose_threshold = loose_threshold
+        self.max_packs = max_packs
+        self.state_path = state_path or git.state_path("maintenance.json")
+        self.state = self.load_state()
+
+    def load_state(self):
+        try:
+            with open(self.state_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"history": []}
+
+    def save_state(self):
+        tmp = f"{self.state_path}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp, self.state_path)
+
+    def object_counts(self):
+        return parse_count_objects(self.git.run("count-objects", "-v"))
+
+    def has_commit_graph(self):
+        info = Path(self.git.repo_path, self.git.run("rev-parse", "--git-path", "objects/info"))
+        return (info / "commit-graph").exists() or (info / "commit-graphs" / "commit-graph-chain").exists()
+
+    def due(self, counts):
+        """Why maintenance should run now, or None if it is not needed."""
+        if self.loose_threshold and counts["loose"] >= self.loose_threshold:
+            return f"{counts['loose']} loose objects"
+        if counts["packs"] > self.max_packs:
+            return f"{counts['packs']} packs"
+        if counts["packed"] and not self.has_commit_graph():
+            return "no commit-graph"
+        return None
+
+    def repack(self, full):
+        """Pack loose objects (or everything, if full) and write a bitmap."""
+        args = ["repack", "-d", "-q"] + (["-a"] if full else [])
+        # Multi-pack bitmaps need git 2.34; older git gets a plain repack
+        if self.git.run(*args, "--write-midx", "-b") is not None:
+            return True
+        return self.git.run(*args, *(["-b"] if full else [])) is not None
+
+    def note_push(self, seconds):
+        """Record the first push after the latest maintenance run."""
+        history = self.state["history"]
+        if seconds is not None and history and history[-1].get("push_after") is None:
+            history[-1]["push_after"] = seconds
+            self.save_state()
+
+    def run(self, force=False, push_seconds=None):
+        """Repack and write commit-graph if due (or forced); returns the run's record or None."""
+        before = self.object_counts()
+        reason = self.due(before) or ("forced" if force else None)
+        if reason is None:
+            return None
+
+        full = force or before["packs"] + 1 > self.max_packs
+        started = time.perf_counter()
+        # Held so a concurrent writer never races the pruning of packed loose objects
+        with self.git.lock.hold(), self.metrics.timer("maintenance") as measurement:
+            ok = self.repack(full)
+            ok = self.git.run("commit-graph", "write", "--reachable", "--split") is not None and ok
+            measurement["exit_code"] = 0 if ok else 1
+        after = self.object_counts()
+
+        record = {
+            "time": round(time.time(), 3),
+            "reason": reason,
+            "mode": "full" if full else "incremental",
+            "ok": ok,
+            "seconds": round(time.perf_counter() - started, 3),
+            "before": before,
+            "after": after,
+            "push_before": push_seconds,
+            "push_after": None,
+        }
+        self.state["history"] = (self.state["history"] + [record])[-HISTORY_LIMIT:]
+        self.save_state()
+        print_record(record)
+        return record
+
+def format_push(seconds):
+    return "-" if seconds is None else f"{seconds:.2f}s"
+
+def print_record(record):
+    before, after = record["before"], record["after"]
+    status = "" if record["ok"] else " (with errors)"
+    print(f"Repository maintenance ({record['mode']}, {record['reason']}){status}: "
+          f"{before['loose']} -> {after['loose']} loose objects, "
+          f"{before['packs']} -> {after['packs']} packs in {record['seconds']:.2f}s")
+
+def print_report(history):
+    if not history:
+        print("No maintenance has run yet.")
+        return
+    print(f"{'Date':<17} {'Mode':<12} {'Loose':>13} {'Packs':>9} {'Pack KiB':>9} {'Took':>7} {'Push':>15}")
+    for record in history:
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(record["time"]))
+        before, after = record["before"], record["after"]
+        loose = f"{before['loose']}->{after['loose']}"
+        packs = f"{before['packs']}->{after['packs']}"
+        push = f"{format_push(record['push_before'])} -> {format_push(record['push_after'])}"
+        print(f"{when:<17} {record['mode']:<12} {loose:>13} {packs:>9} {after['pack_kib']:>9} "
+              f"{record['seconds']:>6.2f}s {push:>15}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack loose objects and write commit-graph and bitmap files")
+    parser.add_argument("--path", type=str, help="Repository path (default: current directory)")
+    parser.add_argument("--force", action="store_true", help="Consolidate everything now, even if not due")
+    parser.add_argument("--report", action="store_true", help="Show past maintenance runs instead of running")
+    parser.add_argument("--loose-threshold", type=int, default=DEFAULT_LOOSE_THRESHOLD,
+                        help="Loose objects that make maintenance due")
+    parser.add_argument("--max-packs", type=int, default=DEFAULT_MAX_PACKS,
+                        help="Packs tolerated before they are consolidated")
+    args = parser.parse_args()
+
+    git = GitSession(args.path)
+    try:
+        maintenance = RepoMaintenance(git, args.loose_threshold, args.max_packs)
+        if args.report:
+            counts = maintenance.object_counts()
+            print(f"Now: {counts['loose']} loose objects, {counts['packed']} packed in {counts['packs']} packs")
+            print_report(maintenance.state["history"])
+            return
+        if maintenance.run(force=args.force) is None:
+            counts = maintenance.object_counts()
+            print(f"Nothing to do: {counts['loose']} loose objects, {counts['packs']} packs")
+    finally:
+        git.close()
+
+if __name__ == "__main__":
+    main()
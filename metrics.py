@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Run Metrics
+Lightweight per-phase instrumentation for the commit path. Every git call,
+activity log write, commit and push is recorded with its duration, exit code
+and bytes written, so a run can tell whether git, disk or waiting dominates.
+Records can be streamed as JSON lines or written as a Prometheus text file,
+and, when an output is configured, summarised as a table at the end of a run.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+PROMETHEUS_PREFIX = "commitment_issues"
+
+# Callables receiving every record from every Metrics instance (e.g. a profiler)
+_listeners = []
+
+def add_listener(callback):
+    _listeners.append(callback)
+
+def remove_listener(callback):
+    if callback in _listeners:
+        _listeners.remove(callback)
+
+class Metrics:
+    def __init__(self):
+        self.records = []
+        self._lock = threading.Lock()
+        self._jsonl = None
+        self._prometheus_path = None
+
+    def configure_output(self, path):
+        """Send records to path: a Prometheus text file for *.prom, else JSON lines."""
+        if str(path).endswith(".prom"):
+            self._prometheus_path = path
+        else:
+            self._jsonl = open(path, 'a')
+
+    def record(self, phase, seconds, exit_code=0, bytes_written=0, **fields):
+        """Add a finished measurement."""
+        record = {"time": round(time.time(), 3), "phase": phase, "seconds": seconds,
+                  "exit_code": exit_code, "bytes": bytes_written, **fields}
+        with self._lock:
+            self.records.append(record)
+            if self._jsonl is not None:
+                self._jsonl.write(json.dumps(record) + "\n")
+                self._jsonl.flush()
+        for callback in _listeners:
+            callback(record)
+        return record
+
+    @contextmanager
+    def timer(self, phase, **fields):
+        """Time a block; the yielded dict may set exit_code and bytes_written."""
+        result = {"exit_code": 0, "bytes_written": 0}
+        started = time.perf_counter()
+        try:
+            yield result
+        except Exception:
+            result["exit_code"] = result["exit_code"] or 1
+            raise
+        finally:
+            self.record(phase, time.perf_counter() - started, **result, **fields)
+
+    def summary(self):
+        """Aggregate records per phase."""
+        with self._lock:
+            records = list(self.records)
+        phases = {}
+        for record in records:
+            phases.setdefault(record["phase"], []).append(record)
+        rows = []
+        for phase, items in sorted(phases.items()):
+            durations = sorted(r["seconds"] for r in items)
+            rows.append({
+                "phase": phase,
+                "count": len(items),
+                "total": sum(durations),
+                "mean": sum(durations) / len(durations),
+                "p50": durations[len(durations) // 2],
+                "max": durations[-1],
+                "failures": sum(1 for r in items if r["exit_code"] != 0),
+                "bytes": sum(r["bytes"] for r in items),
+            })
+        return rows
+
+    @property
+    def configured(self):
+        return self._jsonl is not None or self._prometheus_path is not None
+
+    def print_summary(self):
+        """Print the per-phase table; runs without --metrics-out stay quiet."""
+        rows = self.summary()
+        if not rows or not self.configured:
+            return
+        print(f"\n{'Phase':<24} {'Count':>6} {'Total s':>9} {'Mean ms':>9} {'p50 ms':>8} {'Max ms':>9} {'Fail':>5} {'Bytes':>10}")
+        for row in rows:
+            print(f"{row['phase']:<24} {row['count']:>6} {row['total']:>9.3f} {row['mean'] * 1000:>9.2f} "
+                  f"{row['p50'] * 1000:>8.2f} {row['max'] * 1000:>9.2f} {row['failures']:>5} {row['bytes']:>10}")
+
+    def write_prometheus(self, path):
+        """Write per-phase totals in the Prometheus text exposition format."""
+        lines = []
+        metrics = (
+            ("phase_seconds_total", "counter", "Time spent per phase", "total"),
+            ("phase_calls_total", "counter", "Calls per phase", "count"),
+            ("phase_failures_total", "counter", "Non-zero exit codes per phase", "failures"),
+            ("phase_bytes_total", "counter", "Bytes written per phase", "bytes"),
+            ("phase_max_seconds", "gauge", "Slowest call per phase", "max"),
+        )
+        rows = self.summary()
+        for name, kind, help_text, key in metrics:
+            lines.append(f"# HELP {PROMETHEUS_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {PROMETHEUS_PREFIX}_{name} {kind}")
+            for row in rows:
+                lines.append(f'{PROMETHEUS_PREFIX}_{name}{{phase="{row["phase"]}"}} {row[key]}')
+        # Written via rename so the node exporter never reads a partial file
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w') as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp, path)
+
+    def reset(self):
+        """Drop collected records, e.g. between days of a long-running process."""
+        with self._lock:
+            self.records = []
+
+    def flush(self):
+        """Write the Prometheus file, if configured, from the current records."""
+        if self._prometheus_path is not None and self.records:
+            self.write_prometheus(self._prometheus_path)
+
+    def close(self):
+        """Flush configured outputs."""
+        self.flush()
+        if self._jsonl is not None:
+            self._jsonl.close()
+            self._jsonl = None
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Multi-Repository Runner
+Drives many repositories from one process. Commits for each repository are
+made on a bounded worker pool, then pushes run on a second pool sized for
+network concurrency. A per-repository lock guarantees two workers never
+touch the same .git/index, even if a manifest lists a repository twice.
+
+Manifest format (JSON), where the optional limits cap commits and pushes
+across all repositories together (see governor.py):
+{
+  "workers": 4,
+  "push_workers": 8,
+  "max_commits_per_second": 200,
+  "max_pushes_per_minute": 60,
+  "repos": [
+    "../project-a",
+    {"path": "../project-b", "config": "commit_config.json", "commits": 20}
+  ]
+}
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from auto_commit import AutoCommitGenerator
+import governor
+
+class MultiRepoRunner:
+    # Shared across runners so separate manifests in one process still serialise
+    _locks = {}
+    _locks_guard = threading.Lock()
+
+    def __init__(self, manifest_path, workers=None, push_workers=None):
+        self.manifest_path = Path(manifest_path)
+        with open(self.manifest_path, 'r') as f:
+            manifest = json.load(f)
+        if isinstance(manifest, list):
+            manifest = {"repos": manifest}
+
+        base = self.manifest_path.parent
+        self.repos = []
+        for entry in manifest.get("repos", []):
+            if isinstance(entry, str):
+                entry = {"path": entry}
+            entry = dict(entry)
+            entry["path"] = (base / entry["path"]).resolve()
+            self.repos.append(entry)
+
+        default_workers = min(len(self.repos), os.cpu_count() or 1) or 1
+        self.workers = workers or manifest.get("workers") or default_workers
+        self.push_workers = push_workers or manifest.get("push_workers") or len(self.repos) or 1
+        governor.configure_global(manifest.get("max_commits_per_second", 0),
+                                  manifest.get("max_pushes_per_minute", 0))
+
+    @classmethod
+    def repo_lock(cls, path):
+        """Return the lock guarding a repository's working tree and index."""
+        key = os.path.realpath(path)
+        with cls._locks_guard:
+            return cls._locks.setdefault(key, threading.Lock())
+
+    def commit_repo(self, entry):
+        """Make one repository's commits; returns its result record."""
+        result = {"repo": str(entry["path"]), "planned": 0, "committed": 0,
+                  "pushed": None, "commit_seconds": 0.0, "push_seconds": 0.0, "error": None}
+        started = time.perf_counter()
+        with self.repo_lock(entry["path"]):
+            generator = None
+            try:
+                # Inside the try: a bad entry (a missing path) fails this repository only
+                generator = AutoCommitGenerator(entry["path"], entry.get("config", "commit_config.json"))
+                if not generator.ensure_git_repo():
+                    result["error"] = "no remote configured"
+                    generator.close()
+                    return result, None
+                config = generator.config
+                count = entry.get("commits") or random.randint(config["min_commits"], config["max_commits"])
+                result["planned"] = count
+                for _ in range(count):
+                    if generator.make_commit():
+                        result["committed"] += 1
+                generator.git.sync_index()
+            except Exception as e:
+                result["error"] = str(e) or type(e).__name__
+                if generator is not None:
+                    generator.close()
+                return result, None
+        result["commit_seconds"] = time.perf_counter() - started
+        return result, generator
+
+    def push_repo(self, result, generator):
+        """Push one repository and close its generator."""
+        started = time.perf_counter()
+        try:
+            with self.repo_lock(result["repo"]):
+                result["pushed"] = generator.push_to_remote()
+                generator.run_maintenance()
+        finally:
+            generator.close()
+        result["push_seconds"] = time.perf_counter() - started
+        return result
+
+    def run(self):
+        """Commit to every repository, then push them; returns result records."""
+        print(f"Running {len(self.repos)} repositories with {self.workers} commit "
+              f"workers and {self.push_workers} push workers...")
+        started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            committed = list(pool.map(self.commit_repo, self.repos))
+        commit_phase = time.perf_counter() - started
+
+        results = []
+        to_push = []
+        for result, generator in committed:
+            if generator is None:
+                results.append(result)
+            elif result["committed"] == 0:
+                generator.close()
+                results.append(result)
+            else:
+                to_push.append((result, generator))
+
+        with ThreadPoolExecutor(max_workers=self.push_workers) as pool:
+            results += list(pool.map(lambda item: self.push_repo(*item), to_push))
+        push_phase = time.perf_counter() - started - commit_phase
+
+        self.print_summary(results, commit_phase, push_phase)
+        return results
+
+    @staticmethod
+    def print_summary(results, commit_phase, push_phase):
+        """Print an aggregated table of per-repository results."""
+        print("\nMulti-Repository Summary:")
+        print(f"{'Repository':<40} {'Commits':>9} {'Push':>6} {'Commit s':>9} {'Push s':>7}  Error")
+        for result in sorted(results, key=lambda r: r["repo"]):
+            pushed = {True: "ok", False: "fail", None: "-"}[result["pushed"]]
+            commits = f"{result['committed']}/{result['planned']}"
+            print(f"{Path(result['repo']).name:<40} {commits:>9} {pushed:>6} "
+                  f"{result['commit_seconds']:>9.2f} {result['push_seconds']:>7.2f}  {result['error'] or ''}")
+        total = sum(r["committed"] for r in results)
+        rate = total / commit_phase if commit_phase > 0 else 0.0
+        print(f"Total: {total} commits in {commit_phase:.2f}s ({rate:.1f} commits/s), "
+              f"pushes took {push_phase:.2f}s")
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Native Object Store
+Pure-Python writer for loose git objects. For the single-file workload the
+generators only ever need one blob, one tree and one commit per commit, so
+they can be hashed, compressed and written straight into .git/objects with
+the branch ref advanced through a lock file, and the file's index entry is
+patched in place, so a commit spawns no processes. Indexes this writer does
+not handle (none yet, a new path, split or version 4 indexes) are updated
+with `git update-index` instead.
+"""
+
+import hashlib
+import os
+import struct
+import time
+import zlib
+from pathlib import Path
+
+from git_backend import parse_tree
+
+# core.looseCompression defaults to 1 in git, which is much cheaper than zlib's 6
+LOOSE_COMPRESSION = 1
+
+ZERO_SHA = "0" * 40
+
+# Fixed part of a version 2/3 index entry: ctime, mtime, dev, ino, mode, uid,
+# gid, size, object id and flags
+INDEX_ENTRY = struct.Struct(">10I20sH")
+INDEX_EXTENDED_FLAG = 0x4000
+
+# Optional index extensions derived from the entries (the cache tree and
+# entry offsets); git rebuilds them, so they are dropped when an entry changes
+DERIVED_EXTENSIONS = (b"TREE", b"EOIE", b"IEOT")
+
+def patch_index_entry(data, path, blob, stat):
+    """Return index bytes with path's entry pointing at blob, or None if unsupported.
+
+    Only an existing, unconflicted entry in a version 2 or 3 index is
+    patched; its flags and name are kept, so every other entry stays where
+    it is.
+    """
+    if len(data) < 32 or data[:4] != b"DIRC":
+        return None
+    version, count = struct.unpack_from(">II", data, 4)
+    if version not in (2, 3):
+        return None
+    name = path.encode()
+    offset = 12
+    found = None
+    for _ in range(count):
+        flags = struct.unpack_from(">H", data, offset + 60)[0]
+        start = offset + INDEX_ENTRY.size + (2 if flags & INDEX_EXTENDED_FLAG else 0)
+        end = data.index(b"\0", start)
+        if data[start:end] == name:
+            if flags & 0x3000:
+                # A merge conflict: leave it to git
+                return None
+            found = offset
+        # Entries are NUL-padded to a multiple of eight bytes
+        offset += (end - offset + 8) & ~7
+    if found is None:
+        return None
+
+    extensions = []
+    position = offset
+    while position < len(data) - 20:
+        signature = data[position:position + 4]
+        size = struct.unpack_from(">I", data, position + 4)[0]
+        if not b"A" <= signature[:1] <= b"Z":
+            # A required extension (split index, sparse directories) we cannot keep consistent
+            return None
+        if signature not in DERIVED_EXTENSIONS:
+            extensions.append(data[position:position + 8 + size])
+        position += 8 + size
+
+    flags = struct.unpack_from(">H", data, found + 60)[0]
+    entry = INDEX_ENTRY.pack(
+        int(stat.st_ctime) & 0xFFFFFFFF, stat.st_ctime_ns % 1_000_000_000,
+        int(stat.st_mtime) & 0xFFFFFFFF, stat.st_mtime_ns % 1_000_000_000,
+        stat.st_dev & 0xFFFFFFFF, stat.st_ino & 0xFFFFFFFF, 0o100644,
+        stat.st_uid & 0xFFFFFFFF, stat.st_gid & 0xFFFFFFFF, stat.st_size & 0xFFFFFFFF,
+        bytes.fromhex(blob), flags)
+    body = data[:found] + entry + data[found + INDEX_ENTRY.size:offset] + b"".join(extensions)
+    # index.skipHash leaves the trailing checksum zeroed
+    checksum = bytes(20) if data[-20:] == bytes(20) else hashlib.sha1(body).digest()
+    return body + checksum
+
+class LooseObjectStore:
+    def __init__(self, objects_dir, fallback=None):
+        self.objects_dir = Path(objects_dir)
+        # GitSession used for objects we cannot read ourselves (e.g. packed ones)
+        self.fallback = fallback
+
+    @staticmethod
+    def hash_object(obj_type, data):
+        """Return (sha, raw) for an object, where raw is header plus content."""
+        raw = f"{obj_type} {len(data)}\0".encode() + data
+        return hashlib.sha1(raw).hexdigest(), raw
+
+    def object_path(self, sha):
+        return self.objects_dir / sha[:2] / sha[2:]
+
+    def write(self, obj_type, data):
+        """Write an object if it is not already stored and return its id."""
+        sha, raw = self.hash_object(obj_type, data)
+        path = self.object_path(sha)
+        if path.exists():
+            return sha
+        path.parent.mkdir(exist_ok=True)
+        tmp = path.parent / f"tmp_obj_{os.getpid()}_{sha[2:10]}"
+        with open(tmp, 'wb') as f:
+            f.write(zlib.compress(raw, LOOSE_COMPRESSION))
+        os.chmod(tmp, 0o444)
+        os.replace(tmp, path)
+        return sha
+
+    def read(self, sha):
+        """Return (type, data) for an object, or (None, None) if it is unavailable."""
+        path = self.object_path(sha)
+        if path.exists():
+            raw = zlib.decompress(path.read_bytes())
+            header, _, data = raw.partition(b"\0")
+            return header.split(b" ")[0].decode(), data
+        if self.fallback is not None:
+            return self.fallback.read_object(sha)
+        return None, None
+
+    @staticmethod
+    def encode_tree(entries):
+        """Serialise (mode, name, sha) entries into git's binary tree format."""
+        def sort_key(entry):
+            # Directories sort as if their name had a trailing slash
+            mode, name, _ = entry
+            return name + "/" if mode == "40000" else name
+        parts = []
+        for mode, name, sha in sorted(entries, key=sort_key):
+            parts.append(f"{mode} {name}\0".encode() + bytes.fromhex(sha))
+        return b"".join(parts)
+
+class NativeCommitter:
+    """Commit a single file by writing objects and refs directly.
+
+    Mirrors GitSession.commit_file() so the generators can swap one for the
+    other. Only the identity lookup and a few config probes go through git,
+    once, when the committer is created, plus `git update-index` for an
+    index this class cannot patch itself.
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self.git_dir = Path(session.run("rev-parse", "--absolute-git-dir"))
+        common_dir = Path(session.run("rev-parse", "--git-common-dir"))
+        self.common_dir = common_dir if common_dir.is_absolute() else session.repo_path / common_dir
+        self.store = LooseObjectStore(self.common_dir / "objects", fallback=session)
+        author = session.run("var", "GIT_AUTHOR_IDENT")
+        committer = session.run("var", "GIT_COMMITTER_IDENT")
+        if not author or not committer:
+            raise ValueError("no git identity configured; set user.name and user.email")
+        # Strip the "<epoch> <tz>" suffix, timestamps are filled in per commit
+        self.author = author.rsplit(" ", 2)[0]
+        self.committer = committer.rsplit(" ", 2)[0]
+        self._head = None
+        self._head_tree = None
+        self._trees = {}
+
+    @staticmethod
+    def supported(session):
+        """Check whether the repository is plain enough for native writes."""
+        if not session.can_use_plumbing():
+            return False
+        # Without an identity the git engine reports the problem the usual way
+        if not session.run("var", "GIT_AUTHOR_IDENT") or not session.run("var", "GIT_COMMITTER_IDENT"):
+            return False
+        if os.environ.get("GIT_OBJECT_DIRECTORY") or os.environ.get("GIT_INDEX_FILE"):
+            return False
+        if session.run("rev-parse", "--show-object-format") != "sha1":
+            return False
+        for key in ("core.sharedRepository", "extensions.refStorage", "core.fsmonitor"):
+            if session.run("config", "--default=", key):
+                return False
+        return True
+
+    def branch_ref(self):
+        """Return the ref HEAD points at, e.g. refs/heads/main."""
+        head = (self.git_dir / "HEAD").read_text().strip()
+        if not head.startswith("ref: "):
+            return None
+        return head[5:]
+
+    def read_ref(self, ref):
+        """Resolve a branch ref from its loose file or packed-refs."""
+        path = self.common_dir / ref
+        if path.exists():
+            return path.read_text().strip()
+        packed = self.common_dir / "packed-refs"
+        if packed.exists():
+            with open(packed) as f:
+                for line in f:
+                    if line.endswith(f" {ref}\n"):
+                        return line.split(" ", 1)[0]
+        return None
+
+    def write_ref(self, ref, new, old, message):
+        """Move a ref from old to new under git's lock-file protocol."""
+        path = self.common_dir / ref
+        path.parent.mkdir(parents=True, exist_ok=True)
+        lock = path.with_name(path.name + ".lock")
+        try:
+            fd = os.open(lock, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        except FileExistsError:
+            return False
+        try:
+            if self.read_ref(ref) != old:
+                os.close(fd)
+                os.unlink(lock)
+                return False
+            os.write(fd, f"{new}\n".encode())
+            os.close(fd)
+            os.replace(lock, path)
+        except OSError:
+            if lock.exists():
+                os.unlink(lock)
+            raise
+
+        entry = f"{old or ZERO_SHA} {new} {self.committer} {self._now()}\t{message}\n"
+        for log in (self.common_dir / "logs" / ref, self.git_dir / "logs" / "HEAD"):
+            log.parent.mkdir(parents=True, exist_ok=True)
+            with open(log, 'a') as f:
+                f.write(entry)
+        return True
+
+    def write_index_entry(self, path, blob):
+        """Point path's index entry at blob in place; returns False if git has to do it."""
+        index = self.git_dir / "index"
+        lock = index.with_name("index.lock")
+        try:
+            data = index.read_bytes()
+            stat = os.stat(self.session.repo_path / path)
+        except OSError:
+            return False
+        patched = patch_index_entry(data, path, blob, stat)
+        if patched is None:
+            return False
+        try:
+            fd = os.open(lock, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        except OSError:
+            return False
+        try:
+            # Someone else may have written the index since it was read
+            if index.read_bytes() != data:
+                os.close(fd)
+                os.unlink(lock)
+                return False
+            os.write(fd, patched)
+            os.close(fd)
+            os.replace(lock, index)
+        except OSError:
+            if lock.exists():
+                os.unlink(lock)
+            raise
+        return True
+
+    @staticmethod
+    def _now():
+        return f"{int(time.time())} {time.strftime('%z')}"
+
+    def _read_tree(self, sha):
+        """Return a tree's entries, or None if it cannot be read."""
+        entries = self._trees.get(sha)
+        if entries is None:
+            obj_type, data = self.store.read(sha)
+            if obj_type != "tree":
+                return None
+            entries = parse_tree(data)
+        return entries
+
+    def _write_tree_with_file(self, tree, path, blob, written):
+        """Write a copy of tree with path set to blob; new trees go into written.
+
+        Returns None if an existing tree cannot be read, rather than write
+        a tree that silently drops its other entries.
+        """
+        name, _, rest = path.partition("/")
+        entries = self._read_tree(tree) if tree else []
+        if entries is None:
+            return None
+        current = next((e for e in entries if e[1] == name), None)
+        entries = [e for e in entries if e[1] != name]
+        if rest:
+            subtree = current[2] if current and current[0] == "40000" else None
+            sha = self._write_tree_with_file(subtree, rest, blob, written)
+            if sha is None:
+                return None
+            entries.append(("40000", name, sha))
+        else:
+            entries.append(("100644", name, blob))
+        sha = self.store.write("tree", self.store.encode_tree(entries))
+        written[sha] = entries
+        return sha
+
+    def _commit_tree(self, commit):
+        """Return the tree id of a commit, cached for the commit we wrote last, or None if unreadable."""
+        if commit == self._head:
+            return self._head_tree
+        obj_type, data = self.store.read(commit)
+        if obj_type != "commit":
+            return None
+        return data.split(b"\n", 1)[0].split(b" ")[1].decode()
+
+    def commit_file(self, path, message, content=None):
+        """Commit a single file and return the new commit id.
+
+        content defaults to the file's bytes in the working tree. Call with
+        the repository lock held, as the generators' make_commit does.
+        """
+        ref = self.branch_ref()
+        if ref is None:
+            return None
+        if content is None:
+            content = (self.session.repo_path / path).read_bytes()
+
+        blob = self.store.write("blob", content)
+        parent = self.read_ref(ref)
+        written = {}
+        base_tree = None
+        if parent:
+            base_tree = self._commit_tree(parent)
+            if base_tree is None:
+                print(f"Cannot read commit {parent}")
+                return None
+        tree = self._write_tree_with_file(base_tree, path, blob, written)
+        if tree is None:
+            print(f"Cannot read the tree of commit {parent}")
+            return None
+
+        now = self._now()
+        lines = [f"tree {tree}"]
+        if parent:
+            lines.append(f"parent {parent}")
+        lines.append(f"author {self.author} {now}")
+        lines.append(f"committer {self.committer} {now}")
+        body = "\n".join(lines) + f"\n\n{message}\n"
+        commit = self.store.write("commit", body.encode())
+
+        if not self.write_ref(ref, commit, parent, f"commit: {message}"):
+            return None
+
+        # Only the trees of the newest commit are worth keeping in memory
+        self._head = commit
+        self._head_tree = tree
+        self._trees = written
+        if not self.session.is_bare():
+            if self.write_index_entry(path, blob):
+                self.session.index_entry_written(path)
+            else:
+                self.session.update_index_entry(path, blob)
+        return commit
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Commit Planner
+Generates the commit schedule for a run of days in one batch: how many
+commits each day gets and at which minute of the day each one fires. Plans
+are seeded, so the same seed and settings always give the same schedule, and
+are saved as a compact JSON file the scheduler consumes, so a week or month
+can be inspected before anything touches git.
+
+Uses NumPy to draw the whole batch at once when it is installed and falls
+back to the random module otherwise. The two backends produce different
+(but each reproducible) schedules for the same seed; the backend is recorded
+in the plan file.
+
+Usage:
+    python planner.py --days 30 --seed 42 --out schedule.json
+"""
+
+import argparse
+import datetime
+import json
+import os
+import random
+from itertools import accumulate
+
+from config_loader import load_config
+
+PLAN_VERSION = 1
+
+# Settings a plan depends on; a saved plan is stale once any of them change
+PLAN_KEYS = ("min_commits", "max_commits", "min_delay_minutes", "max_delay_minutes",
+             "work_hours_start", "work_hours_end", "enable_random_timing")
+
+# Off-hour commits land in the early morning (from 6 AM) or evening (until 11 PM)
+MORNING_START = 6 * 60
+EVENING_END = 23 * 60
+
+_numpy = None
+
+def numpy_module():
+    """Import NumPy on first use (it dominates startup); None if not installed."""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy = numpy
+    return _numpy or None
+
+class CommitPlanner:
+    def __init__(self, config, seed=None, use_numpy=None):
+        self.config = config
+        self.seed = seed if seed is not None else random.SystemRandom().randrange(2 ** 32)
+        self._use_numpy = use_numpy
+
+    @property
+    def use_numpy(self):
+        # Resolved on first use so planners that never draw never import NumPy
+        if self._use_numpy is None or self._use_numpy:
+            self._use_numpy = numpy_module() is not None
+        return self._use_numpy
+
+    @property
+    def backend(self):
+        return "numpy" if self.use_numpy else "python"
+
+    def even_minutes(self, count):
+        """Evenly spaced minutes from the start of the work day.
+
+        Spaced by the mean of the configured delays, so short delays never
+        collapse every commit onto the same minute.
+        """
+        gap = (self.config["min_delay_minutes"] + self.config["max_delay_minutes"]) / 2
+        start = self.config["work_hours_start"] * 60
+        return [start + round(i * gap) for i in range(count)]
+
+    def _windows(self):
+        work_start = self.config["work_hours_start"] * 60
+        work_end = self.config["work_hours_end"] * 60
+        return work_start, work_end, min(MORNING_START, work_start), max(EVENING_END, work_end)
+
+    def _draw_python(self, counts):
+        rng = random.Random(self.seed)
+        work_start, work_end, morning_start, evening_end = self._windows()
+        days = []
+        for count in counts:
+            # 70% during work hours, the rest split between morning and evening
+            work_commits = count * 7 // 10
+            minutes = [rng.randint(work_start, work_end) for _ in range(work_commits)]
+            for _ in range(count - work_commits):
+                if rng.random() < 0.5:
+                    minutes.append(rng.randint(morning_start, work_start))
+                else:
+                    minutes.append(rng.randint(work_end, evening_end))
+            days.append(sorted(minutes))
+        return days
+
+    def _draw_numpy(self, counts):
+        np = numpy_module()
+        rng = np.random.default_rng(self.seed)
+        work_start, work_end, morning_start, evening_end = self._windows()
+        if not counts:
+            return []
+        counts = np.asarray(counts, dtype=np.int64)
+        total = int(counts.sum())
+
+        # Position of each commit within its day decides work vs off hours
+        day_index = np.repeat(np.arange(len(counts)), counts)
+        position = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        work = position < np.repeat(counts * 7 // 10, counts)
+        morning = rng.random(total) < 0.5
+        minutes = np.where(work, rng.integers(work_start, work_end, total, endpoint=True),
+                           np.where(morning,
+                                    rng.integers(morning_start, work_start, total, endpoint=True),
+                                    rng.integers(work_end, evening_end, total, endpoint=True)))
+
+        order = np.lexsort((minutes, day_index))
+        bounds = np.cumsum(counts)[:-1]
+        return [day.tolist() for day in np.split(minutes[order], bounds)]
+
+    def draw_counts(self, days):
+        """Commits per day for a run of days."""
+        low, high = self.config["min_commits"], self.config["max_commits"]
+        if self.use_numpy:
+            # Offset from the minutes stream so the two never share draws
+            rng = numpy_module().random.default_rng(self.seed + 1)
+            return rng.integers(low, high, days, endpoint=True).tolist()
+        rng = random.Random(self.seed + 1)
+        return [rng.randint(low, high) for _ in range(days)]
+
+    def draw_minutes(self, counts):
+        """Sorted minutes since midnight for each day's commits."""
+        if not self.config["enable_random_timing"]:
+            return [self.even_minutes(count) for count in counts]
+        if self.use_numpy:
+            return self._draw_numpy(counts)
+        return self._draw_python(counts)
+
+    def plan(self, start, days, counts=None):
+        """Plan days starting at start; counts overrides the drawn daily totals."""
+        counts = list(counts) if counts is not None else self.draw_counts(days)
+        minutes = self.draw_minutes(counts)
+        return {
+            "version": PLAN_VERSION,
+            "backend": self.backend,
+            "seed": self.seed,
+            "start": start.isoformat(),
+            "config": {key: self.config[key] for key in PLAN_KEYS},
+            "counts": counts,
+            # Flattened across days; counts gives each day's share
+            "minutes": [m for day in minutes for m in day],
+        }
+
+def matches_config(plan, config):
+    """Whether a plan was made with the current planning settings."""
+    return plan.get("config") == {key: config[key] for key in PLAN_KEYS}
+
+def day_minutes(plan, day):
+    """Return a day's planned minutes since midnight, or None if not covered."""
+    index = (day - datetime.date.fromisoformat(plan["start"])).days
+    if not 0 <= index < len(plan["counts"]):
+        return None
+    offsets = [0] + list(accumulate(plan["counts"]))
+    return plan["minutes"][offsets[index]:offsets[index + 1]]
+
+def load_plan(path):
+    """Load a plan file, or None if it is missing, unreadable or from another version."""
+    try:
+        with open(path, 'r') as f:
+            plan = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(plan, dict) or plan.get("version") != PLAN_VERSION:
+        return None
+    return plan
+
+def save_plan(path, plan):
+    """Write a plan file atomically in compact form."""
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(plan, f, separators=(',', ':'))
+    os.replace(tmp, path)
+
+def print_plan(plan):
+    """Print one line per planned day."""
+    start = datetime.date.fromisoformat(plan["start"])
+    print(f"Plan from {plan['start']} ({plan['backend']}, seed {plan['seed']}):")
+    for index, count in enumerate(plan["counts"]):
+        day = start + datetime.timedelta(days=index)
+        minutes = day_minutes(plan, day)
+        times = ", ".join(f"{m // 60:02d}:{m % 60:02d}" for m in minutes[:6])
+        more = f" ... (+{len(minutes) - 6})" if len(minutes) > 6 else ""
+        print(f"  {day.isoformat()} {day.strftime('%a')} {count:>3} commits  {times}{more}")
+    print(f"Total: {sum(plan['counts'])} commits over {len(plan['counts'])} days")
+
+def main():
+    parser = argparse.ArgumentParser(description="Plan commit counts and times for a run of days")
+    parser.add_argument("--days", type=int, default=7, help="Number of days to plan")
+    parser.add_argument("--start", type=str, help="First day as YYYY-MM-DD (default: today)")
+    parser.add_argument("--seed", type=int, help="Seed for a reproducible plan (default: random)")
+    parser.add_argument("--config", type=str, default="commit_config.json", help="Configuration file")
+    parser.add_argument("--out", type=str, help="Write the plan to this file for auto_commit.py --plan")
+    parser.add_argument("--no-numpy", action="store_true", help="Use the pure-Python backend")
+    args = parser.parse_args()
+
+    start = datetime.date.fromisoformat(args.start) if args.start else datetime.date.today()
+    planner = CommitPlanner(load_config(args.config), seed=args.seed, use_numpy=not args.no_numpy)
+    plan = planner.plan(start, args.days)
+    print_plan(plan)
+    if args.out:
+        save_plan(args.out, plan)
+        print(f"Saved plan to {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Run Profiling
+Profiles a real run of the command-line tools (--profile on
+commit_generator.py and auto_commit.py). cProfile covers the main thread and
+every thread started during the run (worker pools, the scheduler's executor,
+the push thread), merged into one table. Up to Python 3.11 each new thread
+gets a profile of its own; from 3.12 cProfile sits on sys.monitoring, where
+one profiler per process is allowed and it already sees every thread. Wall time is split into time
+blocked on git child processes, time waiting for the repository lock, and
+Python CPU, using the same per-call records as --metrics-out plus the CPU
+time of reaped git processes. --profile-memory adds tracemalloc's peak and
+top allocation sites. Profiling overhead inflates Python CPU, so compare
+profiled runs with each other rather than with unprofiled ones.
+
+--profile-out writes the report as JSON, with functions keyed by file and
+name rather than line number, so reports from two versions diff cleanly,
+along with the raw cProfile data (.pstats) for pstats or snakeviz, and the
+tracemalloc snapshot (.tracemalloc) when memory is profiled.
+
+Usage:
+    python commit_generator.py 200 --yes --profile-out new.json
+    python profiling.py new.json --compare old.json
+"""
+
+import argparse
+import cProfile
+import datetime
+import json
+import os
+import pstats
+import sys
+import sysconfig
+import threading
+import time
+import tracemalloc
+
+import metrics
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+STDLIB = sysconfig.get_paths()["stdlib"]
+
+# Rows kept in the function and allocation tables
+TOP_FUNCTIONS = 40
+TOP_ALLOCATIONS = 15
+
+# Before sys.monitoring, a cProfile.Profile only sees the thread that enabled it
+PER_THREAD_PROFILES = sys.version_info < (3, 12)
+
+def relative_path(filename):
+    """Path relative to the repository or the standard library, for stable keys."""
+    path = os.path.abspath(filename)
+    if path.startswith(REPO_ROOT + os.sep):
+        return os.path.relpath(path, REPO_ROOT)
+    if path.startswith(STDLIB + os.sep):
+        return "<stdlib>/" + os.path.relpath(path, STDLIB)
+    return os.path.basename(path)
+
+def function_key(func):
+    """Stable name for a pstats function: relative path and name, no line number."""
+    filename, _, name = func
+    if filename == "~":
+        return name
+    return f"{relative_path(filename)}({name})"
+
+class RunProfiler:
+    def __init__(self, out=None, memory=False):
+        self.out = out
+        self.memory = memory
+        self.profile = cProfile.Profile()
+        self._thread_profiles = []
+        self._lock = threading.Lock()
+        self._thread_run = None
+        self.git_phases = {}
+        self.lock_wait = 0.0
+        self.throttle = 0.0
+        self.snapshot = None
+
+    def _on_record(self, record):
+        phase = record["phase"]
+        with self._lock:
+            if phase.startswith("git."):
+                entry = self.git_phases.setdefault(phase, {"calls": 0, "seconds": 0.0})
+                entry["calls"] += 1
+                entry["seconds"] += record["seconds"]
+            elif phase == "lock_wait":
+                self.lock_wait += record["seconds"]
+            elif phase == "throttle":
+                self.throttle += record["seconds"]
+
+    def _patch_threads(self):
+        """Give every thread started from now on its own profile."""
+        original = self._thread_run = threading.Thread.run
+        profiles = self._thread_profiles
+        lock = self._lock
+
+        def run(thread):
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Another profiling tool owns the hook; the thread still runs, unprofiled
+                original(thread)
+                return
+            try:
+                original(thread)
+            finally:
+                profile.disable()
+                with lock:
+                    profiles.append(profile)
+
+        threading.Thread.run = run
+
+    def start(self):
+        self.started_at = datetime.datetime.now().isoformat(timespec="seconds")
+        self.times = os.times()
+        self.wall = time.perf_counter()
+        metrics.add_listener(self._on_record)
+        if PER_THREAD_PROFILES:
+            self._patch_threads()
+        if self.memory:
+            tracemalloc.start(25)
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+        self.wall = time.perf_counter() - self.wall
+        end = os.times()
+        self.python_cpu = (end.user - self.times.user) + (end.system - self.times.system)
+        self.git_cpu = ((end.children_user - self.times.children_user)
+                        + (end.children_system - self.times.children_system))
+        if self._thread_run is not None:
+            threading.Thread.run = self._thread_run
+            self._thread_run = None
+        metrics.remove_listener(self._on_record)
+        if self.memory:
+            self.snapshot = tracemalloc.take_snapshot()
+            self.peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    def stats(self):
+        """Main-thread and per-thread profiles merged into one pstats.Stats."""
+        stats = pstats.Stats(self.profile)
+        with self._lock:
+            for profile in self._thread_profiles:
+                stats.add(profile)
+        return stats
+
+    def report(self):
+        functions = {}
+        for func, (_, calls, own, cumulative, _) in self.stats().stats.items():
+            key = function_key(func)
+            entry = functions.setdefault(key, {"function": key, "calls": 0, "own_seconds": 0.0,
+                                               "cumulative_seconds": 0.0})
+            entry["calls"] += calls
+            entry["own_seconds"] += own
+            entry["cumulative_seconds"] += cumulative
+        top = sorted(functions.values(), key=lambda f: (-f["cumulative_seconds"], f["function"]))
+        for entry in top:
+            entry["own_seconds"] = round(entry["own_seconds"], 6)
+            entry["cumulative_seconds"] = round(entry["cumulative_seconds"], 6)
+
+        git_wait = sum(p["seconds"] for p in self.git_phases.values())
+        report = {
+            "version": 1,
+            "command": " ".join(sys.argv),
+            "python": sys.version.split()[0],
+            "started": self.started_at,
+            "wall_seconds": round(self.wall, 6),
+            "python_cpu_seconds": round(self.python_cpu, 6),
+            "git_cpu_seconds": round(self.git_cpu, 6),
+            "git_wait_seconds": round(git_wait, 6),
+            "git_calls": sum(p["calls"] for p in self.git_phases.values()),
+            "lock_wait_seconds": round(self.lock_wait, 6),
+            "throttle_seconds": round(self.throttle, 6),
+            "git_phases": {phase: {"calls": p["calls"], "seconds": round(p["seconds"], 6)}
+                           for phase, p in sorted(self.git_phases.items())},
+            "functions": top[:TOP_FUNCTIONS],
+        }
+        if self.snapshot is not None:
+            sites = self.snapshot.statistics("lineno")[:TOP_ALLOCATIONS]
+            report["memory"] = {
+                "peak_bytes": self.peak_memory,
+                "top": [{"site": f"{relative_path(s.traceback[0].filename)}:{s.traceback[0].lineno}",
+                         "bytes": s.size, "count": s.count} for s in sites],
+            }
+        return report
+
+    def save(self, report):
+        with open(self.out, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        self.stats().dump_stats(f"{self.out}.pstats")
+        if self.snapshot is not None:
+            self.snapshot.dump(f"{self.out}.tracemalloc")
+
+def run_profiled(func, out=None, memory=False):
+    """Call func under a RunProfiler, then print (and with out, save) the report."""
+    profiler = RunProfiler(out, memory)
+    profiler.start()
+    try:
+        return func()
+    finally:
+        profiler.stop()
+        report = profiler.report()
+        print_report(report)
+        if out:
+            profiler.save(report)
+            print(f"Profile written to {out} (raw cProfile data in {out}.pstats)")
+
+def print_report(report, limit=20):
+    wall = report["wall_seconds"]
+    print(f"\nProfile: {report['command']}")
+    print(f"  Wall time:          {wall:>9.3f}s")
+    print(f"  Blocked on git:     {report['git_wait_seconds']:>9.3f}s over {report['git_calls']} calls "
+          f"(summed across threads and tasks)")
+    print(f"  Waiting for lock:   {report['lock_wait_seconds']:>9.3f}s")
+    if report.get("throttle_seconds"):
+        print(f"  Rate limited:       {report['throttle_seconds']:>9.3f}s")
+    print(f"  Python CPU:         {report['python_cpu_seconds']:>9.3f}s")
+    print(f"  git CPU (children): {report['git_cpu_seconds']:>9.3f}s")
+    if report["git_phases"]:
+        print(f"\n  {'git phase':<28} {'Calls':>7} {'Seconds':>9}")
+        for phase, p in sorted(report["git_phases"].items(), key=lambda item: -item[1]["seconds"]):
+            print(f"  {phase:<28} {p['calls']:>7} {p['seconds']:>9.3f}")
+    print(f"\n  {'Function':<58} {'Calls':>8} {'Own s':>8} {'Cum s':>8}")
+    for f in report["functions"][:limit]:
+        print(f"  {f['function'][:58]:<58} {f['calls']:>8} {f['own_seconds']:>8.3f} {f['cumulative_seconds']:>8.3f}")
+    memory = report.get("memory")
+    if memory:
+        print(f"\n  Peak traced memory: {memory['peak_bytes'] / 1024:.1f} KiB")
+        for site in memory["top"][:10]:
+            print(f"  {site['site'][:58]:<58} {site['bytes'] / 1024:>8.1f} KiB {site['count']:>7}")
+
+def compare(report, baseline, limit=15):
+    """Print how a report differs from a baseline report."""
+    print(f"\nCompared with: {baseline['command']} ({baseline['started']})")
+    for key, label in (("wall_seconds", "Wall time"), ("git_wait_seconds", "Blocked on git"),
+                       ("lock_wait_seconds", "Waiting for lock"), ("python_cpu_seconds", "Python CPU"),
+                       ("git_cpu_seconds", "git CPU")):
+        old, new = baseline[key], report[key]
+        change = f"{(new - old) / old * 100:+.0f}%" if old else "n/a"
+        print(f"  {label:<18} {old:>9.3f}s -> {new:>9.3f}s  {change}")
+    print(f"  {'git calls':<18} {baseline['git_calls']:>10} -> {report['git_calls']:>10}")
+
+    old_functions = {f["function"]: f for f in baseline["functions"]}
+    new_functions = {f["function"]: f for f in report["functions"]}
+    changes = []
+    for name in set(old_functions) | set(new_functions):
+        old = old_functions.get(name, {}).get("cumulative_seconds", 0.0)
+        new = new_functions.get(name, {}).get("cumulative_seconds", 0.0)
+        changes.append((new - old, name, old, new))
+    changes.sort(key=lambda c: -abs(c[0]))
+    print(f"\n  {'Function (cumulative)':<58} {'Before':>8} {'After':>8} {'Change':>8}")
+    for delta, name, old, new in changes[:limit]:
+        print(f"  {name[:58]:<58} {old:>8.3f} {new:>8.3f} {delta:>+8.3f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Show a --profile-out report, optionally against a baseline")
+    parser.add_argument("report", help="JSON report written by --profile-out")
+    parser.add_argument("--compare", type=str, help="Baseline report to compare against")
+    parser.add_argument("--limit", type=int, default=20, help="Function rows to show")
+    args = parser.parse_args()
+
+    with open(args.report, 'r') as f:
+        report = json.load(f)
+    print_report(report, args.limit)
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            compare(report, json.load(f), args.limit)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Push Pipeline
+Pushes in the background while commits accumulate. Pending commits are
+coalesced into at most one push per interval, pushes that fail on a network
+error are retried with exponential backoff, and the pipeline's state is
+saved so the next run knows whether the previous one left commits unpushed.
+Failures that another attempt cannot fix (a rejected or non-fast-forward
+push, no upstream, bad credentials) fail at once.
+
+Works against any git remote, including a local bare repository given as a
+path or file:// URL, which makes the whole stage testable offline.
+"""
+
+import json
+import os
+import threading
+import time
+
+from git_backend import GitSession
+
+# Number of push records kept in the state file
+HISTORY_LIMIT = 50
+
+# stderr of a push that would fail the same way however often it is retried
+PERMANENT_ERRORS = (
+    "rejected",
+    "non-fast-forward",
+    "no upstream",
+    "no configured push destination",
+    "authentication failed",
+    "permission denied",
+    "could not read username",
+    "requested url returned error: 4",
+    "repository not found",
+    "does not appear to be a git repository",
+    "src refspec",
+)
+
+# stderr of a push that lost the network or raced another writer and may succeed later
+TRANSIENT_ERRORS = (
+    "could not resolve host",
+    "could not resolve hostname",
+    "temporary failure in name resolution",
+    "connection timed out",
+    "operation timed out",
+    "connection refused",
+    "connection reset",
+    "connection closed",
+    "network is unreachable",
+    "remote end hung up unexpectedly",
+    "early eof",
+    "rpc failed",
+    "requested url returned error: 5",
+    "cannot lock ref",
+)
+
+def is_transient(stderr):
+    """Whether a failed push is worth retrying; unrecognised failures are not."""
+    text = stderr.lower()
+    if any(marker in text for marker in PERMANENT_ERRORS):
+        return False
+    return any(marker in text for marker in TRANSIENT_ERRORS)
+
+def error_summary(stderr):
+    """The most telling line of git's error output, for logs and the state file."""
+    lines = [line.strip() for line in stderr.splitlines() if line.strip()]
+    for line in lines:
+        if line.startswith(("fatal:", "error:", "!")):
+            return line
+    return lines[-1] if lines else "unknown error"
+
+class PushPipeline:
+    def __init__(self, repo_path, interval=300, max_attempts=5, backoff=2.0, remote=None,
+                 state_path=None, metrics=None, governor=None, history=None, retry_delay=1.0):
+        # A private session: helper pipes are not shared with the committing thread
+        self.git = GitSession(repo_path, metrics=metrics)
+        self.metrics = self.git.metrics
+        self.interval = interval
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        # Seconds before the first retry; each later one waits backoff times longer
+        self.retry_delay = retry_delay
+        self.remote = remote
+        # Optional governor.Governor capping pushes per minute; every attempt takes a token
+        self.governor = governor
+        # Optional history.RunHistory; each push (all its attempts) adds one row
+        self.history = history
+        self.state_path = state_path or self.git.state_path("push_state.json")
+        self.state = self.load_state()
+        self._pending = threading.Event()
+        self._stop = threading.Event()
+        self._push_lock = threading.Lock()
+        self._thread = None
+
+        # Resume: anything committed after the last successful push is pending
+        head = self.git.rev_parse("HEAD")
+        if head and head != self.state.get("pushed_head"):
+            self._pending.set()
+
+    def load_state(self):
+        try:
+            with open(self.state_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"pushed_head": None, "last_error": None, "history": []}
+
+    def save_state(self):
+        tmp = f"{self.state_path}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp, self.state_path)
+
+    @property
+    def pending(self):
+        return self._pending.is_set()
+
+    def notify(self):
+        """Record that a new commit is waiting to be pushed."""
+        self._pending.set()
+
+    def start(self):
+        """Start the background push thread."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if self.pending:
+                self.push()
+
+    def push_args(self):
+        if self.remote:
+            return ["push", self.remote, "HEAD"]
+        return ["push"]
+
+    def push(self):
+        """Push everything pending, retrying network errors with backoff; returns True on success."""
+        with self._push_lock:
+            if not self.pending:
+                return True
+            if not self.remote and not self.git.run("remote"):
+                # Nothing to retry against; leave the commits pending for a later run
+                self.state["last_error"] = "no remote configured"
+                self.save_state()
+                return False
+            # Cleared before pushing so commits made meanwhile trigger another push
+            self._pending.clear()
+            head = self.git.rev_parse("HEAD")
+            delay = self.retry_delay
+            started = time.time()
+            seconds = None
+            for attempt in range(1, self.max_attempts + 1):
+                if self.governor is not None and not self.governor.acquire(
+                        "push", cancel_event=self._stop, metrics=self.metrics):
+                    break
+                attempt_started = time.perf_counter()
+                code, _, stderr = self.git.call(*self.push_args())
+                ok = code == 0
+                seconds = time.perf_counter() - attempt_started
+                self.metrics.record("push", seconds, exit_code=0 if ok else 1, attempt=attempt)
+                reason = self.note_attempt(started, attempt, ok, seconds, head, stderr)
+                if ok:
+                    self.record_history(started, seconds, True, head, attempt)
+                    return True
+                if not is_transient(stderr):
+                    print(f"Push failed: {stderr.strip()}")
+                    break
+                if attempt == self.max_attempts:
+                    print(f"Push failed after {attempt} attempts: {reason}")
+                    break
+                print(f"Push failed ({reason}); retrying in {delay:g}s")
+                if self._stop.wait(delay):
+                    break
+                delay *= self.backoff
+            if seconds is not None:
+                self.record_history(started, seconds, False, head, attempt)
+            self._pending.set()
+            return False
+
+    def note_attempt(self, started, attempt, ok, seconds, head, stderr=""):
+        """Save one push attempt to the state file; returns a failure's error summary.
+
+        Also called for pushes made outside push(), such as the asyncio path's,
+        so the next run sees the same state whichever path pushed.
+        """
+        record = {"time": started, "attempt": attempt, "ok": ok, "seconds": round(seconds, 3)}
+        self.state["history"] = (self.state["history"] + [record])[-HISTORY_LIMIT:]
+        reason = None
+        if ok:
+            self.state["pushed_head"] = head
+            self.state["last_error"] = None
+        else:
+            reason = error_summary(stderr)
+            self.state["last_error"] = f"push failed (attempt {attempt}/{self.max_attempts}): {reason}"
+        self.save_state()
+        return reason
+
+    def record_history(self, started, seconds, ok, head, attempts):
+        """Add a push to the run history: its last attempt's duration and how many it took."""
+        if self.history is not None:
+            detail = self.state["last_error"] if not ok else f"{attempts} attempts" if attempts > 1 else None
+            self.history.record(self.git.repo_path, "push", started, seconds, ok, sha=head, detail=detail)
+
+    def flush(self):
+        """Push any pending commits now, from the calling thread."""
+        return self.push()
+
+    def stop(self):
+        """Stop the background thread; pending commits stay recorded in the state."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.git.close()
+
+    def last_push_seconds(self):
+        """Duration of the most recent successful push, or None."""
+        for record in reversed(self.state["history"]):
+            if record["ok"]:
+                return record["seconds"]
+        return None
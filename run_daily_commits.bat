@@ -5,13 +5,10 @@ REM This script runs the automated commit generator
 cd /d "%~dp0"
 
 echo Starting daily commit generation at %date% %time%
-python auto_commit.py
+python auto_commit.py --log-file daily_commit_log.txt
 
 if %ERRORLEVEL% EQU 0 (
     echo Daily commits completed successfully at %date% %time%
 ) else (
     echo Daily commits failed at %date% %time%
 )
-
-REM Log the execution
-echo %date% %time% - Daily commit execution completed >> daily_commit_log.txt
\ No newline at end of file
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Run Log
+Bounded on-disk history of what the tools printed. With --log-file, output
+is copied line by line into a log that rolls over at a size limit and at
+midnight, with old segments gzip-compressed and only a fixed number kept,
+so a host that has run the cron job for years uses a bounded amount of disk.
+
+The stats command streams the current log and its compressed segments one
+line at a time to summarise commits and pushes per day, so memory stays
+proportional to the number of days reported, not the size of the history.
+
+Usage:
+    python auto_commit.py --log-file daily_commit_log.txt
+    python run_log.py daily_commit_log.txt --days 14
+"""
+
+import argparse
+import datetime
+import gzip
+import logging
+import logging.handlers
+import os
+import shutil
+import sys
+import threading
+from pathlib import Path
+
+DEFAULT_MAX_BYTES = 1024 * 1024
+DEFAULT_BACKUPS = 30
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+class RotatingLogHandler(logging.handlers.RotatingFileHandler):
+    """Rolls over when the file reaches max_bytes or the day changes; gzips old segments."""
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES, backups=DEFAULT_BACKUPS):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        super().__init__(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8", delay=True)
+        self.namer = lambda name: name + ".gz"
+        self.rotator = self._compress
+        self._day = self._file_day()
+
+    def _file_day(self):
+        try:
+            return datetime.date.fromtimestamp(os.stat(self.baseFilename).st_mtime)
+        except FileNotFoundError:
+            return datetime.date.today()
+
+    @staticmethod
+    def _compress(source, dest):
+        with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+            shutil.copyfileobj(f_in, f_out)
+        os.remove(source)
+
+    def shouldRollover(self, record):
+        today = datetime.date.fromtimestamp(record.created)
+        if today != self._day and os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename):
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        self._day = datetime.date.today()
+
+class _LogTee:
+    """File-like object that writes through to a stream and logs complete lines."""
+
+    def __init__(self, stream, logger):
+        self.stream = stream
+        self.logger = logger
+        self._buffer = ""
+        self._lock = threading.Lock()
+
+    def write(self, text):
+        self.stream.write(text)
+        with self._lock:
+            self._buffer += text
+            *lines, self._buffer = self._buffer.split("\n")
+        for line in lines:
+            if line.strip():
+                self.logger.info(line)
+        return len(text)
+
+    def flush(self):
+        self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+def attach(path, max_bytes=DEFAULT_MAX_BYTES, backups=DEFAULT_BACKUPS):
+    """Copy everything printed to stdout and stderr into a rotating log at path."""
+    logger = logging.getLogger("commitment_issues.run")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    handler = RotatingLogHandler(path, max_bytes, backups)
+    handler.setFormatter(logging.Formatter("%(asctime)s %(message)s", TIMESTAMP_FORMAT))
+    logger.addHandler(handler)
+    sys.stdout = _LogTee(sys.stdout, logger)
+    sys.stderr = _LogTee(sys.stderr, logger)
+    return handler
+
+def log_segments(path):
+    """The log and its rotated segments, oldest first."""
+    path = Path(path)
+    backups = []
+    for candidate in path.parent.glob(path.name + ".*.gz"):
+        index = candidate.name[len(path.name) + 1:-len(".gz")]
+        if index.isdigit():
+            backups.append((int(index), candidate))
+    segments = [p for _, p in sorted(backups, reverse=True)]
+    if path.exists():
+        segments.append(path)
+    return segments
+
+def iter_lines(path):
+    """Stream lines from the log and every rotated segment, oldest first."""
+    for segment in log_segments(path):
+        opener = gzip.open if segment.suffix == ".gz" else open
+        with opener(segment, 'rt', encoding="utf-8", errors="replace") as f:
+            yield from f
+
+def daily_stats(lines):
+    """Count commits, failed commits and pushes per day from log lines."""
+    days = {}
+    for line in lines:
+        day = line[:10]
+        if len(line) < 20 or line[4] != "-" or line[7] != "-":
+            continue
+        message = line[20:]
+        if "Committed: " in message:
+            key = "commits"
+        elif "Failed to commit" in message:
+            key = "failed"
+        elif "Successfully pushed" in message:
+            key = "pushes"
+        elif "Failed to push" in message:
+            key = "push_failures"
+        else:
+            continue
+        counts = days.setdefault(day, {"commits": 0, "failed": 0, "pushes": 0, "push_failures": 0})
+        counts[key] += 1
+    return days
+
+def print_stats(days, limit=None):
+    if not days:
+        print("No commits found in the log.")
+        return
+    rows = sorted(days.items())
+    if limit:
+        rows = rows[-limit:]
+    print(f"{'Date':<12} {'Commits':>8} {'Failed':>7} {'Pushes':>7} {'Push fail':>10}")
+    for day, c in rows:
+        print(f"{day:<12} {c['commits']:>8} {c['failed']:>7} {c['pushes']:>7} {c['push_failures']:>10}")
+    total = sum(c["commits"] for _, c in rows)
+    print(f"Total: {total} commits over {len(rows)} days ({total / len(rows):.1f}/day)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarise commits per day from a run log and its rotated segments")
+    parser.add_argument("log_file", nargs="?", default="daily_commit_log.txt", help="Log written with --log-file")
+    parser.add_argument("--days", type=int, help="Only show the most recent N days")
+    args = parser.parse_args()
+
+    if not log_segments(args.log_file):
+        print(f"No log found at {args.log_file}")
+        sys.exit(1)
+    print_stats(daily_stats(iter_lines(args.log_file)), args.days)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Commit Scheduler
+Event-driven replacement for the sleep loop in run_daily_commits. Each day's
+commit times are planned up front, persisted next to the repository's git
+metadata, and fired by an asyncio loop at the planned wall-clock times, so a
+crashed or restarted run can pick up the same plan where it left off. Which
+planned commits already happened comes from the commit journal (journal.py).
+
+Time, persistence, logging and blocking calls go through small overridable
+hooks so simulation.py can run the same logic on a virtual clock.
+"""
+
+import asyncio
+import datetime
+import json
+import os
+import time
+
+import planner
+
+# Long sleeps are split up so wall-clock jumps (suspend, NTP) and
+# cancellation requests are noticed promptly
+MAX_SLEEP_SECONDS = 1
+
+# Days planned in one batch when the schedule runs out or goes stale
+SCHEDULE_DAYS = 7
+
+class SystemClock:
+    """Wall-clock time source."""
+
+    max_sleep = MAX_SLEEP_SECONDS
+
+    def time(self):
+        return time.time()
+
+    def now(self):
+        return datetime.datetime.now()
+
+    def today(self):
+        return datetime.date.today()
+
+    async def sleep(self, seconds):
+        await asyncio.sleep(seconds)
+
+class CommitScheduler:
+    def __init__(self, generator, plan_path=None, schedule_path=None, clock=None, test=False):
+        self.generator = generator
+        self.clock = clock or SystemClock()
+        # A test run plans a throwaway day starting now and never touches the saved plans
+        self.test = test
+        self.plan_path = plan_path or generator.git.state_path("plan.json")
+        # A schedule given explicitly (planner.py --out) is used as-is, never replaced
+        self.fixed_schedule = schedule_path is not None
+        self.schedule_path = schedule_path or generator.git.state_path("schedule.json")
+
+    def scheduled_minutes(self, day):
+        """Return the day's commit minutes from the multi-day schedule, planning more if needed."""
+        config = self.generator.config
+        if self.test:
+            return self.make_planner().plan(day, 1)["minutes"]
+        schedule = self.load_schedule()
+        if self.fixed_schedule:
+            if schedule is not None and planner.day_minutes(schedule, day) is not None:
+                if not planner.matches_config(schedule, config):
+                    self.log(f"Warning: {self.schedule_path} was planned with different settings")
+                return planner.day_minutes(schedule, day)
+            self.log(f"Warning: {self.schedule_path} does not cover {day.isoformat()}; planning afresh")
+            return self.make_planner().plan(day, 1)["minutes"]
+
+        if (schedule is None or not planner.matches_config(schedule, config)
+                or planner.day_minutes(schedule, day) is None):
+            schedule = self.make_planner().plan(day, SCHEDULE_DAYS)
+            self.save_schedule(schedule)
+        return planner.day_minutes(schedule, day)
+
+    def make_planner(self):
+        return planner.CommitPlanner(self.generator.config)
+
+    def load_schedule(self):
+        return planner.load_plan(self.schedule_path)
+
+    def save_schedule(self, schedule):
+        planner.save_plan(self.schedule_path, schedule)
+
+    def log(self, message):
+        print(message)
+
+    async def run_blocking(self, func, *args):
+        """Run a blocking generator call without stalling the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, func, *args)
+
+    def plan_day(self, day):
+        """Plan the fire times for a day from its scheduled minutes."""
+        config = self.generator.config
+        minutes = self.scheduled_minutes(day)
+        if self.test and minutes:
+            # Keep the planned gaps but start at once, whatever the time of day
+            start = self.clock.time()
+            fire_at = [start + (m - minutes[0]) * 60 for m in minutes]
+            return {"id": os.urandom(8).hex(), "date": day.isoformat(), "fire_at": fire_at}
+
+        midnight = datetime.datetime.combine(day, datetime.time())
+        shift = 0
+        if not config["enable_random_timing"] and minutes:
+            # Evenly spaced runs start now if the work day has already begun
+            now = self.clock.now().replace(second=0, microsecond=0)
+            shift = max(0, (now - midnight).total_seconds() // 60 - minutes[0])
+
+        fire_at = [(midnight + datetime.timedelta(minutes=m + shift)).timestamp() for m in minutes]
+        # The id ties journal records to this plan, not an earlier one for the same day
+        return {"id": os.urandom(8).hex(), "date": day.isoformat(), "fire_at": fire_at}
+
+    def load_plan(self, day):
+        """Return the persisted plan for a day, or None if there is none."""
+        try:
+            with open(self.plan_path, 'r') as f:
+                plan = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if plan.get("date") != day.isoformat() or "id" not in plan:
+            return None
+        return plan
+
+    def save_plan(self, plan):
+        """Persist the plan atomically so a crash never leaves half a file."""
+        tmp = f"{self.plan_path}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(plan, f)
+        os.replace(tmp, self.plan_path)
+
+    def prepare_day(self, day, resume=False):
+        """Load today's plan when resuming, otherwise plan afresh.
+
+        A test run's plan is not saved, so it never replaces the day's real
+        plan that --resume continues.
+        """
+        plan = self.load_plan(day) if resume and not self.test else None
+        if plan is None:
+            plan = self.plan_day(day)
+            if not self.test:
+                self.save_plan(plan)
+        return plan
+
+    @property
+    def cancelled(self):
+        return self.generator.cancel_event.is_set()
+
+    async def sleep_until(self, timestamp):
+        """Sleep until a wall-clock time; returns False if cancelled first."""
+        while not self.cancelled:
+            remaining = timestamp - self.clock.time()
+            if remaining <= 0:
+                return True
+            await self.clock.sleep(min(remaining, self.clock.max_sleep))
+        return False
+
+    async def run_plan(self, plan, done):
+        """Fire every planned commit not already journaled; returns commits made."""
+        successful_commits = 0
+        for index, fire_at in enumerate(plan["fire_at"]):
+            if index in done:
+                continue
+            if fire_at > self.clock.time():
+                when = datetime.datetime.fromtimestamp(fire_at).strftime('%H:%M:%S')
+                self.log(f"Next commit at {when}")
+            if not await self.sleep_until(fire_at):
+                self.log("Cancelled.")
+                break
+
+            if await self.run_blocking(self.generator.make_commit, None, plan, index):
+                successful_commits += 1
+        return successful_commits
+
+    async def run_day(self, day, resume=False):
+        """Plan (or resume) a day, fire its commits, then summarise and push."""
+        plan = self.prepare_day(day, resume)
+        total = len(plan["fire_at"])
+        # Journal replay is the source of truth for what already happened
+        done = self.generator.journal.replay(day, plan["id"]) if resume and not self.test else {}
+        if done:
+            self.log(f"Resuming plan for {plan['date']}: {len(done)}/{total} commits already done")
+        self.generator.start_day(total)
+        successful_commits = len(done) + await self.run_plan(plan, done)
+        return await self.run_blocking(self.generator.finish_day, successful_commits, total)
+
+    async def run_forever(self):
+        """Serve one day after another from a single process."""
+        while not self.cancelled:
+            today = self.clock.today()
+            await self.run_blocking(self.generator.refresh_config)
+            await self.run_day(today, resume=True)
+            tomorrow = datetime.datetime.combine(today + datetime.timedelta(days=1), datetime.time())
+            self.log(f"Waiting for next day ({tomorrow.strftime('%Y-%m-%d')})...")
+            await self.sleep_until(tomorrow.timestamp())
@@ -9,7 +9,8 @@ echo "Setting up cron job for daily GitHub commits..."
 echo "Script location: $PYTHON_SCRIPT"
 
 # Create cron job entry
-CRON_ENTRY="0 6 * * * cd $SCRIPT_DIR && /usr/bin/python3 auto_commit.py >> daily_commit_log.txt 2>&1"
+# Output goes to a log that rotates daily and at 1 MB, keeping 30 gzipped segments
+CRON_ENTRY="0 6 * * * cd $SCRIPT_DIR && /usr/bin/python3 auto_commit.py --log-file daily_commit_log.txt > /dev/null 2>&1"
 
 # Check if cron job already exists
 if crontab -l 2>/dev/null | grep -q "auto_commit.py"; then
@@ -33,6 +34,9 @@ if [ $? -eq 0 ]; then
     echo ""
     echo "To view logs:"
     echo "tail -f $SCRIPT_DIR/daily_commit_log.txt"
+    echo ""
+    echo "To see commits per day (including rotated logs):"
+    echo "python3 $SCRIPT_DIR/run_log.py $SCRIPT_DIR/daily_commit_log.txt"
 else
     echo "❌ Failed to create cron job"
 fi
\ No newline at end of file
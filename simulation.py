@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Dry-Run Simulation
+Runs the real daily scheduling logic (planner, scheduler, journal) against a
+virtual clock and an in-memory repository, so a day, a month or a year of
+run_daily_commits completes in milliseconds without touching git or
+sleeping. Every action the real run would take (day start, each commit,
+each background and end-of-day push) is recorded with its virtual time.
+
+The same seed and settings always produce the same actions. Background
+pushes are modelled like PushPipeline: a wake-up every push interval that
+pushes only if commits are pending.
+
+Usage:
+    python simulation.py --days 30
+    python simulation.py --days 365 --repos 50 --seed 7
+    python simulation.py --days 1 --actions
+"""
+
+import argparse
+import asyncio
+import copy
+import datetime
+import hashlib
+import json
+import random
+import time
+from collections import Counter
+from pathlib import Path
+
+from auto_commit import ACTIVITIES, AutoCommitGenerator
+from catalogue import MessageCatalogue
+from config_loader import DEFAULT_CONFIG, load_config
+from git_backend import GitSession
+from metrics import Metrics
+from planner import CommitPlanner
+from scheduler import CommitScheduler
+
+class VirtualClock:
+    """Clock whose sleeps return immediately after moving time forward."""
+
+    max_sleep = float("inf")
+
+    def __init__(self, start):
+        self._now = start
+
+    def time(self):
+        return self._now
+
+    def now(self):
+        return datetime.datetime.fromtimestamp(self._now)
+
+    def today(self):
+        return self.now().date()
+
+    async def sleep(self, seconds):
+        self._now += seconds
+
+class MemoryRepository:
+    """Stand-in for a git repository: a linear chain of commit ids."""
+
+    def __init__(self):
+        self.commits = []
+        self.log_bytes = 0
+        self.pushed = 0
+
+    @property
+    def head(self):
+        return self.commits[-1]["sha"] if self.commits else None
+
+    def commit(self, message, added_bytes, when):
+        sha = hashlib.sha1(f"{self.head}\n{when}\n{message}".encode()).hexdigest()
+        self.commits.append({"sha": sha, "time": when, "message": message})
+        self.log_bytes += added_bytes
+        return sha
+
+    def push(self):
+        """Mark everything as pushed; returns the number of commits sent."""
+        sent = len(self.commits) - self.pushed
+        self.pushed = len(self.commits)
+        return sent
+
+class MemoryJournal:
+    """In-memory CommitJournal with the same record/replay interface."""
+
+    def __init__(self):
+        self.entries = []
+
+    def record(self, day, plan_id, index, sha, message=None):
+        entry = {"day": day.isoformat(), "plan": plan_id, "index": index, "sha": sha, "message": message}
+        self.entries.append(entry)
+        return entry
+
+    def replay(self, day, plan_id):
+        return {e["index"]: e for e in self.entries if e["day"] == day.isoformat() and e["plan"] == plan_id}
+
+    def close(self):
+        pass
+
+class SimulatedScheduler(CommitScheduler):
+    """CommitScheduler with in-memory state, seeded plans and no output."""
+
+    def __init__(self, generator, clock, seed):
+        super().__init__(generator, plan_path="<memory>", schedule_path="<memory>", clock=clock)
+        self.rng = random.Random(seed)
+        self.fixed_schedule = False
+        self._plan = None
+        self._schedule = None
+
+    def make_planner(self):
+        return CommitPlanner(self.generator.config, seed=self.rng.randrange(2 ** 32))
+
+    def load_schedule(self):
+        return self._schedule
+
+    def save_schedule(self, schedule):
+        self._schedule = schedule
+
+    def load_plan(self, day):
+        if self._plan is None or self._plan["date"] != day.isoformat():
+            return None
+        return self._plan
+
+    def save_plan(self, plan):
+        self._plan = plan
+
+    def log(self, message):
+        pass
+
+    async def run_blocking(self, func, *args):
+        return func(*args)
+
+class SimulatedGenerator(AutoCommitGenerator):
+    """AutoCommitGenerator that records actions instead of committing."""
+
+    def __init__(self, config=None, seed=0, start=None, config_file="commit_config.json"):
+        self.config = copy.deepcopy(config or DEFAULT_CONFIG)
+        self.repo_path = Path(f"simulated-{seed}")
+        # Paths in the config (message_catalogue) resolve against its own directory
+        self.config_file = Path(config_file).resolve()
+        self.metrics = Metrics()
+        # Never run: every method that would reach git is overridden below
+        self.git = GitSession(self.repo_path, metrics=self.metrics)
+        self.init_state()
+        self.activities = MessageCatalogue(ACTIVITIES)
+        self.rng = random.Random(seed)
+        start = start or datetime.date.today()
+        self.clock = VirtualClock(datetime.datetime.combine(start, datetime.time()).timestamp())
+        self.start = start
+        self.repo = MemoryRepository()
+        self.actions = []
+        self._journal = MemoryJournal()
+        self.scheduler = SimulatedScheduler(self, self.clock, self.rng.randrange(2 ** 32))
+        self._push_interval = self.config["push_interval_minutes"] * 60
+        self._next_push_check = self.clock.time() + self._push_interval
+
+    def record(self, action, **fields):
+        entry = {"time": self.clock.now().isoformat(timespec="seconds"), "action": action, **fields}
+        self.actions.append(entry)
+        return entry
+
+    def ensure_git_repo(self):
+        return True
+
+    def refresh_config(self):
+        return False
+
+    def _background_pushes(self, until):
+        """Replay push pipeline wake-ups up to a virtual time."""
+        while self._next_push_check <= until:
+            if self.repo.pushed < len(self.repo.commits):
+                wake = self._next_push_check
+                sent = self.repo.push()
+                stamp = datetime.datetime.fromtimestamp(wake).isoformat(timespec="seconds")
+                self.actions.append({"time": stamp, "action": "push", "commits": sent, "background": True})
+                self._next_push_check += self._push_interval
+            else:
+                # Nothing pending: skip straight to the first wake-up after until
+                missed = int((until - self._next_push_check) // self._push_interval) + 1
+                self._next_push_check += missed * self._push_interval
+
+    def make_commit(self, message=None, plan=None, index=None):
+        now = self.clock.time()
+        self._background_pushes(now)
+        if not message:
+            message = self.messages.sample(self.rng)
+        line = f"[{self.clock.now().strftime('%Y-%m-%d %H:%M:%S')}] {self.activities.sample(self.rng)}\n"
+        sha = self.repo.commit(message, len(line.encode()), now)
+        if plan is not None:
+            self.journal.record(datetime.date.fromisoformat(plan["date"]), plan["id"], index, sha, message)
+        self.record("commit", sha=sha[:12], message=message, index=index)
+        self.report_progress(type="commit", ok=True, message=message)
+        return True
+
+    def start_day(self, num_commits):
+        self.record("start_day", planned=num_commits)
+        self.report_progress(type="start", total=num_commits)
+
+    def push_to_remote(self):
+        sent = self.repo.push()
+        self.record("push", commits=sent, background=False)
+        self.report_progress(type="push", ok=True)
+        return True
+
+    def finish_day(self, successful_commits, num_commits):
+        self._background_pushes(self.clock.time())
+        self.record("finish_day", committed=successful_commits, planned=num_commits)
+        return self.push_to_remote() if self.repo.pushed < len(self.repo.commits) else False
+
+    async def _run(self, days):
+        for offset in range(days):
+            if self.scheduler.cancelled:
+                break
+            day = self.start + datetime.timedelta(days=offset)
+            await self.scheduler.run_day(day)
+            midnight = datetime.datetime.combine(day + datetime.timedelta(days=1), datetime.time())
+            await self.scheduler.sleep_until(midnight.timestamp())
+
+    def simulate(self, days=1):
+        """Run days of the daily flow; returns the recorded actions."""
+        asyncio.run(self._run(days))
+        return self.actions
+
+    def run_daily_commits(self, resume=False, forever=False, schedule=None):
+        self.simulate(1)
+        return True
+
+    def close(self):
+        pass
+
+def summarise(generators, elapsed):
+    """Aggregate statistics over one or more simulated repositories."""
+    commits = [a for g in generators for a in g.actions if a["action"] == "commit"]
+    pushes = [a for g in generators for a in g.actions if a["action"] == "push"]
+    per_day = [a["committed"] for g in generators for a in g.actions if a["action"] == "finish_day"]
+    per_hour = Counter(a["time"][:13] for a in commits)
+    per_minute = Counter(a["time"][:16] for a in commits + pushes)
+    return {
+        "repos": len(generators),
+        "days": len(per_day) // max(len(generators), 1),
+        "commits": len(commits),
+        "pushes": len(pushes),
+        "commits_per_day_min": min(per_day, default=0),
+        "commits_per_day_mean": sum(per_day) / len(per_day) if per_day else 0.0,
+        "commits_per_day_max": max(per_day, default=0),
+        "peak_commits_per_hour": max(per_hour.values(), default=0),
+        "peak_git_ops_per_minute": max(per_minute.values(), default=0),
+        "log_bytes": sum(g.repo.log_bytes for g in generators),
+        "elapsed_seconds": elapsed,
+    }
+
+def print_summary(summary):
+    print(f"Simulated {summary['days']} days across {summary['repos']} repositories "
+          f"in {summary['elapsed_seconds'] * 1000:.0f} ms")
+    print(f"  Commits: {summary['commits']} ({summary['commits_per_day_min']}-"
+          f"{summary['commits_per_day_max']} per repo-day, mean {summary['commits_per_day_mean']:.1f})")
+    print(f"  Pushes: {summary['pushes']}")
+    print(f"  Peak load: {summary['peak_commits_per_hour']} commits/hour, "
+          f"{summary['peak_git_ops_per_minute']} commits+pushes/minute")
+    print(f"  Activity log growth: {summary['log_bytes'] / 1024:.1f} KiB")
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate the daily commit flow without git or sleeping")
+    parser.add_argument("--days", type=int, default=1, help="Number of days to simulate")
+    parser.add_argument("--start", type=str, help="First day as YYYY-MM-DD (default: today)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed; repository n uses seed + n")
+    parser.add_argument("--repos", type=int, default=1, help="Number of repositories to simulate")
+    parser.add_argument("--config", type=str, default="commit_config.json", help="Configuration file")
+    parser.add_argument("--actions", action="store_true", help="Print every simulated action")
+    parser.add_argument("--json", type=str, help="Write the summary and actions to this file")
+    args = parser.parse_args()
+
+    start = datetime.date.fromisoformat(args.start) if args.start else datetime.date.today()
+    config = load_config(args.config)
+    started = time.perf_counter()
+    generators = []
+    for n in range(args.repos):
+        generator = SimulatedGenerator(config, seed=args.seed + n, start=start, config_file=args.config)
+        generator.simulate(args.days)
+        generators.append(generator)
+    summary = summarise(generators, time.perf_counter() - started)
+
+    if args.actions:
+        for n, generator in enumerate(generators):
+            for action in generator.actions:
+                details = " ".join(f"{k}={v}" for k, v in action.items() if k not in ("time", "action"))
+                prefix = f"repo{n} " if args.repos > 1 else ""
+                print(f"{prefix}{action['time']} {action['action']:<10} {details}")
+    print_summary(summary)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({"summary": summary, "actions": [g.actions for g in generators]}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import subprocess
+
+import pytest
+
+def git(repo, *args, input=None):
+    """Run git in repo and return its stripped stdout."""
+    result = subprocess.run(["git", *args], cwd=repo, input=input, capture_output=True, check=True)
+    return result.stdout.decode().strip()
+
+@pytest.fixture(autouse=True)
+def isolated_state(tmp_path, monkeypatch):
+    """Keep run history and git config out of the user's home directory."""
+    home = tmp_path / "home"
+    home.mkdir()
+    monkeypatch.setenv("HOME", str(home))
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(home / ".config"))
+    monkeypatch.setenv("GIT_CONFIG_NOSYSTEM", "1")
+    monkeypatch.setenv("COMMITMENT_ISSUES_HISTORY", str(tmp_path / "history.sqlite3"))
+    for name in ("GIT_AUTHOR_NAME", "GIT_AUTHOR_EMAIL", "GIT_COMMITTER_NAME", "GIT_COMMITTER_EMAIL",
+                 "EMAIL", "GIT_DIR", "GIT_INDEX_FILE", "GIT_OBJECT_DIRECTORY"):
+        monkeypatch.delenv(name, raising=False)
+
+@pytest.fixture
+def repo(tmp_path):
+    """An empty repository on branch main with a committer identity."""
+    path = tmp_path / "repo"
+    path.mkdir()
+    git(path, "init", "-q", "-b", "main")
+    git(path, "config", "user.name", "Test User")
+    git(path, "config", "user.email", "test@example.com")
+    return path
+
+@pytest.fixture
+def remote(tmp_path, repo):
+    """A bare repository set up as repo's origin, with main tracking it."""
+    path = tmp_path / "remote.git"
+    git(tmp_path, "init", "-q", "--bare", "-b", "main", str(path))
+    git(repo, "remote", "add", "origin", str(path))
+    git(repo, "config", "branch.main.remote", "origin")
+    git(repo, "config", "branch.main.merge", "refs/heads/main")
+    return path
@@ -0,0 +1,91 @@
+import datetime
+
+from activity_writer import ActivityLogWriter, BareActivityLog
+from conftest import git
+from git_backend import GitSession
+
+BASE = "# Activity Log\n\n"
+ACTIVITIES = ["Reviewed the code"]
+
+def writer(repo, max_bytes=0):
+    return ActivityLogWriter(repo, "activity_log.txt", BASE, ACTIVITIES, max_bytes=max_bytes)
+
+def test_log_rotates_into_monthly_segments_at_max_bytes(repo):
+    month = datetime.date.today().strftime("%Y-%m")
+    log = writer(repo, max_bytes=200)
+    try:
+        paths = []
+        for _ in range(12):
+            log.append_entry()
+            paths.append(log.relative_path)
+            assert (repo / log.relative_path).read_bytes() == log.content
+    finally:
+        log.close()
+    assert paths[0] == "activity_log.txt"
+    assert f"activity/{month}.txt" in paths
+    assert paths[-1] == f"activity/{month}-2.txt"
+    # A segment is only left once it reaches the limit
+    assert (repo / "activity_log.txt").stat().st_size >= 200
+    assert (repo / f"activity/{month}.txt").read_text().startswith(f"# Activity Log {month}\n\n")
+
+def test_appends_from_another_writer_are_picked_up(repo):
+    first, second = writer(repo), writer(repo)
+    try:
+        first.append("[1] first\n")
+        assert second.changed_on_disk()
+        second.append("[2] second\n")
+        first.append("[3] first again\n")
+    finally:
+        first.close()
+        second.close()
+    expected = BASE + "[1] first\n[2] second\n[3] first again\n"
+    assert (repo / "activity_log.txt").read_text() == expected
+    assert first.content.decode() == expected
+
+def test_blob_sha_matches_git(repo):
+    log = writer(repo)
+    try:
+        log.append_entry()
+        assert log.blob_sha() == git(repo, "hash-object", "activity_log.txt")
+    finally:
+        log.close()
+
+def bare_clone(tmp_path, repo, content):
+    (repo / "activity_log.txt").write_text(content)
+    git(repo, "add", "activity_log.txt")
+    git(repo, "commit", "-q", "-m", "Start")
+    bare = tmp_path / "bare.git"
+    git(tmp_path, "clone", "-q", "--bare", str(repo), str(bare))
+    return bare
+
+def test_bare_log_reads_and_sizes_the_blob_at_head(tmp_path, repo):
+    bare = bare_clone(tmp_path, repo, BASE + "[0] committed\n")
+    session = GitSession(bare)
+    try:
+        log = BareActivityLog(session, "activity_log.txt", BASE, ACTIVITIES, max_bytes=1000)
+        assert log.content.decode() == BASE + "[0] committed\n"
+        assert not log.changed_on_disk()
+        log.append("[1] in memory\n")
+        assert not (bare / "activity_log.txt").exists()
+
+        month = datetime.date.today().strftime("%Y-%m")
+        full = BareActivityLog(session, "activity_log.txt", BASE, ACTIVITIES, max_bytes=10)
+        assert full.relative_path == f"activity/{month}.txt"
+        assert full.content.decode() == f"# Activity Log {month}\n\n"
+    finally:
+        session.close()
+
+def test_bare_log_notices_a_commit_by_another_writer(tmp_path, repo):
+    bare = bare_clone(tmp_path, repo, BASE)
+    session = GitSession(bare)
+    try:
+        log = BareActivityLog(session, "activity_log.txt", BASE, ACTIVITIES)
+        # Someone else commits a new version of the file
+        (repo / "activity_log.txt").write_text(BASE + "[1] elsewhere\n")
+        git(repo, "commit", "-q", "-am", "Elsewhere")
+        git(repo, "push", "-q", str(bare), "HEAD:main")
+        assert log.changed_on_disk()
+        log.append("[2] here\n")
+        assert log.content.decode() == BASE + "[1] elsewhere\n[2] here\n"
+    finally:
+        session.close()
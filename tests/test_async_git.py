@@ -0,0 +1,104 @@
+import asyncio
+import json
+
+import pytest
+
+from async_git import AsyncAutoCommitGenerator, AsyncCommitScheduler, AsyncGitSession, AsyncRepoRunner
+from conftest import git
+from git_backend import GitSession
+from push_pipeline import PushPipeline
+
+def test_async_and_sync_sessions_build_the_same_commit(tmp_path, repo):
+    other = tmp_path / "other"
+    git(tmp_path, "clone", "-q", str(repo), str(other))
+    git(other, "config", "user.name", "Test User")
+    git(other, "config", "user.email", "test@example.com")
+    for path in (repo, other):
+        (path / "logs").mkdir()
+        (path / "logs" / "activity.txt").write_text("one\n")
+
+    session = GitSession(repo)
+    try:
+        sync_commit = session.commit_file("logs/activity.txt", "First")
+    finally:
+        session.close()
+
+    async def commit():
+        agit = AsyncGitSession(other, lock=GitSession(other).lock)
+        try:
+            async with agit.lock.hold_async():
+                return await agit.commit_file("logs/activity.txt", "First")
+        finally:
+            await agit.close()
+    async_commit = asyncio.run(commit())
+
+    assert git(repo, "rev-parse", f"{sync_commit}^{{tree}}") == git(other, "rev-parse", f"{async_commit}^{{tree}}")
+    assert git(other, "status", "--porcelain") == ""
+
+@pytest.mark.parametrize("engine", ["sequential", "native"])
+def test_async_batch_keeps_the_index_in_step(repo, remote, engine):
+    (repo / "commit_config.json").write_text(json.dumps({"engine": engine}))
+
+    async def run():
+        generator = AsyncAutoCommitGenerator(repo)
+        try:
+            assert await generator.blocking(generator.ensure_git_repo)
+            made = await asyncio.wait_for(generator.run_batch(3), timeout=60)
+            # Checked before aclose(): nothing is left for the end of the run
+            status = git(repo, "status", "--porcelain", "--", "activity_log.txt")
+            return made, status
+        finally:
+            await generator.aclose()
+
+    made, status = asyncio.run(run())
+    assert made == 3
+    assert status == ""
+    assert git(repo, "rev-list", "--count", "HEAD") == "3"
+
+def test_async_runner_reports_a_missing_repository(tmp_path, repo, remote):
+    manifest = tmp_path / "repos.json"
+    manifest.write_text(json.dumps({"repos": [{"path": "missing", "commits": 1},
+                                              {"path": "repo", "commits": 2}]}))
+    results = {r["repo"]: r for r in AsyncRepoRunner(manifest).run()}
+    assert results[str(tmp_path / "missing")]["error"]
+    assert results[str(repo)]["committed"] == 2
+    assert results[str(repo)]["pushed"] is True
+
+def test_async_push_updates_the_push_state(repo, remote):
+    async def run():
+        generator = AsyncAutoCommitGenerator(repo)
+        try:
+            await generator.blocking(generator.ensure_git_repo)
+            await generator.run_batch(2)
+            return await generator.push_to_remote()
+        finally:
+            await generator.aclose()
+
+    assert asyncio.run(run())
+    state = json.loads((repo / ".git" / "commitment_issues" / "push_state.json").read_text())
+    assert state["pushed_head"] == git(repo, "rev-parse", "HEAD")
+    assert state["last_error"] is None
+    # The next run, sync or async, sees nothing left to push
+    pipeline = PushPipeline(repo)
+    try:
+        assert not pipeline.pending
+    finally:
+        pipeline.stop()
+
+def test_async_forever_serves_day_after_day(repo, remote, monkeypatch):
+    served = []
+
+    async def run_forever(self):
+        served.append(self.generator)
+
+    monkeypatch.setattr(AsyncCommitScheduler, "run_forever", run_forever)
+
+    async def run():
+        generator = AsyncAutoCommitGenerator(repo)
+        try:
+            await generator.run_daily(forever=True)
+            return generator
+        finally:
+            await generator.aclose()
+
+    assert served == [asyncio.run(run())]
@@ -0,0 +1,61 @@
+import json
+import os
+import random
+
+import pytest
+
+import catalogue
+from auto_commit import AutoCommitGenerator
+from catalogue import MessageCatalogue, compile_catalogue
+
+DEFAULTS = ["Default message"]
+
+def test_draws_follow_the_weights():
+    messages = MessageCatalogue([{"text": "heavy", "weight": 3}, "light", ("heavy", 100)])
+    rng = random.Random(5)
+    draws = [messages.sample(rng) for _ in range(40000)]
+    # The first occurrence of a text wins, so heavy keeps weight 3
+    assert draws.count("heavy") / len(draws) == pytest.approx(0.75, abs=0.02)
+
+def test_templates_use_the_variables():
+    messages = MessageCatalogue(["Tune {repo} {unknown}"], variables={"repo": "api"})
+    assert messages.sample() == "Tune api {unknown}"
+
+def test_cache_is_reused_until_the_file_changes(tmp_path, monkeypatch):
+    source = tmp_path / "messages.json"
+    source.write_text(json.dumps(["First file message"]))
+    cache = tmp_path / "messages-cache.json"
+    assert "First file message" in compile_catalogue([], source, DEFAULTS, cache_path=cache).texts
+    assert json.loads(cache.read_text())["tables"]["texts"][0] == "First file message"
+
+    def unexpected_read(path):
+        raise AssertionError("catalogue file read despite a valid cache")
+    with monkeypatch.context() as m:
+        m.setattr(catalogue, "load_catalogue_file", unexpected_read)
+        compile_catalogue([], source, DEFAULTS, cache_path=cache)
+
+    source.write_text(json.dumps(["Second file message"]))
+    stat = source.stat()
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    texts = compile_catalogue([], source, DEFAULTS, cache_path=cache).texts
+    assert "Second file message" in texts
+    assert "First file message" not in texts
+
+@pytest.mark.parametrize("content", [None, "[not json", '[{"weight": 2}]'])
+def test_unusable_file_falls_back_to_custom_and_defaults(tmp_path, capsys, content):
+    source = tmp_path / "messages.json"
+    if content is not None:
+        source.write_text(content)
+    cache = tmp_path / "messages-cache.json"
+    messages = compile_catalogue(["Custom message"], source, DEFAULTS, cache_path=cache)
+    assert messages.texts == ["Custom message", "Default message"]
+    assert "Warning: cannot use message catalogue" in capsys.readouterr().out
+    assert not cache.exists()
+
+def test_generator_starts_with_a_missing_catalogue(repo):
+    (repo / "commit_config.json").write_text(json.dumps({"message_catalogue": "missing.txt"}))
+    generator = AutoCommitGenerator(repo)
+    try:
+        assert generator.messages.sample()
+    finally:
+        generator.close()
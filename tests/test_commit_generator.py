@@ -0,0 +1,70 @@
+import pytest
+
+from commit_generator import ENGINES, CommitGenerator
+from conftest import git
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_engines_commit_and_push_the_batch(repo, remote, engine):
+    generator = CommitGenerator(repo)
+    try:
+        generator.ensure_git_repo()
+        assert generator.generate_commits(5, engine=engine) == 5
+        # Checked before close(): the index must not lag behind HEAD
+        assert git(repo, "status", "--porcelain") == ""
+    finally:
+        generator.close()
+    assert git(repo, "rev-list", "--count", "HEAD") == "5"
+    assert git(repo, "rev-parse", "HEAD") == git(remote, "rev-parse", "main")
+    assert (repo / "activity_log.txt").read_bytes() == git(repo, "cat-file", "blob", "HEAD:activity_log.txt").encode() + b"\n"
+
+def test_fast_import_matches_sequential_commits(tmp_path, repo):
+    other = tmp_path / "other"
+    git(tmp_path, "init", "-q", "-b", "main", str(other))
+    git(other, "config", "user.name", "Test User")
+    git(other, "config", "user.email", "test@example.com")
+
+    shapes = []
+    for path, engine in ((repo, "sequential"), (other, "fast-import")):
+        generator = CommitGenerator(path)
+        try:
+            generator.ensure_git_repo()
+            generator.generate_commits(3, engine=engine)
+        finally:
+            generator.close()
+        # Same history shape: authors, parents, files touched and log lines per commit
+        shapes.append((
+            git(path, "log", "--format=%an <%ae>", "--name-only"),
+            [len(parents.split()) for parents in git(path, "log", "--format=%P").split("\n")],
+            [len(git(path, "show", f"HEAD~{i}:activity_log.txt").splitlines()) for i in range(3)],
+        ))
+    assert shapes[0] == shapes[1]
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_bare_repository_commits_without_a_working_tree(tmp_path, engine):
+    bare = tmp_path / "bare.git"
+    remote = tmp_path / "remote.git"
+    git(tmp_path, "init", "-q", "--bare", "-b", "main", str(bare))
+    git(tmp_path, "init", "-q", "--bare", "-b", "main", str(remote))
+    git(bare, "config", "user.name", "Test User")
+    git(bare, "config", "user.email", "test@example.com")
+    git(bare, "remote", "add", "origin", str(remote))
+    git(bare, "config", "branch.main.remote", "origin")
+    git(bare, "config", "branch.main.merge", "refs/heads/main")
+
+    for batch in (3, 2):
+        # A second run must continue the log from the blob at HEAD
+        generator = CommitGenerator(bare, bare=True)
+        try:
+            generator.ensure_git_repo()
+            assert generator.generate_commits(batch, engine=engine) == batch
+        finally:
+            generator.close()
+
+    assert git(bare, "rev-list", "--count", "HEAD") == "5"
+    log = git(bare, "show", "HEAD:activity_log.txt").splitlines()
+    assert log[0] == "# Activity Log"
+    assert len([line for line in log if line.startswith("[")]) == 5
+    assert not (bare / "activity_log.txt").exists()
+    assert not (bare / "index").exists()
+    assert git(bare, "rev-parse", "HEAD") == git(remote, "rev-parse", "main")
+    git(bare, "fsck", "--strict", "--no-progress")
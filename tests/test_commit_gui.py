@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+import commit_gui
+from config_loader import load_config
+
+class Var:
+    def __init__(self, value):
+        self.value = value
+
+    def get(self, *args):
+        return self.value
+
+@pytest.fixture
+def gui(tmp_path, monkeypatch):
+    """A GUI object with its settings widgets replaced by plain values; no display needed."""
+    dialogs = []
+    monkeypatch.setattr(commit_gui.messagebox, "showinfo", lambda *a: dialogs.append(("info",) + a))
+    monkeypatch.setattr(commit_gui.messagebox, "showerror", lambda *a: dialogs.append(("error",) + a))
+    app = object.__new__(commit_gui.CommitGeneratorGUI)
+    app.repo_path = tmp_path
+    app.config_file = tmp_path / "commit_config.json"
+    app.config = load_config(app.config_file)
+    app.min_commits_var, app.max_commits_var = Var("2"), Var("4")
+    app.min_delay_var, app.max_delay_var = Var("0"), Var("0")
+    app.start_hour_var, app.end_hour_var = Var("9"), Var("17")
+    app.random_timing_var = Var(False)
+    app.messages_text = Var("")
+    app.jobs = []
+    app.run_engine = lambda job, success_msg, error_msg: app.jobs.append(success_msg)
+    app.dialogs = dialogs
+    return app
+
+def test_run_saves_quietly_and_starts(gui):
+    gui.test_run()
+    assert gui.jobs == ["Test completed successfully!"]
+    assert gui.dialogs == []
+    assert json.loads(gui.config_file.read_text())["max_commits"] == 4
+
+def test_run_with_invalid_settings_shows_errors_and_aborts(gui):
+    gui.min_commits_var = Var("9")
+    gui.run_daily_now()
+    assert gui.jobs == []
+    assert [d[0] for d in gui.dialogs] == ["error"]
+    assert not gui.config_file.exists()
+
+def test_save_button_still_confirms(gui):
+    assert gui.save_configuration()
+    assert ("info", "Success", "Configuration saved!") in gui.dialogs
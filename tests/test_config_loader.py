@@ -0,0 +1,32 @@
+import json
+
+import pytest
+
+from config_loader import DEFAULT_CONFIG, ConfigError, load_config, save_config, validate
+
+def load(tmp_path, **settings):
+    path = tmp_path / "commit_config.json"
+    path.write_text(json.dumps(settings))
+    return load_config(path)
+
+def test_invalid_value_resets_only_its_own_key(tmp_path):
+    config = load(tmp_path, max_commits=40, max_commits_per_second=-1)
+    assert config["max_commits_per_second"] == DEFAULT_CONFIG["max_commits_per_second"]
+    assert config["max_commits"] == 40
+
+def test_fallback_that_breaks_a_pair_resets_the_pair(tmp_path):
+    config = load(tmp_path, work_hours_start=20, work_hours_end=30)
+    assert config["work_hours_start"] == DEFAULT_CONFIG["work_hours_start"]
+    assert config["work_hours_end"] == DEFAULT_CONFIG["work_hours_end"]
+    assert validate(config) == []
+
+def test_conflicting_pair_resets_both_keys(tmp_path):
+    config = load(tmp_path, min_commits=30, max_commits=10, min_delay_minutes=2)
+    assert (config["min_commits"], config["max_commits"]) == (15, 25)
+    assert config["min_delay_minutes"] == 2
+
+def test_save_rejects_invalid_settings(tmp_path):
+    config = dict(DEFAULT_CONFIG, work_hours_start=19)
+    with pytest.raises(ConfigError) as error:
+        save_config(tmp_path / "commit_config.json", config)
+    assert error.value.errors == ["work_hours_start must be before work_hours_end"]
@@ -0,0 +1,62 @@
+import asyncio
+import datetime
+import json
+
+from conftest import git
+from daemon import CommitDaemon, TimerWheel, query
+
+def same_schedule(tmp_path, repo, names=("a", "b")):
+    """Repositories with identical, non-random plans, so their timers collide."""
+    config = json.dumps({"min_commits": 3, "max_commits": 3, "enable_random_timing": False})
+    paths = []
+    for name in names:
+        path = tmp_path / name
+        git(tmp_path, "clone", "-q", str(repo), str(path))
+        (path / "commit_config.json").write_text(config)
+        paths.append(path)
+    return paths
+
+def test_wheel_lists_timers_that_share_a_time():
+    wheel = TimerWheel()
+    wheel.schedule(120.0, ("commit", object(), None, 0))
+    wheel.schedule(60.0, ("commit", object(), None, 0))
+    wheel.schedule(120.0, ("commit", object(), None, 0))
+    assert [when for when, _ in wheel.entries()] == [60.0, 120.0, 120.0]
+
+def test_status_answers_with_repositories_on_the_same_schedule(tmp_path, repo):
+    paths = same_schedule(tmp_path, repo)
+    daemon = CommitDaemon([{"path": path} for path in paths], control_path=str(tmp_path / "d.sock"))
+
+    async def status():
+        await daemon.plan_day(datetime.date.today() + datetime.timedelta(days=1))
+        server = await daemon.start_control()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(None, query, daemon.control_path)
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    try:
+        reply = asyncio.run(status())
+    finally:
+        daemon.close()
+    # Three commits and a finish timer per repository, plus the next day's rollover
+    assert reply["timers"] == 9
+    first, second = reply["next"][:2]
+    assert first["time"] == second["time"]
+    assert {first["repo"], second["repo"]} == {str(path) for path in paths}
+    assert [r["planned"] for r in reply["repos"]] == [3, 3]
+
+def test_bad_entry_is_reported_and_the_rest_are_served(tmp_path, repo):
+    (path,) = same_schedule(tmp_path, repo, names=("a",))
+    missing = tmp_path / "missing"
+    daemon = CommitDaemon([{"path": missing}, {"path": path}], control_path=str(tmp_path / "d.sock"))
+    try:
+        assert len(daemon.services) == 1
+        asyncio.run(daemon.plan_day(datetime.date.today() + datetime.timedelta(days=1)))
+        repos = {r["repo"]: r for r in daemon.status()["repos"]}
+    finally:
+        daemon.close()
+    assert repos[str(missing)]["error"]
+    assert repos[str(path)]["planned"] == 3
+    assert repos[str(path)]["error"] is None
@@ -0,0 +1,32 @@
+from conftest import git
+from git_backend import GitSession
+
+def commit_line(session, repo, text, message):
+    with open(repo / "activity_log.txt", "a") as f:
+        f.write(text)
+    return session.commit_file("activity_log.txt", message)
+
+def test_plumbing_commit_keeps_index_in_step_with_head(repo):
+    session = GitSession(repo)
+    try:
+        assert session.can_use_plumbing()
+        assert commit_line(session, repo, "one\n", "First")
+        assert commit_line(session, repo, "two\n", "Second")
+        # Checked before close(): a scheduled day keeps the session open for hours
+        assert git(repo, "status", "--porcelain") == ""
+        assert git(repo, "rev-parse", ":activity_log.txt") == git(repo, "rev-parse", "HEAD:activity_log.txt")
+    finally:
+        session.close()
+
+def test_plumbing_commit_survives_a_manual_commit(repo):
+    session = GitSession(repo)
+    try:
+        commit_line(session, repo, "one\n", "First")
+        commit_line(session, repo, "two\n", "Second")
+        (repo / "other.txt").write_text("mine\n")
+        git(repo, "add", "other.txt")
+        git(repo, "commit", "-q", "-m", "Manual")
+        assert git(repo, "show", "HEAD:activity_log.txt") == "one\ntwo"
+        assert git(repo, "diff", "--stat", "HEAD~1", "HEAD").count("|") == 1
+    finally:
+        session.close()
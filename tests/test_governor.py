@@ -0,0 +1,64 @@
+import sys
+
+import pytest
+
+import commit_generator
+import governor
+from governor import Governor, TokenBucket
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_bucket_allows_a_burst_then_paces():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, clock=clock)
+    assert [bucket.reserve() for _ in range(2)] == [0.0, 0.0]
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.reserve() == pytest.approx(1.0)
+    clock.now = 1.0
+    assert bucket.reserve() == pytest.approx(0.5)
+
+def test_zero_rate_is_unlimited():
+    bucket = TokenBucket(rate=0, clock=FakeClock())
+    assert all(bucket.reserve() == 0.0 for _ in range(1000))
+
+def test_repository_limit_is_capped_by_the_global_one():
+    parent = Governor(commits_per_second=1)
+    child = Governor(commits_per_second=10, parent=parent)
+    assert child.reserve("commit") == 0.0
+    assert child.reserve("commit") > 0.5
+    assert child.burst("commit") == 1
+
+def test_push_limit_is_per_minute():
+    governor = Governor(pushes_per_minute=60)
+    assert governor.buckets["push"].rate == 1
+
+def test_large_batch_needs_confirmation(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(sys, "argv", ["commit_generator.py", "500", "--path", str(tmp_path)])
+    with pytest.raises(SystemExit) as exit_info:
+        commit_generator.main()
+    assert exit_info.value.code == 1
+    assert "--yes" in capsys.readouterr().out
+
+def test_paced_child_never_bursts_and_leaves_the_parent_alone():
+    parent = Governor(commits_per_second=100, parent=Governor(pushes_per_minute=30))
+    child = parent.paced(0.5)
+    assert child.reserve("commit") == 0.0
+    assert child.reserve("commit") == pytest.approx(0.5, abs=0.05)
+    assert parent.limits == (100, 0)
+    assert governor.describe(child) == "2 commits/s per repository, 30 pushes/min overall"
+
+def test_delay_does_not_change_the_shared_governor(repo):
+    generator = commit_generator.CommitGenerator(repo)
+    try:
+        shared = generator.governor
+        assert generator.generate_commits(2, delay=0.01) == 2
+        assert generator.governor is shared
+        assert shared.limits == (0, 0)
+        assert governor.for_repo(repo) is shared
+    finally:
+        generator.close()
@@ -0,0 +1,99 @@
+import datetime
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+from commit_generator import CommitGenerator
+from history import RunHistory, default_path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+WRITER = """
+import sys, time
+from history import RunHistory
+history = RunHistory(sys.argv[1])
+for i in range(int(sys.argv[3])):
+    history.record(sys.argv[2], "commit", time.time(), 0.01, True, sha=f"{i:040x}")
+history.close()
+"""
+
+def at(day, hour, minute=0):
+    return datetime.datetime.combine(day, datetime.time(hour, minute)).timestamp()
+
+def test_records_round_trip_through_the_queries(tmp_path):
+    repo = tmp_path / "project"
+    repo.mkdir()
+    yesterday, today = datetime.date(2026, 10, 15), datetime.date(2026, 10, 16)
+    history = RunHistory(tmp_path / "history.sqlite3")
+    try:
+        history.record(repo, "commit", at(yesterday, 9, 1), 0.02, True, sha="a" * 40, planned=at(yesterday, 9))
+        history.record(repo, "push", at(yesterday, 18), 1.5, True)
+        history.record_many(repo, "commit", [
+            (at(today, 9, 2), 0.02, True, "b" * 40, at(today, 9), "First"),
+            (at(today, 10), 0.03, False, None, None, "Second"),
+            (at(today, 11), 0.02, True, "c" * 40, None, "Third"),
+        ])
+        history.record(repo, "push", at(today, 12), 3.0, False, detail="rejected")
+
+        ((repo_id, path, name),) = history.repos("project")
+        assert history.repos(str(repo)) == [(repo_id, path, name)]
+        days = history.daily(repo_id, yesterday, today)
+        assert [(d["day"], d["commits"], d["failed"], d["pushes"], d["failed_pushes"]) for d in days] == [
+            ("2026-10-15", 1, 0, 1, 0), ("2026-10-16", 2, 1, 0, 1)]
+        assert days[0]["late_avg"] == 60
+        assert days[1]["push_max"] == 3.0
+        assert history.latest(repo_id, "commit")["sha"] == "c" * 40
+        assert history.latest(repo_id, "push")["detail"] == "rejected"
+        assert history.latest(repo_id, "push", ok_only=True)["seconds"] == 1.5
+        assert history.unpushed(repo_id) == 2
+        (summary,) = history.status(today)
+        assert (summary["today"], summary["failed_today"], summary["unpushed"]) == (2, 1, 2)
+    finally:
+        history.close()
+
+def test_concurrent_writers_from_several_processes_and_threads(tmp_path):
+    path = tmp_path / "history.sqlite3"
+    repos = [tmp_path / f"repo-{i}" for i in range(4)]
+    for repo in repos:
+        repo.mkdir()
+    writers = [subprocess.Popen([sys.executable, "-c", WRITER, str(path), str(repo), "50"], cwd=REPO_ROOT)
+               for repo in repos]
+
+    history = RunHistory(path)
+    try:
+        threads = [threading.Thread(target=lambda: [history.record(repos[0], "push", 0.0 + i, 0.1, True)
+                                                    for i in range(20)])
+                   for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert all(writer.wait(60) == 0 for writer in writers)
+
+        today = datetime.date.today()
+        for repo in repos:
+            ((repo_id, _, _),) = history.repos(str(repo))
+            (day,) = history.daily(repo_id, today, today)
+            assert day["commits"] == 50
+        assert len(history.repos()) == 4
+        assert history.db.execute("SELECT COUNT(*) FROM events WHERE kind = 'push'").fetchone()[0] == 40
+    finally:
+        history.close()
+
+def test_generated_commits_are_recorded(repo, remote):
+    generator = CommitGenerator(repo)
+    try:
+        generator.ensure_git_repo()
+        generator.generate_commits(3)
+    finally:
+        generator.close()
+    history = RunHistory(default_path())
+    try:
+        ((repo_id, _, _),) = history.repos(str(repo))
+        assert history.unpushed(repo_id) == 0
+        assert history.latest(repo_id, "push")["ok"] == 1
+        (day,) = history.daily(repo_id, datetime.date.today(), datetime.date.today())
+        assert day["commits"] == 3
+    finally:
+        history.close()
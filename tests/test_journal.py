@@ -0,0 +1,45 @@
+import datetime
+
+from journal import CommitJournal
+
+DAY = datetime.date(2026, 10, 16)
+
+def test_replay_returns_the_plans_commits(tmp_path):
+    journal = CommitJournal(tmp_path)
+    journal.record(DAY, "plan-a", 0, "a0")
+    journal.record(DAY, "plan-b", 0, "b0")
+    journal.record(DAY, "plan-a", 1, "a1")
+    journal.close()
+    done = CommitJournal(tmp_path).replay(DAY, "plan-a")
+    assert {index: entry["sha"] for index, entry in done.items()} == {0: "a0", 1: "a1"}
+
+def test_torn_last_line_does_not_swallow_the_next_record(tmp_path):
+    journal = CommitJournal(tmp_path)
+    journal.record(DAY, "plan", 0, "sha0")
+    journal.close()
+    with open(journal.path_for(DAY), "a") as f:
+        f.write('{"plan": "plan", "index": 1, "sh')
+
+    # The run that resumes after the crash
+    resumed = CommitJournal(tmp_path)
+    assert set(resumed.replay(DAY, "plan")) == {0}
+    resumed.record(DAY, "plan", 1, "sha1")
+    resumed.close()
+    done = CommitJournal(tmp_path).replay(DAY, "plan")
+    assert {index: entry["sha"] for index, entry in done.items()} == {0: "sha0", 1: "sha1"}
+
+def test_torn_only_line_is_dropped(tmp_path):
+    journal = CommitJournal(tmp_path)
+    journal.path_for(DAY).write_text('{"plan": "pl')
+    journal.record(DAY, "plan", 0, "sha0")
+    journal.close()
+    assert journal.path_for(DAY).read_text().count("\n") == 1
+    assert set(CommitJournal(tmp_path).replay(DAY, "plan")) == {0}
+
+def test_old_journals_are_pruned(tmp_path):
+    old = tmp_path / "2026-08-01.jsonl"
+    old.write_text("")
+    journal = CommitJournal(tmp_path, keep_days=30)
+    journal.record(DAY, "plan", 0, "sha0")
+    journal.close()
+    assert not old.exists()
@@ -0,0 +1,49 @@
+from conftest import git
+from git_backend import GitSession
+from maintenance import RepoMaintenance
+
+def make_commits(session, repo, count):
+    for i in range(count):
+        with open(repo / "activity_log.txt", "a") as f:
+            f.write(f"entry {i}\n")
+        assert session.commit_file("activity_log.txt", f"Commit {i}")
+
+def test_repack_writes_bitmap_and_commit_graph_and_keeps_the_repo_sound(repo):
+    session = GitSession(repo)
+    try:
+        make_commits(session, repo, 10)
+        maintenance = RepoMaintenance(session, loose_threshold=20)
+        record = maintenance.run()
+        assert record is not None and record["ok"]
+        assert record["reason"] == "30 loose objects"
+        assert record["before"]["loose"] == 30
+        assert record["after"]["loose"] == 0
+        assert record["after"]["packed"] >= 30
+
+        pack_dir = repo / ".git" / "objects" / "pack"
+        assert (pack_dir / "multi-pack-index").exists()
+        assert list(pack_dir.glob("multi-pack-index-*.bitmap"))
+        assert (repo / ".git" / "objects" / "info" / "commit-graphs" / "commit-graph-chain").exists()
+        git(repo, "fsck", "--strict", "--no-progress")
+        git(repo, "commit-graph", "verify")
+
+        # Nothing left to do until loose objects pile up again
+        assert maintenance.run() is None
+        make_commits(session, repo, 2)
+        assert git(repo, "rev-list", "--count", "HEAD") == "12"
+        git(repo, "fsck", "--strict", "--no-progress")
+    finally:
+        session.close()
+
+def test_run_is_recorded_and_followed_by_the_next_push(repo):
+    session = GitSession(repo)
+    try:
+        make_commits(session, repo, 1)
+        maintenance = RepoMaintenance(session)
+        assert maintenance.run(force=True, push_seconds=1.5)["mode"] == "full"
+        maintenance.note_push(0.5)
+        # Read back from the state file, as the next run would
+        history = RepoMaintenance(session).state["history"]
+    finally:
+        session.close()
+    assert [(r["push_before"], r["push_after"]) for r in history] == [(1.5, 0.5)]
@@ -0,0 +1,16 @@
+from metrics import Metrics
+
+def test_summary_table_is_quiet_without_an_output(capsys):
+    metrics = Metrics()
+    metrics.record("commit", 0.01)
+    metrics.print_summary()
+    assert capsys.readouterr().out == ""
+
+def test_summary_table_is_printed_with_metrics_out(tmp_path, capsys):
+    metrics = Metrics()
+    metrics.configure_output(tmp_path / "run.jsonl")
+    metrics.record("commit", 0.01)
+    metrics.print_summary()
+    metrics.close()
+    assert "commit" in capsys.readouterr().out
+    assert '"phase": "commit"' in (tmp_path / "run.jsonl").read_text()
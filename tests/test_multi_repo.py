@@ -0,0 +1,22 @@
+import json
+
+from conftest import git
+from multi_repo import MultiRepoRunner
+
+def test_missing_repository_fails_alone(tmp_path, repo, remote):
+    manifest = tmp_path / "repos.json"
+    manifest.write_text(json.dumps({"repos": [
+        {"path": "missing", "commits": 2},
+        {"path": "repo", "commits": 2},
+    ]}))
+    results = {r["repo"]: r for r in MultiRepoRunner(manifest).run()}
+
+    missing = results[str(tmp_path / "missing")]
+    assert missing["error"]
+    assert missing["committed"] == 0
+
+    ok = results[str(repo)]
+    assert ok["error"] is None
+    assert ok["committed"] == 2
+    assert ok["pushed"] is True
+    assert git(remote, "rev-list", "--count", "main") == "2"
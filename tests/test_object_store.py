@@ -0,0 +1,82 @@
+import pytest
+
+from conftest import git
+from git_backend import GitSession
+from object_store import NativeCommitter
+
+@pytest.fixture
+def session(repo):
+    session = GitSession(repo)
+    yield session
+    session.close()
+
+def write_log(repo, text):
+    with open(repo / "activity_log.txt", "a") as f:
+        f.write(text)
+
+def test_native_commit_matches_git(repo, session):
+    committer = NativeCommitter(session)
+    write_log(repo, "one\n")
+    sha = committer.commit_file("activity_log.txt", "First")
+    assert sha == git(repo, "rev-parse", "HEAD")
+    assert git(repo, "show", "-s", "--format=%an <%ae> %s", "HEAD") == "Test User <test@example.com> First"
+    git(repo, "fsck", "--strict")
+    assert git(repo, "status", "--porcelain") == ""
+
+def test_no_identity_falls_back_to_git_engine(repo, session):
+    git(repo, "config", "--unset", "user.name")
+    git(repo, "config", "--unset", "user.email")
+    git(repo, "config", "user.useConfigOnly", "true")
+    assert not NativeCommitter.supported(session)
+    with pytest.raises(ValueError, match="identity"):
+        NativeCommitter(session)
+
+def test_unreadable_tree_fails_the_commit(repo, session):
+    committer = NativeCommitter(session)
+    write_log(repo, "one\n")
+    committer.commit_file("activity_log.txt", "First")
+    tree = git(repo, "rev-parse", "HEAD^{tree}")
+    (repo / ".git" / "objects" / tree[:2] / tree[2:]).unlink()
+
+    # A fresh committer has no cached tree and must read it from the store
+    committer = NativeCommitter(session)
+    head = git(repo, "rev-parse", "HEAD")
+    write_log(repo, "two\n")
+    assert committer.commit_file("activity_log.txt", "Second") is None
+    assert git(repo, "rev-parse", "HEAD") == head
+
+def test_later_commits_patch_the_index_without_git(repo, session, monkeypatch):
+    (repo / "other.txt").write_text("mine\n")
+    git(repo, "add", "other.txt")
+    git(repo, "commit", "-q", "-m", "Manual")
+    committer = NativeCommitter(session)
+    write_log(repo, "one\n")
+    committer.commit_file("activity_log.txt", "First")
+
+    def spawn(*args, **kwargs):
+        raise AssertionError(f"git spawned: {args}")
+    monkeypatch.setattr(session, "run", spawn)
+    monkeypatch.setattr(session, "call", spawn)
+    for text in ("two\n", "three\n"):
+        write_log(repo, text)
+        assert committer.commit_file("activity_log.txt", text.strip())
+    monkeypatch.undo()
+
+    assert git(repo, "status", "--porcelain") == ""
+    assert git(repo, "rev-parse", ":activity_log.txt") == git(repo, "rev-parse", "HEAD:activity_log.txt")
+    git(repo, "fsck", "--strict")
+    # The dropped cache tree is rebuilt by git's own next commit
+    (repo / "other.txt").write_text("changed\n")
+    git(repo, "commit", "-q", "-am", "Manual again")
+    assert git(repo, "show", "HEAD:activity_log.txt") == "one\ntwo\nthree"
+    assert git(repo, "diff", "--name-only", "HEAD~1", "HEAD") == "other.txt"
+
+def test_index_it_cannot_patch_is_left_to_git(repo, session):
+    committer = NativeCommitter(session)
+    write_log(repo, "one\n")
+    committer.commit_file("activity_log.txt", "First")
+    git(repo, "update-index", "--index-version", "4")
+    write_log(repo, "two\n")
+    committer.commit_file("activity_log.txt", "Second")
+    assert git(repo, "status", "--porcelain") == ""
+    assert git(repo, "rev-parse", ":activity_log.txt") == git(repo, "rev-parse", "HEAD:activity_log.txt")
@@ -0,0 +1,38 @@
+import threading
+
+import profiling
+from profiling import RunProfiler
+
+def busy_thread(results):
+    def target():
+        results.append(sum(range(1000)))
+    thread = threading.Thread(target=target)
+    thread.start()
+    thread.join()
+
+def test_threads_started_during_a_profiled_run_still_run():
+    results = []
+    profiler = RunProfiler()
+    profiler.start()
+    try:
+        busy_thread(results)
+    finally:
+        profiler.stop()
+    assert results == [499500]
+    assert profiler.report()["wall_seconds"] >= 0
+
+def test_thread_runs_unprofiled_when_another_profiler_is_active(monkeypatch):
+    class ActiveTool:
+        def enable(self):
+            raise ValueError("Another profiling tool is already active")
+
+    monkeypatch.setattr(profiling, "PER_THREAD_PROFILES", True)
+    results = []
+    profiler = RunProfiler()
+    profiler.start()
+    monkeypatch.setattr(profiling.cProfile, "Profile", ActiveTool)
+    try:
+        busy_thread(results)
+    finally:
+        profiler.stop()
+    assert results == [499500]
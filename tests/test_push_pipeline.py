@@ -0,0 +1,84 @@
+import pytest
+
+from conftest import git
+from push_pipeline import PushPipeline, is_transient
+
+NETWORK_ERROR = "fatal: unable to access 'https://example.com/r.git/': Could not resolve host: example.com\n"
+
+def commit(repo, text):
+    with open(repo / "activity_log.txt", "a") as f:
+        f.write(text)
+    git(repo, "add", "activity_log.txt")
+    git(repo, "commit", "-q", "-m", text.strip())
+
+@pytest.fixture
+def pipeline(repo):
+    pipelines = []
+
+    def make(**options):
+        pipelines.append(PushPipeline(repo, retry_delay=0.01, **options))
+        return pipelines[-1]
+    yield make
+    for p in pipelines:
+        p.stop()
+
+def attempts(pipeline):
+    return [record["attempt"] for record in pipeline.state["history"]]
+
+def test_push_reaches_the_remote(repo, remote, pipeline):
+    commit(repo, "one\n")
+    push = pipeline()
+    assert push.flush()
+    assert git(remote, "rev-parse", "main") == git(repo, "rev-parse", "HEAD")
+    assert not push.pending
+
+def test_rejected_push_fails_without_retrying(tmp_path, repo, remote, pipeline):
+    commit(repo, "one\n")
+    git(repo, "push", "-q", "origin", "main")
+    other = tmp_path / "other"
+    git(tmp_path, "clone", "-q", str(remote), str(other))
+    git(other, "-c", "user.name=O", "-c", "user.email=o@example.com", "commit", "-q", "--allow-empty", "-m", "x")
+    git(other, "push", "-q", "origin", "main")
+    commit(repo, "two\n")
+
+    push = pipeline()
+    assert not push.flush()
+    assert attempts(push) == [1]
+    assert "rejected" in push.state["last_error"]
+    assert push.pending
+
+def test_missing_upstream_fails_without_retrying(tmp_path, repo, pipeline):
+    git(tmp_path, "init", "-q", "--bare", "remote.git")
+    git(repo, "remote", "add", "origin", str(tmp_path / "remote.git"))
+    commit(repo, "one\n")
+    push = pipeline()
+    assert not push.flush()
+    assert attempts(push) == [1]
+
+def test_network_errors_are_retried_with_backoff(repo, pipeline, monkeypatch):
+    commit(repo, "one\n")
+    push = pipeline(remote="origin", max_attempts=3)
+    replies = iter([(128, b"", NETWORK_ERROR), (128, b"", NETWORK_ERROR), (0, b"", "")])
+    monkeypatch.setattr(push.git, "call", lambda *args, input=None: next(replies))
+    assert push.flush()
+    assert attempts(push) == [1, 2, 3]
+    assert push.state["last_error"] is None
+
+def test_network_errors_give_up_after_max_attempts(repo, pipeline, monkeypatch):
+    commit(repo, "one\n")
+    push = pipeline(remote="origin", max_attempts=2)
+    monkeypatch.setattr(push.git, "call", lambda *args, input=None: (128, b"", NETWORK_ERROR))
+    assert not push.flush()
+    assert attempts(push) == [1, 2]
+
+@pytest.mark.parametrize("stderr, transient", [
+    (NETWORK_ERROR, True),
+    ("fatal: the remote end hung up unexpectedly\n", True),
+    (" ! [rejected]        main -> main (non-fast-forward)\n", False),
+    ("fatal: The current branch main has no upstream branch.\n", False),
+    ("fatal: Authentication failed for 'https://example.com/r.git/'\n", False),
+    ("git@example.com: Permission denied (publickey).\nfatal: Could not read from remote repository.\n", False),
+    ("fatal: something nobody has seen before\n", False),
+])
+def test_error_classification(stderr, transient):
+    assert is_transient(stderr) is transient
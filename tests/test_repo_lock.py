@@ -0,0 +1,67 @@
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from metrics import Metrics
+from repo_lock import LockTimeout, RepoLock
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+HOLDER = """
+import sys
+from repo_lock import RepoLock
+with RepoLock(sys.argv[1]).hold():
+    print("locked", flush=True)
+    sys.stdin.read()
+"""
+
+@pytest.fixture
+def holder(tmp_path):
+    """Another process holding the lock until it is killed."""
+    path = tmp_path / "repo.lock"
+    proc = subprocess.Popen([sys.executable, "-c", HOLDER, str(path)], stdin=subprocess.PIPE,
+                            stdout=subprocess.PIPE, text=True, cwd=REPO_ROOT)
+    assert proc.stdout.readline() == "locked\n"
+    yield path, proc
+    proc.kill()
+    proc.wait()
+
+def test_lock_held_by_another_process_is_refused(holder):
+    path, _ = holder
+    with pytest.raises(LockTimeout):
+        with RepoLock(path, timeout=0.2).hold():
+            pass
+
+def test_lock_is_released_when_its_holder_dies(holder):
+    path, proc = holder
+    proc.kill()
+    proc.wait()
+    started = time.perf_counter()
+    with RepoLock(path, timeout=5).hold():
+        assert time.perf_counter() - started < 1
+
+def test_second_holder_waits_for_the_first(tmp_path):
+    path = tmp_path / "repo.lock"
+    first = RepoLock(path)
+    metrics = Metrics()
+    second = RepoLock(path, metrics=metrics)
+    events = []
+
+    def wait_for_lock():
+        with second.hold():
+            events.append("second")
+
+    with first.hold():
+        # Re-entrant within the holder
+        with first.hold():
+            thread = threading.Thread(target=wait_for_lock)
+            thread.start()
+            time.sleep(0.1)
+            events.append("first")
+    thread.join(5)
+    assert events == ["first", "second"]
+    assert metrics.records[-1]["contended"] is True
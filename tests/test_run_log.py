@@ -0,0 +1,67 @@
+import datetime
+import gzip
+import logging
+import os
+import sys
+
+import pytest
+
+from run_log import RotatingLogHandler, attach, daily_stats, iter_lines, log_segments
+
+@pytest.fixture
+def logger():
+    logger = logging.getLogger("test_run_log")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    yield logger
+    for handler in list(logger.handlers):
+        handler.close()
+        logger.removeHandler(handler)
+
+def add_handler(logger, path, max_bytes, backups):
+    handler = RotatingLogHandler(path, max_bytes, backups)
+    handler.setFormatter(logging.Formatter("%(asctime)s %(message)s", "%Y-%m-%d %H:%M:%S"))
+    logger.addHandler(handler)
+    return handler
+
+def test_log_rotates_at_max_bytes_and_keeps_backups_compressed(tmp_path, logger):
+    path = tmp_path / "run.log"
+    add_handler(logger, path, max_bytes=200, backups=3)
+    for i in range(40):
+        logger.info(f"[12:00:00] Committed: change {i:02d}")
+
+    segments = log_segments(path)
+    assert [p.name for p in segments] == ["run.log.3.gz", "run.log.2.gz", "run.log.1.gz", "run.log"]
+    assert path.stat().st_size <= 200
+    with gzip.open(segments[0], 'rt') as f:
+        assert "Committed: change" in f.read()
+    # Only the newest lines survive: older segments beyond the backup count are dropped
+    numbers = [int(line.rstrip()[-2:]) for line in iter_lines(path)]
+    assert 0 < len(numbers) < 40
+    assert numbers == list(range(40 - len(numbers), 40))
+
+def test_log_rolls_over_when_the_day_changes(tmp_path, logger):
+    path = tmp_path / "run.log"
+    path.write_text("2026-10-15 23:59:00 [23:59:00] Committed: yesterday\n")
+    yesterday = (datetime.datetime.now() - datetime.timedelta(days=1)).timestamp()
+    os.utime(path, (yesterday, yesterday))
+    add_handler(logger, path, max_bytes=0, backups=2)
+    logger.info("[00:01:00] Committed: today")
+    assert [p.name for p in log_segments(path)] == ["run.log.1.gz", "run.log"]
+    assert "yesterday" not in path.read_text()
+
+def test_attach_copies_printed_lines_and_stats_span_segments(tmp_path, monkeypatch, capsys):
+    path = tmp_path / "run.log"
+    monkeypatch.setattr(sys, "stdout", sys.stdout)
+    monkeypatch.setattr(sys, "stderr", sys.stderr)
+    handler = attach(path, max_bytes=150, backups=5)
+    try:
+        for i in range(6):
+            print(f"[12:00:0{i}] Committed: change {i}")
+        print("Successfully pushed to remote!")
+    finally:
+        logging.getLogger("commitment_issues.run").removeHandler(handler)
+        handler.close()
+    assert len(log_segments(path)) > 1
+    today = datetime.date.today().isoformat()
+    assert daily_stats(iter_lines(path)) == {today: {"commits": 6, "failed": 0, "pushes": 1, "push_failures": 0}}
@@ -0,0 +1,55 @@
+import copy
+import datetime
+import json
+import threading
+from types import SimpleNamespace
+
+from config_loader import DEFAULT_CONFIG
+from scheduler import CommitScheduler
+
+class FixedClock:
+    def __init__(self, now):
+        self._now = now
+
+    def now(self):
+        return self._now
+
+    def time(self):
+        return self._now.timestamp()
+
+    def today(self):
+        return self._now.date()
+
+def quick_config():
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    config.update(min_commits=3, max_commits=5, min_delay_minutes=0, max_delay_minutes=1,
+                  enable_random_timing=False)
+    return config
+
+def make_scheduler(tmp_path, now, test):
+    generator = SimpleNamespace(config=quick_config(), cancel_event=threading.Event(),
+                                git=SimpleNamespace(state_path=lambda name: tmp_path / name))
+    return CommitScheduler(generator, clock=FixedClock(now), test=test)
+
+def test_test_run_starts_now_before_the_work_day(tmp_path):
+    now = datetime.datetime(2026, 10, 16, 6, 0)
+    scheduler = make_scheduler(tmp_path, now, test=True)
+    plan = scheduler.prepare_day(now.date())
+    assert 3 <= len(plan["fire_at"]) <= 5
+    assert plan["fire_at"][0] == now.timestamp()
+    assert plan["fire_at"][-1] - now.timestamp() <= 5 * 60
+
+def test_test_run_leaves_saved_plans_alone(tmp_path):
+    now = datetime.datetime(2026, 10, 16, 6, 0)
+    real = make_scheduler(tmp_path, now, test=False)
+    saved = real.prepare_day(now.date())
+    schedule = (tmp_path / "schedule.json").read_text()
+
+    make_scheduler(tmp_path, now, test=True).prepare_day(now.date())
+    assert json.loads((tmp_path / "plan.json").read_text()) == saved
+    assert (tmp_path / "schedule.json").read_text() == schedule
+
+def test_even_timing_without_test_keeps_the_work_day(tmp_path):
+    now = datetime.datetime(2026, 10, 16, 6, 0)
+    plan = make_scheduler(tmp_path, now, test=False).prepare_day(now.date())
+    assert plan["fire_at"][0] == datetime.datetime(2026, 10, 16, 9, 0).timestamp()
@@ -0,0 +1,28 @@
+import copy
+import datetime
+
+from config_loader import DEFAULT_CONFIG
+from simulation import SimulatedGenerator
+
+START = datetime.date(2026, 10, 16)
+
+def test_message_catalogue_resolves_against_the_config(tmp_path, monkeypatch):
+    config_dir = tmp_path / "config"
+    config_dir.mkdir()
+    (config_dir / "messages.txt").write_text("Tune the {repo} cache\n")
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    config.update(message_catalogue="messages.txt", custom_messages=[])
+    monkeypatch.chdir(tmp_path)
+
+    generator = SimulatedGenerator(config, seed=3, start=START, config_file=config_dir / "commit_config.json")
+    actions = generator.simulate(3)
+    messages = {a["message"] for a in actions if a["action"] == "commit"}
+    assert "Tune the simulated-3 cache" in messages
+
+def test_same_seed_gives_the_same_actions():
+    first = SimulatedGenerator(seed=7, start=START).simulate(2)
+    second = SimulatedGenerator(seed=7, start=START).simulate(2)
+    assert first == second
+    days = [a for a in first if a["action"] == "finish_day"]
+    assert len(days) == 2
+    assert all(DEFAULT_CONFIG["min_commits"] <= d["committed"] <= DEFAULT_CONFIG["max_commits"] for d in days)
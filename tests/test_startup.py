@@ -0,0 +1,17 @@
+"""Startup budgets from benchmarks/check_startup.py, enforced as tests.
+
+Set STARTUP_BUDGET_SCALE (like the script's --scale) on slow machines.
+"""
+
+import os
+
+import pytest
+
+from benchmarks.check_startup import BUDGETS, check
+
+SCALE = float(os.environ.get("STARTUP_BUDGET_SCALE", "1.0"))
+
+@pytest.mark.parametrize("module", ["commitment_issues.cli", "auto_commit", "planner"])
+def test_entry_point_imports_within_budget(module):
+    budget_ms, forbidden = BUDGETS[module]
+    assert check(module, budget_ms * SCALE, forbidden, runs=5) == []